@@ -7,6 +7,9 @@ from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from .models import Course, Department, DegreeProgram, Prerequisite
 from .serializers import CourseSerializer, DepartmentSerializer, DegreeProgramSerializer
+from .exports import EXPORTS, OUTPUT_FORMATS, streaming_export
+from .importer import IMPORT_KINDS, CatalogImporter, CatalogImportError, read_rows
+from .tasks import import_catalog as import_catalog_task
 from users.models import UserProfile
 
 
@@ -29,7 +32,7 @@ def admin_courses_list(request):
             'error': 'Admin access required'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    courses = Course.objects.all().order_by('department__code', 'course_number')
+    courses = Course.objects.with_serializer_relations().order_by('department__code', 'course_number')
     serializer = CourseSerializer(courses, many=True)
     
     return Response({
@@ -38,6 +41,89 @@ def admin_courses_list(request):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def admin_export(request, dataset):
+    """
+    Stream a catalog export (courses, offerings or program-requirements)
+    
+    The output is chosen with ``?output=ndjson|csv``; ``format`` is reserved by
+    DRF for renderer selection.
+    """
+    if not is_admin(request.user):
+        return Response({
+            'success': False,
+            'error': 'Admin access required'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    output = request.GET.get('output', 'ndjson')
+    if dataset not in EXPORTS or output not in OUTPUT_FORMATS:
+        return Response({
+            'success': False,
+            'error': f'Unknown export. Datasets: {", ".join(EXPORTS)}; outputs: {", ".join(OUTPUT_FORMATS)}'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    return streaming_export(dataset, output)
+
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def admin_import_catalog(request):
+    """
+    Bulk import catalog rows
+    
+    Accepts either a JSON body keyed by kind (departments, courses, prerequisites,
+    offerings, time_slots) or one uploaded CSV/JSON/NDJSON file per kind.
+    With ``dry_run`` the changes are reported but not written. With ``background``
+    the import is queued as a 'catalog.import' task and its ID returned.
+    """
+    if not is_admin(request.user):
+        return Response({
+            'success': False,
+            'error': 'Admin access required'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        if request.FILES:
+            data = {
+                kind: read_rows(request.FILES[kind], request.FILES[kind].name)
+                for kind in IMPORT_KINDS if kind in request.FILES
+            }
+        else:
+            data = {kind: request.data.get(kind) for kind in IMPORT_KINDS}
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': f'Could not read import file: {e}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    dry_run = str(request.query_params.get('dry_run', request.data.get('dry_run', ''))).lower() in ('1', 'true')
+    background = str(request.query_params.get('background', request.data.get('background', ''))).lower() in ('1', 'true')
+    if background:
+        # Large imports run in a task worker; poll /api/tasks/tasks/<task>/ for the diff
+        task = import_catalog_task.enqueue({'data': data, 'dry_run': dry_run}, user=request.user)
+        return Response({
+            'success': True,
+            'task': task.id,
+            'status': task.status
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    try:
+        result = CatalogImporter(data).run(dry_run=dry_run)
+    except CatalogImportError as e:
+        return Response({
+            'success': False,
+            'error': str(e),
+            'details': e.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'success': True,
+        **result
+    }, status=status.HTTP_200_OK)
+
+
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CoursesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "courses"
+    
+    def ready(self):
+        import courses.signals
+        from courses.snapshot import load_catalog_snapshot
+        
+        # Map the prebuilt catalog snapshot up front; it is checked against the
+        # catalog version on first use, and catalog writes queue its rebuild
+        load_catalog_snapshot()
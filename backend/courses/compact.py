@@ -0,0 +1,109 @@
+"""
+Compact (side-loaded) response format.
+
+With ``?compact=1`` a serializer renders the related objects listed in its
+SIDELOADED_FIELDS as ids, and each related object is rendered once into a
+top-level ``included`` dictionary keyed by collection and id:
+
+    {"results": [{"id": 7, "course": 3, ...}],
+     "included": {"courses": {"3": {"id": 3, "department": 1, ...}},
+                  "departments": {"1": {"id": 1, "code": "CS", ...}}}}
+
+Included objects are compact too, so a department shared by hundreds of
+courses is serialized once per response.
+"""
+
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+
+
+class SideloadedField(serializers.Field):
+    """Renders a related object (or objects) as ids and side-loads the full representation"""
+
+    def __init__(self, serializer, collection):
+        self.serializer = serializer
+        self.collection = collection
+        self.many = isinstance(serializer, serializers.ListSerializer)
+        super().__init__(read_only=True, source=serializer.source)
+
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        self.serializer.bind(field_name, self)
+
+    @property
+    def child(self):
+        """The serializer that renders one included object"""
+        return self.serializer.child if self.many else self.serializer
+
+    def to_representation(self, value):
+        if not self.many:
+            return self.include(value)
+        objects = value.all() if isinstance(value, BaseManager) else value
+        return [self.include(obj) for obj in objects]
+
+    def include(self, obj):
+        included = self.context['included'].setdefault(self.collection, {})
+        if obj.pk not in included:
+            # Reserve the slot first so self-referencing objects stop here
+            included[obj.pk] = None
+            included[obj.pk] = self.child.to_representation(obj)
+        return obj.pk
+
+
+class SideloadMixin:
+    """
+    Serializer mixin that side-loads SIDELOADED_FIELDS ({field name: collection})
+    when the serializer context carries an ``included`` dictionary.
+    """
+    SIDELOADED_FIELDS = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get('included') is not None:
+            for name, collection in self.SIDELOADED_FIELDS.items():
+                if name in fields:
+                    fields[name] = SideloadedField(fields[name], collection)
+        return fields
+
+
+class CompactResponseMixin:
+    """
+    ViewSet mixin adding the opt-in ``?compact=1`` format to list and retrieve.
+
+    Lists keep their pagination keys and gain ``included``; a retrieved object
+    is returned as ``{"data": ..., "included": ...}``.
+    """
+    compact_query_param = 'compact'
+
+    def is_compact(self):
+        request = self.request
+        return (
+            request is not None
+            and request.method in ('GET', 'HEAD')
+            and self.action in ('list', 'retrieve')
+            and request.query_params.get(self.compact_query_param, '').lower() in ('1', 'true')
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.is_compact():
+            context['included'] = self.__dict__.setdefault('compact_included', {})
+        return context
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.is_compact():
+            response.data['included'] = self.__dict__.get('compact_included', {})
+        return response
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if self.is_compact() and isinstance(response.data, list):
+            response.data = {'results': response.data, 'included': self.__dict__.get('compact_included', {})}
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        if self.is_compact():
+            response.data = {'data': response.data, 'included': self.__dict__.get('compact_included', {})}
+        return response
@@ -0,0 +1,192 @@
+"""
+Streaming catalog exports.
+
+Each export reads its queryset with iterator(chunk_size=...) and writes one
+NDJSON line or CSV row per record, so memory stays flat however large the
+catalog is.
+"""
+
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from .models import Course, CourseOffering, Prerequisite, ProgramRequirement, ProgramCourseRequirement
+
+
+EXPORT_CHUNK_SIZE = 500
+
+# Bytes buffered before a chunk is handed to the server
+STREAM_BUFFER_SIZE = 64 * 1024
+
+OUTPUT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+COURSE_COLUMNS = [
+    'id', 'department', 'course_number', 'title', 'description', 'credits', 'is_active',
+    'terms_offered', 'prerequisites', 'corequisites', 'antirequisites'
+]
+
+OFFERING_COLUMNS = [
+    'id', 'course', 'semester', 'year', 'section', 'instructor', 'capacity', 'enrolled', 'time_slots'
+]
+
+PROGRAM_REQUIREMENT_COLUMNS = [
+    'program', 'requirement_id', 'requirement', 'requirement_type', 'parent_requirement_id',
+    'credits_required', 'courses_required', 'is_required', 'course', 'course_is_required',
+    'is_alternative', 'alternative_group', 'minimum_grade'
+]
+
+
+def course_rows():
+    related_courses = Course.objects.select_related('department').only(
+        'id', 'course_number', 'department__code'
+    )
+    courses = Course.objects.select_related('department').prefetch_related(
+        Prefetch('prerequisites', queryset=Prerequisite.objects.select_related('prerequisite_course__department')),
+        Prefetch('corequisites', queryset=related_courses),
+        Prefetch('antirequisites', queryset=related_courses),
+    ).order_by('department__code', 'course_number')
+
+    for course in courses.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {
+            'id': course.id,
+            'department': course.department.code,
+            'course_number': course.course_number,
+            'title': course.title,
+            'description': course.description,
+            'credits': course.credits,
+            'is_active': course.is_active,
+            'terms_offered': course.terms_offered,
+            'prerequisites': [prereq.full_code for prereq in course.get_prerequisites()],
+            'corequisites': [coreq.full_code for coreq in course.get_corequisites()],
+            'antirequisites': [antireq.full_code for antireq in course.get_antirequisites()],
+        }
+
+
+def offering_rows():
+    offerings = CourseOffering.objects.select_related('course__department').prefetch_related(
+        'time_slots'
+    ).order_by('year', 'semester', 'course_id', 'section')
+
+    for offering in offerings.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {
+            'id': offering.id,
+            'course': offering.course.full_code,
+            'semester': offering.semester,
+            'year': offering.year,
+            'section': offering.section,
+            'instructor': offering.instructor,
+            'capacity': offering.capacity,
+            'enrolled': offering.enrolled,
+            'time_slots': [
+                {
+                    'day_of_week': slot.day_of_week,
+                    'start_time': slot.start_time,
+                    'end_time': slot.end_time,
+                    'location': slot.location,
+                }
+                for slot in offering.time_slots.all()
+            ],
+        }
+
+
+def program_requirement_rows():
+    """One row per course of each requirement; requirements without courses get one row"""
+    requirements = ProgramRequirement.objects.select_related('program').prefetch_related(
+        Prefetch(
+            'course_requirements',
+            queryset=ProgramCourseRequirement.objects.select_related('course__department')
+        )
+    ).order_by('program__code', 'order', 'id')
+
+    for requirement in requirements.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row = {
+            'program': requirement.program.code,
+            'requirement_id': requirement.id,
+            'requirement': requirement.name,
+            'requirement_type': requirement.requirement_type,
+            'parent_requirement_id': requirement.parent_requirement_id,
+            'credits_required': requirement.credits_required,
+            'courses_required': requirement.courses_required,
+            'is_required': requirement.is_required,
+        }
+        course_requirements = requirement.course_requirements.all()
+        if not course_requirements:
+            yield dict(row, course=None, course_is_required=None, is_alternative=None,
+                       alternative_group='', minimum_grade='')
+        for course_requirement in course_requirements:
+            yield dict(
+                row,
+                course=course_requirement.course.full_code,
+                course_is_required=course_requirement.is_required,
+                is_alternative=course_requirement.is_alternative,
+                alternative_group=course_requirement.alternative_group,
+                minimum_grade=course_requirement.minimum_grade,
+            )
+
+
+EXPORTS = {
+    'courses': (COURSE_COLUMNS, course_rows),
+    'offerings': (OFFERING_COLUMNS, offering_rows),
+    'program-requirements': (PROGRAM_REQUIREMENT_COLUMNS, program_requirement_rows),
+}
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        if any(isinstance(item, dict) for item in value):
+            return json.dumps(value, cls=DjangoJSONEncoder)
+        return ';'.join(str(item) for item in value)
+    return value
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def csv_lines(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(row[column]) for column in columns])
+
+
+def _buffered(lines):
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def streaming_export(name, output='ndjson'):
+    """
+    Build a streaming response for the export ``name`` in ``output`` format.
+
+    Raises:
+        KeyError: Unknown export or output format
+    """
+    columns, rows = EXPORTS[name]
+    content_type = OUTPUT_FORMATS[output]
+    lines = csv_lines(rows(), columns) if output == 'csv' else ndjson_lines(rows())
+
+    response = StreamingHttpResponse(_buffered(lines), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{name}.{output}"'
+    return response
@@ -0,0 +1,105 @@
+"""
+Sparse fieldsets for catalog APIs.
+
+Clients pass ``?fields=id,full_code,course.title`` to keep only the listed
+fields, or ``?omit=description,course.prerequisites`` to drop some. Dotted
+names reach into nested serializers. Views use the pruned serializer to load
+only the columns and relations the response needs.
+"""
+
+from rest_framework import serializers
+from .compact import SideloadedField
+
+
+def parse_fieldset(value):
+    """
+    Parse a comma separated list of dotted field names into a tree.
+
+    ``'id,course.title,course.department.code'`` becomes
+    ``{'id': {}, 'course': {'title': {}, 'department': {'code': {}}}}``;
+    an empty subtree means the whole field.
+    """
+    if not value:
+        return None
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, path.strip().split('.')):
+            node = node.setdefault(name, {})
+    return tree or None
+
+
+def nested_serializer(field):
+    """The serializer rendering each object of a nested, many=True or side-loaded field"""
+    if isinstance(field, SideloadedField):
+        return field.child
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    return field
+
+
+def prune_fields(serializer, fields=None, omit=None):
+    """Remove fields from a serializer instance (and its nested serializers) in place"""
+    serializer = nested_serializer(serializer)
+    if not isinstance(serializer, serializers.Serializer):
+        return
+
+    if fields:
+        for name in list(serializer.fields):
+            if name not in fields:
+                serializer.fields.pop(name)
+        for name, subtree in fields.items():
+            if subtree and name in serializer.fields:
+                prune_fields(serializer.fields[name], fields=subtree)
+
+    for name, subtree in (omit or {}).items():
+        if name not in serializer.fields:
+            continue
+        if subtree:
+            prune_fields(serializer.fields[name], omit=subtree)
+        else:
+            serializer.fields.pop(name)
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that applies the ``fields``/``omit`` trees from its context.
+
+    Only the root serializer is pruned this way; nested serializers are pruned
+    through the dotted names of the root's fieldset.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        context = kwargs.get('context') or {}
+        if context.get('fields') or context.get('omit'):
+            prune_fields(self, context.get('fields'), context.get('omit'))
+
+
+class SparseFieldsetViewMixin:
+    """ViewSet mixin that reads ``fields``/``omit`` query parameters on GET requests"""
+
+    def get_fieldset(self):
+        """Return the (fields, omit) trees for this request, or (None, None)"""
+        if self.request is None or self.request.method not in ('GET', 'HEAD'):
+            return None, None
+        return (
+            parse_fieldset(self.request.query_params.get('fields')),
+            parse_fieldset(self.request.query_params.get('omit')),
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['omit'] = self.get_fieldset()
+        return context
+
+    def get_selected_fields(self):
+        """
+        Return the pruned serializer's fields when a fieldset was requested, else None.
+
+        Use ``nested_serializer(fields[name]).fields`` on the result to inspect
+        what a nested serializer will render.
+        """
+        if not any(self.get_fieldset()):
+            return None
+        return self.get_serializer().fields
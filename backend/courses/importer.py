@@ -0,0 +1,499 @@
+"""
+Bulk catalog import.
+
+Loads departments, courses, prerequisites, offerings and time slots from
+CSV/JSON rows in one transaction. Codes are resolved through in-memory maps of
+the existing catalog, each kind is planned in dependency order, and writes use
+bulk_create/bulk_update in batches. A dry run stops after planning and reports
+the diff without touching the database.
+
+Row formats match courses.exports, so an export can be edited and re-imported:
+
+    departments:    code, name
+    courses:        department, course_number, title, description, credits,
+                    is_active, terms_offered, prerequisites, corequisites,
+                    antirequisites (lists as JSON arrays or ';'-separated codes)
+    prerequisites:  course, prerequisite_course, group
+    offerings:      course, semester, year, section, instructor, capacity,
+                    enrolled, time_slots
+    time_slots:     course, semester, year, section, day_of_week, start_time,
+                    end_time, location
+
+Time slots listed for an offering replace that offering's existing slots.
+"""
+
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import time
+from decimal import Decimal, InvalidOperation
+from django.db import connection, transaction
+from .models import (
+    Department, Course, Prerequisite, PrerequisiteGroup, CourseOffering, TimeSlot, Program
+)
+from .search import index_courses
+from .versioning import bump_catalog_version
+
+
+IMPORT_KINDS = ('departments', 'courses', 'prerequisites', 'offerings', 'time_slots')
+
+IMPORT_BATCH_SIZE = 1000
+
+# Changes listed per kind in a diff; the counts always cover every row
+DIFF_SAMPLE_SIZE = 50
+
+PLAIN_FIELD_TYPES = {'AutoField', 'BigAutoField', 'CharField', 'TextField', 'IntegerField', 'PositiveIntegerField', 'BooleanField'}
+
+COURSE_FIELDS = ['title', 'description', 'credits', 'is_active', 'terms_offered']
+OFFERING_FIELDS = ['instructor', 'capacity', 'enrolled']
+
+
+class CatalogImportError(Exception):
+    """Raised when import rows are invalid; nothing has been written"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f'{len(errors)} invalid import rows')
+
+
+def read_rows(fileobj, filename):
+    """
+    Read import rows from a CSV, JSON or NDJSON file.
+
+    Returns:
+        A list of row dicts, or a dict of kind -> rows for a JSON catalog object
+    """
+    text = fileobj.read()
+    if isinstance(text, bytes):
+        text = text.decode('utf-8-sig')
+    if filename.endswith('.csv'):
+        return list(csv.DictReader(io.StringIO(text)))
+    if filename.endswith('.ndjson'):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return json.loads(text)
+
+
+def _blank(value):
+    return value is None or value == ''
+
+
+def _list(value):
+    if _blank(value):
+        return []
+    if isinstance(value, list):
+        return value
+    if value.lstrip().startswith('['):
+        return json.loads(value)
+    return [item.strip() for item in value.split(';') if item.strip()]
+
+
+def _bool(value, default):
+    if _blank(value):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+def _int(value, default=None):
+    if _blank(value):
+        if default is None:
+            raise ValueError('value is required')
+        return default
+    return int(value)
+
+
+def _time(value):
+    if isinstance(value, time):
+        return value
+    return time.fromisoformat(str(value).strip())
+
+
+def _course_key(code):
+    """'CS 101' -> ('CS', '101')"""
+    parts = str(code).strip().rsplit(None, 1)
+    if len(parts) != 2:
+        raise ValueError(f'invalid course code {code!r}')
+    return parts[0], parts[1]
+
+
+def _label(key):
+    """Readable form of a natural key, e.g. ('CS', '101') -> 'CS 101'"""
+    if isinstance(key, tuple):
+        return ' '.join(_label(part) for part in key)
+    return str(key)
+
+
+def insert_rows(model, fields, rows, batch_size=IMPORT_BATCH_SIZE):
+    """
+    INSERT plain rows with executemany.
+
+    For link rows whose ids are never read back; this skips the per-object
+    overhead of bulk_create, which dominates imports of this size.
+    """
+    fields = [model._meta.get_field(name) for name in fields]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields))
+    )
+    # Keys, strings and numbers go to the driver as they are; only fields with
+    # a database representation of their own (times, decimals, JSON) are adapted
+    adapters = [
+        None if field.is_relation or field.get_internal_type() in PLAIN_FIELD_TYPES
+        else (lambda value, field=field: field.get_db_prep_save(value, connection))
+        for field in fields
+    ]
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, [
+                [value if adapt is None else adapt(value) for adapt, value in zip(adapters, row)]
+                for row in rows[start:start + batch_size]
+            ])
+
+
+class CatalogImporter:
+    """
+    Plan and apply a catalog import.
+
+    Usage:
+        result = CatalogImporter({'courses': rows, ...}).run(dry_run=True)
+    """
+
+    def __init__(self, data, batch_size=IMPORT_BATCH_SIZE):
+        self.data = {kind: list(data.get(kind) or []) for kind in IMPORT_KINDS}
+        self.batch_size = batch_size
+        self.errors = []
+        self.diff = {
+            kind: {'created': 0, 'updated': 0, 'unchanged': 0, 'changes': []} for kind in IMPORT_KINDS
+        }
+
+    def run(self, dry_run=False):
+        """
+        Plan the import and, unless ``dry_run``, write it.
+
+        Returns:
+            Dict with 'dry_run' and per-kind 'diff'
+
+        Raises:
+            CatalogImportError: Any row is invalid; nothing is written
+        """
+        self.load_catalog()
+        self.plan()
+        if self.errors:
+            raise CatalogImportError(self.errors)
+        if not dry_run:
+            with transaction.atomic():
+                self.apply()
+        return {'dry_run': dry_run, 'diff': self.diff}
+
+    # Planning
+
+    def load_catalog(self):
+        """Index the existing catalog by natural key"""
+        self.departments = {department.code: department for department in Department.objects.all()}
+        self.courses = {}
+        course_keys = {}
+        for course in Course.objects.select_related('department'):
+            key = (course.department.code, course.course_number)
+            self.courses[key] = course
+            course_keys[course.id] = key
+
+        # Unsaved instances are unhashable, so plans are keyed by natural keys
+        self.prerequisite_edges = {
+            (course_keys[course_id], course_keys[prerequisite_id])
+            for course_id, prerequisite_id in Prerequisite.objects.values_list('course_id', 'prerequisite_course_id')
+        }
+        self.groups = {
+            (course_keys[group.course_id], group.name): group for group in PrerequisiteGroup.objects.all()
+        }
+        self.related_pairs = {
+            'corequisites': set(Course.corequisites.through.objects.values_list('from_course_id', 'to_course_id')),
+            'antirequisites': set(Course.antirequisites.through.objects.values_list('from_course_id', 'to_course_id')),
+        }
+        self.offerings = {
+            (course_keys[offering.course_id], offering.semester, offering.year, offering.section): offering
+            for offering in CourseOffering.objects.all()
+        }
+        self.time_slots = defaultdict(list)
+        for slot in TimeSlot.objects.order_by('offering_id', 'day_of_week', 'start_time'):
+            self.time_slots[slot.offering_id].append(
+                (slot.day_of_week, slot.start_time, slot.end_time, slot.location)
+            )
+
+        self.new = {kind: [] for kind in ('departments', 'courses', 'groups', 'prerequisites', 'offerings')}
+        self.changed = {kind: [] for kind in ('departments', 'courses', 'offerings')}
+        self.new_related = {'corequisites': [], 'antirequisites': []}
+        self.slot_plan = {}
+
+    def plan(self):
+        self.prerequisite_rows = []
+        self.related_rows = []
+        self.slot_rows = defaultdict(list)
+        for kind in IMPORT_KINDS:
+            for index, row in enumerate(self.data[kind]):
+                self.current_row = index
+                try:
+                    getattr(self, f'plan_{kind[:-1]}')(row)
+                except (KeyError, ValueError, TypeError, InvalidOperation) as exc:
+                    message = f'missing column {exc}' if isinstance(exc, KeyError) else str(exc)
+                    self.error(kind, index, message)
+            if kind == 'courses':
+                self.plan_related_pairs()
+            if kind == 'prerequisites':
+                self.plan_prerequisite_edges()
+        self.plan_time_slots()
+
+    def error(self, kind, index, message):
+        self.errors.append({'kind': kind, 'row': index + 1, 'error': message})
+
+    def record(self, kind, action, key, fields=None):
+        diff = self.diff[kind]
+        diff[action] += 1
+        if action != 'unchanged' and len(diff['changes']) < DIFF_SAMPLE_SIZE:
+            change = {'action': action, 'key': _label(key)}
+            if fields:
+                change['fields'] = fields
+            diff['changes'].append(change)
+
+    def update_fields(self, instance, values):
+        """Assign ``values`` and return {field: [old, new]} for those that differ"""
+        changes = {}
+        for field, value in values.items():
+            old = getattr(instance, field)
+            if old != value:
+                changes[field] = [old, value]
+                setattr(instance, field, value)
+        return changes
+
+    def course_key(self, code):
+        key = _course_key(code)
+        if key not in self.courses:
+            raise ValueError(f'unknown course {_label(key)}')
+        return key
+
+    def plan_department(self, row):
+        code = row['code'].strip()
+        department = self.departments.get(code)
+        if department is None:
+            department = Department(code=code, name=row['name'])
+            self.departments[code] = department
+            self.new['departments'].append(department)
+            self.record('departments', 'created', code)
+            return
+        changes = self.update_fields(department, {'name': row.get('name') or department.name})
+        self.record('departments', 'updated' if changes else 'unchanged', code, changes)
+        if changes:
+            self.changed['departments'].append(department)
+
+    def plan_course(self, row):
+        key = (row['department'].strip(), str(row['course_number']).strip())
+        if key[0] not in self.departments:
+            raise ValueError(f'unknown department {key[0]}')
+        course = self.courses.get(key)
+        values = {
+            'title': row['title'],
+            'description': row.get('description') or '',
+            'credits': Decimal(str(row['credits'])),
+            'is_active': _bool(row.get('is_active'), True),
+            'terms_offered': _list(row.get('terms_offered')),
+        }
+        if course is None:
+            course = Course(department=self.departments[key[0]], course_number=key[1], **values)
+            self.courses[key] = course
+            self.new['courses'].append(course)
+            self.record('courses', 'created', key)
+        else:
+            changes = self.update_fields(course, values)
+            self.record('courses', 'updated' if changes else 'unchanged', key, changes)
+            if changes:
+                self.changed['courses'].append(course)
+
+        for code in _list(row.get('prerequisites')):
+            self.prerequisite_rows.append(('courses', self.current_row, key, code, None))
+        for relation in ('corequisites', 'antirequisites'):
+            for code in _list(row.get(relation)):
+                self.related_rows.append((self.current_row, relation, key, code))
+
+    def plan_prerequisite(self, row):
+        self.prerequisite_rows.append(
+            ('prerequisites', self.current_row, self.course_key(row['course']),
+             row['prerequisite_course'], row.get('group') or None)
+        )
+
+    def plan_prerequisite_edges(self):
+        """Add new prerequisite edges, rejecting self references and cycles"""
+        new_edges = []
+        for kind, index, course, code, group_name in self.prerequisite_rows:
+            try:
+                prerequisite = self.course_key(code)
+            except ValueError as exc:
+                self.error(kind, index, str(exc))
+                continue
+            label = (_label(course), 'requires', _label(prerequisite))
+            if prerequisite == course:
+                self.error(kind, index, f'{_label(course)} cannot be its own prerequisite')
+            elif (course, prerequisite) in self.prerequisite_edges:
+                self.record('prerequisites', 'unchanged', label)
+            else:
+                self.prerequisite_edges.add((course, prerequisite))
+                new_edges.append((kind, index, course, prerequisite, group_name, label))
+
+        cyclic = self.cyclic_courses()
+        for kind, index, course, prerequisite, group_name, label in new_edges:
+            if course in cyclic and prerequisite in cyclic:
+                self.error(kind, index, f'{_label(label)} creates a prerequisite cycle')
+                continue
+            group = None
+            if group_name:
+                group = self.groups.get((course, group_name))
+                if group is None:
+                    group = PrerequisiteGroup(course=self.courses[course], name=group_name)
+                    self.groups[(course, group_name)] = group
+                    self.new['groups'].append(group)
+            self.new['prerequisites'].append((course, prerequisite, group))
+            self.record('prerequisites', 'created', label)
+
+    def cyclic_courses(self):
+        """Courses left over after a topological sort of the prerequisite graph"""
+        dependents = defaultdict(list)
+        indegree = defaultdict(int)
+        for course, prerequisite in self.prerequisite_edges:
+            dependents[prerequisite].append(course)
+            indegree[course] += 1
+            indegree.setdefault(prerequisite, 0)
+        ready = [course for course, degree in indegree.items() if degree == 0]
+        while ready:
+            for dependent in dependents[ready.pop()]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+        return {course for course, degree in indegree.items() if degree}
+
+    def plan_related_pairs(self):
+        """Resolve corequisites and antirequisites once every course row is planned"""
+        for index, relation, key, code in self.related_rows:
+            try:
+                self.plan_related(relation, self.courses[key], self.courses[self.course_key(code)])
+            except ValueError as exc:
+                self.error('courses', index, str(exc))
+
+    def plan_related(self, relation, course, other):
+        if course is other:
+            raise ValueError(f'{course.full_code} cannot list itself in {relation}')
+        if course.pk and other.pk and (course.pk, other.pk) in self.related_pairs[relation]:
+            return
+        self.new_related[relation].append((course, other))
+
+    def offering_key(self, row):
+        return (
+            self.course_key(row['course']), row['semester'].strip().lower(),
+            _int(row['year']), str(row.get('section') or '001').strip()
+        )
+
+    def plan_offering(self, row):
+        key = self.offering_key(row)
+        offering = self.offerings.get(key)
+        values = {
+            'instructor': row.get('instructor') or '',
+            'capacity': _int(row['capacity']),
+            'enrolled': _int(row.get('enrolled'), 0),
+        }
+        if offering is None:
+            offering = CourseOffering(
+                course=self.courses[key[0]], semester=key[1], year=key[2], section=key[3], **values
+            )
+            self.offerings[key] = offering
+            self.new['offerings'].append(offering)
+            self.record('offerings', 'created', key)
+        else:
+            changes = self.update_fields(offering, values)
+            self.record('offerings', 'updated' if changes else 'unchanged', key, changes)
+            if changes:
+                self.changed['offerings'].append(offering)
+
+        if not _blank(row.get('time_slots')):
+            slots = row['time_slots']
+            for slot in json.loads(slots) if isinstance(slots, str) else slots:
+                self.slot_rows[key].append(self.slot_values(slot))
+
+    def plan_time_slot(self, row):
+        key = self.offering_key(row)
+        if key not in self.offerings:
+            raise ValueError(f'unknown offering {_label(key)}')
+        self.slot_rows[key].append(self.slot_values(row))
+
+    def slot_values(self, row):
+        start, end = _time(row['start_time']), _time(row['end_time'])
+        if end <= start:
+            raise ValueError(f'time slot ends before it starts ({start}-{end})')
+        return (row['day_of_week'].strip().lower(), start, end, row.get('location') or '')
+
+    def plan_time_slots(self):
+        for key, slots in self.slot_rows.items():
+            offering = self.offerings[key]
+            slots = sorted(set(slots))
+            existing = sorted(self.time_slots.get(offering.pk, [])) if offering.pk else []
+            if slots == existing:
+                self.record('time_slots', 'unchanged', key)
+                continue
+            self.slot_plan[key] = slots
+            self.record('time_slots', 'updated' if existing else 'created', key)
+
+    # Writing
+
+    def apply(self):
+        batch_size = self.batch_size
+        Department.objects.bulk_create(self.new['departments'], batch_size=batch_size)
+        Department.objects.bulk_update(self.changed['departments'], ['name'], batch_size=batch_size)
+
+        Course.objects.bulk_create(self.new['courses'], batch_size=batch_size)
+        Course.objects.bulk_update(self.changed['courses'], COURSE_FIELDS, batch_size=batch_size)
+
+        PrerequisiteGroup.objects.bulk_create(self.new['groups'], batch_size=batch_size)
+        insert_rows(
+            Prerequisite, ['course', 'prerequisite_course', 'group'],
+            [
+                (self.courses[course].pk, self.courses[prerequisite].pk, group.pk if group else None)
+                for course, prerequisite, group in self.new['prerequisites']
+            ],
+            batch_size
+        )
+        for relation, pairs in self.new_related.items():
+            through = getattr(Course, relation).through
+            # Symmetrical relations store one row per direction
+            rows = {(a.pk, b.pk) for a, b in pairs} | {(b.pk, a.pk) for a, b in pairs}
+            through.objects.bulk_create(
+                [through(from_course_id=a, to_course_id=b) for a, b in rows],
+                batch_size=batch_size, ignore_conflicts=True
+            )
+
+        CourseOffering.objects.bulk_create(self.new['offerings'], batch_size=batch_size)
+        CourseOffering.objects.bulk_update(self.changed['offerings'], OFFERING_FIELDS, batch_size=batch_size)
+
+        offerings = {key: self.offerings[key] for key in self.slot_plan}
+        replaced = [offering.pk for offering in offerings.values() if not offering._state.adding]
+        for start in range(0, len(replaced), batch_size):
+            TimeSlot.objects.filter(offering_id__in=replaced[start:start + batch_size]).delete()
+        insert_rows(
+            TimeSlot, ['offering', 'day_of_week', 'start_time', 'end_time', 'location'],
+            [(offerings[key].pk, *slot) for key, slots in self.slot_plan.items() for slot in slots],
+            batch_size
+        )
+
+        self.after_write()
+
+    def after_write(self):
+        """Do what the per-object signals would have done for bulk writes"""
+        touched = [course.pk for course in self.new['courses'] + self.changed['courses']]
+        changed = [course.pk for course in self.changed['courses']]
+        for start in range(0, len(touched), self.batch_size):
+            index_courses(touched[start:start + self.batch_size])
+        for start in range(0, len(changed), self.batch_size):
+            Program.bump_requirements_version(
+                requirements__course_requirements__course__in=changed[start:start + self.batch_size]
+            )
+        if any(diff['created'] or diff['updated'] for diff in self.diff.values()):
+            transaction.on_commit(bump_catalog_version)
@@ -12,6 +12,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.db import transaction
 from courses.models import Program, ProgramRequirement, ProgramCourseRequirement, Course, Department
 from courses.serializers import ProgramRequirementSerializer, ProgramCourseRequirementSerializer
+from courses.services import ProgramRequirementTree
 import re
 
 
@@ -24,7 +25,10 @@ def get_program_requirements(request, program_id):
         program = Program.objects.get(id=program_id)
         requirements = program.requirements.all().order_by('order')
         
-        serializer = ProgramRequirementSerializer(requirements, many=True)
+        # Sub-requirements and course links come from one tree load, not per node
+        serializer = ProgramRequirementSerializer(
+            requirements, many=True, context={'requirement_tree': ProgramRequirementTree([program.id])}
+        )
         
         return Response({
             'success': True,
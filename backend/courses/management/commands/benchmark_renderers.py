@@ -0,0 +1,60 @@
+import gzip
+import time
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from courses.models import CourseOffering
+from courses.serializers import CourseOfferingSerializer
+from uniplanner import renderers
+from uniplanner.middleware import BROTLI_QUALITY, brotli
+
+
+class Command(BaseCommand):
+    help = 'Compare renderer throughput and compressed sizes for CourseOfferingSerializer lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000, help='Offerings per list (repeated if the catalog has fewer)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per renderer; the best is reported')
+
+    def handle(self, *args, **options):
+        offerings = list(
+            CourseOffering.objects.select_related('course__department').prefetch_related(
+                'time_slots', 'course__prerequisites__prerequisite_course__department',
+                'course__corequisites__department', 'course__antirequisites__department',
+                'course__restricted_to_majors__department', 'course__prerequisite_groups',
+            )[:options['count']]
+        )
+        if not offerings:
+            self.stdout.write(self.style.WARNING('No course offerings to serialize; load sample data first'))
+            return
+
+        start = time.perf_counter()
+        data = CourseOfferingSerializer(offerings, many=True).data
+        serialize_time = time.perf_counter() - start
+        data = (list(data) * (options['count'] // len(data) + 1))[:options['count']]
+        self.stdout.write(f'Serialized {len(offerings)} offerings in {serialize_time * 1000:.1f} ms')
+
+        candidates = [('DRF JSONRenderer', JSONRenderer())]
+        if renderers.orjson is not None:
+            candidates.append(('ORJSONRenderer', renderers.ORJSONRenderer()))
+        if renderers.msgpack is not None:
+            candidates.append(('MessagePackRenderer', renderers.MessagePackRenderer()))
+
+        self.stdout.write(f'Rendering {len(data)} offerings, best of {options["repeat"]}:')
+        baseline = None
+        for name, renderer in candidates:
+            best = float('inf')
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                body = renderer.render(data, renderer.media_type)
+                best = min(best, time.perf_counter() - start)
+            baseline = baseline or best
+            self.stdout.write(
+                f'  {name:<20} {best * 1000:8.1f} ms  {len(body) / best / 1e6:8.1f} MB/s  '
+                f'{len(body) / 1024:8.1f} KB  x{baseline / best:.1f}'
+            )
+
+        body = JSONRenderer().render(data)
+        sizes = [f'gzip {len(gzip.compress(body, compresslevel=6)) / 1024:.1f} KB']
+        if brotli is not None:
+            sizes.append(f'brotli {len(brotli.compress(body, quality=BROTLI_QUALITY)) / 1024:.1f} KB')
+        self.stdout.write(f'JSON body {len(body) / 1024:.1f} KB compresses to ' + ', '.join(sizes))
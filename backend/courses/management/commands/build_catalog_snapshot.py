@@ -0,0 +1,20 @@
+import os
+from django.core.management.base import BaseCommand
+from courses.snapshot import CatalogSnapshot, build_catalog_snapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    help = 'Write the memory-mapped catalog snapshot that workers load at startup'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Snapshot file (defaults to settings.CATALOG_SNAPSHOT_PATH)')
+
+    def handle(self, *args, **options):
+        path = options['output'] or snapshot_path()
+        version = build_catalog_snapshot(path)
+        snapshot = CatalogSnapshot(path)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {path} for catalog version {version}: {len(snapshot.department_ids)} departments, '
+            f'{len(snapshot.course_ids)} courses, {len(snapshot.prerequisite_indices)} prerequisites, '
+            f'{len(snapshot.offering_ids)} offerings ({os.path.getsize(path) / 1024:.1f} KB)'
+        ))
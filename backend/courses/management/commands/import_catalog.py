@@ -0,0 +1,54 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from courses.importer import IMPORT_KINDS, CatalogImporter, CatalogImportError, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import departments, courses, prerequisites, offerings and time slots from CSV/JSON files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'catalog', nargs='?',
+            help='JSON file with a list of rows under each kind (departments, courses, ...)'
+        )
+        for kind in IMPORT_KINDS:
+            parser.add_argument(
+                f'--{kind.replace("_", "-")}', dest=kind, metavar='FILE',
+                help=f'CSV, JSON or NDJSON file of {kind.replace("_", " ")}'
+            )
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without writing them')
+        parser.add_argument('--show-changes', action='store_true', help='Print sample changes for each kind')
+
+    def handle(self, *args, **options):
+        data = {}
+        if options['catalog']:
+            with open(options['catalog'], encoding='utf-8') as catalog:
+                data = read_rows(catalog, options['catalog'])
+            if not isinstance(data, dict):
+                raise CommandError('The catalog file must be a JSON object keyed by kind')
+        for kind in IMPORT_KINDS:
+            if options[kind]:
+                with open(options[kind], 'rb') as rows:
+                    data[kind] = read_rows(rows, options[kind])
+        if not data:
+            raise CommandError('Nothing to import; pass a catalog file or at least one --<kind> file')
+        
+        try:
+            result = CatalogImporter(data).run(dry_run=options['dry_run'])
+        except CatalogImportError as exc:
+            for error in exc.errors:
+                self.stderr.write(f"{error['kind']} row {error['row']}: {error['error']}")
+            raise CommandError(str(exc))
+        
+        for kind, diff in result['diff'].items():
+            self.stdout.write(
+                f"{kind}: {diff['created']} created, {diff['updated']} updated, {diff['unchanged']} unchanged"
+            )
+            if options['show_changes']:
+                for change in diff['changes']:
+                    self.stdout.write('  ' + json.dumps(change, default=str))
+        
+        if result['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing was written'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Catalog imported'))
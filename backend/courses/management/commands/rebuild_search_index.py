@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from courses.models import Course
+from courses.search import is_search_supported, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text course search index from the catalog'
+
+    def handle(self, *args, **options):
+        if not is_search_supported():
+            self.stdout.write(self.style.WARNING('This database has no native search index; nothing to rebuild'))
+            return
+        
+        rebuild_search_index()
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {Course.objects.count()} courses')
+        )
@@ -0,0 +1,49 @@
+import sqlite3
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database into its read replicas with the SQLite backup API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', default=[],
+            help='Replica file to write (repeatable; defaults to the DATABASE_REPLICAS aliases)'
+        )
+        parser.add_argument('--interval', type=float, default=0, help='Keep syncing every this many seconds')
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError(f'{primary.vendor} replicas are kept in sync by the database, not this command')
+        if primary.in_atomic_block:
+            # The backup would wait forever for this connection's own write lock
+            raise CommandError('Cannot copy the primary from inside a transaction')
+
+        targets = options['target'] or [
+            connections[alias].settings_dict['NAME'] for alias in settings.DATABASE_REPLICAS
+        ]
+        if not targets:
+            self.stdout.write(self.style.WARNING('No replicas configured; set UNIPLANNER_REPLICAS or pass --target'))
+            return
+
+        while True:
+            for target in targets:
+                self.sync(primary, target)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def sync(self, primary, target):
+        start = time.perf_counter()
+        primary.ensure_connection()
+        destination = sqlite3.connect(target, timeout=primary.settings_dict['OPTIONS'].get('timeout', 5))
+        try:
+            # One step, so the copy is a single consistent snapshot of the primary
+            primary.connection.backup(destination)
+        finally:
+            destination.close()
+        self.stdout.write(f'Synced {target} in {(time.perf_counter() - start) * 1000:.1f} ms')
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.24 on 2026-10-19 00:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0008_alter_program_department"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="program",
+            name="requirements_version",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Bumped whenever requirements, course requirements or constraints change",
+            ),
+        ),
+    ]
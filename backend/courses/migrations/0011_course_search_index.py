@@ -0,0 +1,26 @@
+# Generated by Django 4.2.24 on 2026-10-19 01:10
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from courses.search import create_search_index
+
+    create_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from courses.search import drop_search_index
+
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0010_catalogversion"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.24 on 2026-10-19 00:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0011_course_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["department", "course_number"],
+                name="course_active_dept_number_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="courseoffering",
+            index=models.Index(
+                fields=["year", "semester", "course", "section"],
+                name="offering_term_idx",
+            ),
+        ),
+    ]
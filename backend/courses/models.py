@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from uniplanner.models import VersionCounterMixin
 
 
 class Department(models.Model):
@@ -11,6 +12,95 @@ class Department(models.Model):
         return f"{self.code} - {self.name}"
 
 
+class CourseQuerySet(models.QuerySet):
+    """Loads courses together with every relation CourseSerializer reads"""
+    
+    @staticmethod
+    def serializer_select_related(prefix=''):
+        return [prefix + field for field in ('department', 'created_by', 'last_modified_by')]
+    
+    @staticmethod
+    def serializer_prefetches(prefix='', nested_prerequisites=False):
+        """
+        Prefetch lookups for CourseSerializer, optionally rooted at ``prefix``
+        (e.g. 'course__' when serializing offerings).
+        With ``nested_prerequisites`` each prerequisite course is loaded deeply enough
+        for CourseWithPrerequisitesSerializer, which nests a full CourseSerializer.
+        """
+        prerequisite_courses = Prerequisite.objects.select_related('prerequisite_course__department')
+        prerequisites = prerequisite_courses
+        if nested_prerequisites:
+            prerequisites = Prerequisite.objects.select_related(
+                *CourseQuerySet.serializer_select_related('prerequisite_course__')
+            ).prefetch_related(*CourseQuerySet.serializer_prefetches('prerequisite_course__'))
+        
+        return [
+            models.Prefetch(prefix + 'prerequisites', queryset=prerequisites),
+            models.Prefetch(
+                prefix + 'prerequisite_groups',
+                queryset=PrerequisiteGroup.objects.prefetch_related(
+                    models.Prefetch('prerequisites', queryset=prerequisite_courses)
+                )
+            ),
+            models.Prefetch(prefix + 'corequisites', queryset=Course.objects.select_related('department')),
+            models.Prefetch(prefix + 'antirequisites', queryset=Course.objects.select_related('department')),
+            models.Prefetch(prefix + 'restricted_to_majors', queryset=DegreeProgram.objects.select_related('department')),
+        ]
+    
+    def with_serializer_relations(self, nested_prerequisites=False):
+        """Serialize any number of courses in a fixed number of queries"""
+        return self.select_related(*self.serializer_select_related()).prefetch_related(
+            *self.serializer_prefetches(nested_prerequisites=nested_prerequisites)
+        )
+    
+    # Model data each CourseSerializer field reads. Entries naming a prefetched
+    # relation select that prefetch; the rest are column paths for only().
+    SERIALIZER_FIELD_SOURCES = {
+        'department': ['department__code', 'department__name'],
+        'course_number': ['course_number'],
+        'title': ['title'],
+        'description': ['description'],
+        'credits': ['credits'],
+        'is_active': ['is_active'],
+        'terms_offered': ['terms_offered'],
+        'full_code': ['department__code', 'course_number'],
+        'prerequisites': ['prerequisites'],
+        'prerequisite_groups': ['prerequisite_groups'],
+        'corequisites': ['corequisites'],
+        'antirequisites': ['antirequisites'],
+        'restricted_to_majors': ['restricted_to_majors'],
+        'created_by': ['created_by__username'],
+        'last_modified': ['last_modified'],
+        'last_modified_by': ['last_modified_by__username'],
+    }
+    
+    @classmethod
+    def serializer_projection(cls, fields, prefix='', nested_prerequisites=False):
+        """
+        Loading plan for a sparse CourseSerializer rendering only ``fields``.
+        
+        Returns:
+            Tuple of (only, select_related, prefetches), rooted at ``prefix``
+        """
+        sources = {source for field in fields for source in cls.SERIALIZER_FIELD_SOURCES.get(field, ())}
+        prefetches = []
+        for prefetch in cls.serializer_prefetches(prefix, nested_prerequisites):
+            relation = prefetch.prefetch_through[len(prefix):]
+            if relation in sources:
+                prefetches.append(prefetch)
+            sources.discard(relation)
+        related = sorted({source.split('__')[0] for source in sources if '__' in source})
+        only = [prefix + name for name in ['id', *sorted(sources), *related]]
+        return only, [prefix + name for name in related], prefetches
+    
+    def with_serializer_fields(self, fields, nested_prerequisites=False):
+        """Load only what a CourseSerializer limited to ``fields`` renders"""
+        only, select_related, prefetches = self.serializer_projection(
+            fields, nested_prerequisites=nested_prerequisites
+        )
+        return self.only(*only).select_related(*select_related).prefetch_related(*prefetches)
+
+
 class Course(models.Model):
     """Represents a university course"""
     TERM_CHOICES = [
@@ -35,9 +125,18 @@ class Course(models.Model):
     last_modified = models.DateTimeField(auto_now=True)
     last_modified_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='modified_courses')
     
+    objects = CourseQuerySet.as_manager()
+    
     class Meta:
         unique_together = ['department', 'course_number']
         ordering = ['department__code', 'course_number']
+        indexes = [
+            # Catalog pages and department filters only read active courses
+            models.Index(
+                fields=['department', 'course_number'], condition=models.Q(is_active=True),
+                name='course_active_dept_number_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.department.code} {self.course_number} - {self.title}"
@@ -46,6 +145,9 @@ class Course(models.Model):
     def full_code(self):
         return f"{self.department.code} {self.course_number}"
     
+    # The relation helpers below only use .all() so they are served from
+    # CourseQuerySet.with_serializer_relations() prefetches when present.
+    
     def get_prerequisites(self):
         """Get all prerequisite courses"""
         return [prereq.prerequisite_course for prereq in self.prerequisites.all()]
@@ -174,6 +276,10 @@ class CourseOffering(models.Model):
     class Meta:
         unique_together = ['course', 'semester', 'year', 'section']
         ordering = ['year', 'semester', 'course__department__code', 'course__course_number']
+        indexes = [
+            # Term filters and the offering list's keyset order
+            models.Index(fields=['year', 'semester', 'course', 'section'], name='offering_term_idx'),
+        ]
     
     def __str__(self):
         return f"{self.course.full_code} - {self.semester.title()} {self.year} ({self.section})"
@@ -226,7 +332,7 @@ class ProgramType(models.Model):
         return self.display_name
 
 
-class Program(models.Model):
+class Program(VersionCounterMixin, models.Model):
     """Represents an academic program (e.g., Mathematics Major, Computer Science Minor)"""
     name = models.CharField(max_length=200, unique=True)
     program_type = models.ForeignKey(ProgramType, on_delete=models.CASCADE, related_name='programs')
@@ -244,6 +350,7 @@ class Program(models.Model):
     honours_available = models.BooleanField(default=False)
     
     is_active = models.BooleanField(default=True)
+    requirements_version = models.PositiveIntegerField(default=0, help_text="Bumped whenever requirements, course requirements or constraints change")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -252,6 +359,39 @@ class Program(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.program_type.display_name})"
+    
+    VERSION_FIELDS = ('requirements_version',)
+    
+    # Program fields the compiled requirement evaluator embeds (see schedules.services)
+    COMPILED_FIELDS = {'name', 'code', 'total_credits_required'}
+    
+    def save(self, *args, **kwargs):
+        if self._state.adding or kwargs.get('force_insert'):
+            return super().save(*args, **kwargs)
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            update_fields = self.get_unversioned_fields()
+        bump = (
+            'requirements_version' not in update_fields
+            and not self.COMPILED_FIELDS.isdisjoint(update_fields)
+        )
+        if bump:
+            # Invalidate compiled evaluators in the same UPDATE
+            self.requirements_version = models.F('requirements_version') + 1
+            update_fields = [*update_fields, 'requirements_version']
+        kwargs['update_fields'] = update_fields
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            if bump:
+                # Deferred: the bumped value loads from the database when it is next read
+                del self.requirements_version
+    
+    @classmethod
+    def bump_requirements_version(cls, **filters):
+        """Invalidate compiled requirement evaluators for the matching programs"""
+        cls.objects.filter(**filters).update(requirements_version=models.F('requirements_version') + 1)
 
 
 class ProgramRequirement(models.Model):
@@ -346,4 +486,15 @@ class ProgramConstraint(models.Model):
         ordering = ['program', 'constraint_type', 'name']
     
     def __str__(self):
-        return f"{self.program.name} - {self.name}"
\ No newline at end of file
+        return f"{self.program.name} - {self.name}"
+
+class CatalogVersion(models.Model):
+    """
+    Single-row counter bumped on every catalog write.
+    Used as the ETag of catalog responses and as a key for server-side caches.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"Catalog v{self.version}"
@@ -0,0 +1,217 @@
+"""
+Keyset (cursor) pagination for catalog endpoints.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from functools import reduce
+from django.core.cache import cache
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from .versioning import get_catalog_version
+
+
+COUNT_CACHE_TIMEOUT = 60 * 60
+
+
+def cached_count(queryset):
+    """
+    Count a catalog queryset once per catalog version and filter set.
+
+    The key includes the catalog version, so any catalog write invalidates it.
+    """
+    sql = str(queryset.order_by().query)
+    key = 'courses:count:{}:{}'.format(
+        get_catalog_version()[0], hashlib.md5(sql.encode()).hexdigest()
+    )
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a unique composite ordering key.
+
+    Pages are selected with a WHERE on the key instead of OFFSET, so a deep page
+    costs the same as the first one. The total count is only computed when
+    ``include_total`` is requested, and is then served from cache.
+    """
+    ordering = ()
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    total_query_param = 'include_total'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        key, reverse = cursor if cursor else (None, False)
+
+        self.count = None
+        if request.query_params.get(self.total_query_param):
+            self.count = cached_count(queryset)
+
+        queryset = queryset.order_by(*[f'-{field}' if reverse else field for field in self.ordering])
+        if key is not None:
+            queryset = queryset.filter(self.key_filter(key, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        # Walking backwards always starts from a page that has a successor
+        self.has_next = has_more if not reverse else key is not None
+        self.has_previous = has_more if reverse else key is not None
+        self.first_key = self.instance_key(results[0]) if results else None
+        self.last_key = self.instance_key(results[-1]) if results else None
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def key_filter(self, key, reverse):
+        """Build ``(a, b, c) > (x, y, z)`` as nested ORs that any backend can use"""
+        lookup = 'lt' if reverse else 'gt'
+        clauses = []
+        for index, field in enumerate(self.ordering):
+            equal = {f: value for f, value in zip(self.ordering[:index], key[:index])}
+            clauses.append(Q(**equal, **{f'{field}__{lookup}': key[index]}))
+        return reduce(lambda left, right: left | right, clauses)
+
+    def instance_key(self, instance):
+        key = []
+        for field in self.ordering:
+            value = instance
+            for attribute in field.split('__'):
+                value = getattr(value, attribute)
+            key.append(value)
+        return key
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            key, reverse = cursor['k'], bool(cursor.get('r'))
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(key, list) or len(key) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return key, reverse
+
+    def encode_cursor(self, key, reverse=False):
+        cursor = {'k': key, 'r': 1} if reverse else {'k': key}
+        return base64.urlsafe_b64encode(json.dumps(cursor, separators=(',', ':')).encode()).decode()
+
+    def get_next_cursor(self):
+        if not self.has_next or self.last_key is None:
+            return None
+        return self.encode_cursor(self.last_key)
+
+    def get_previous_cursor(self):
+        if not self.has_previous or self.first_key is None:
+            return None
+        return self.encode_cursor(self.first_key, reverse=True)
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self.get_link(self.get_next_cursor())
+
+    def get_previous_link(self):
+        return self.get_link(self.get_previous_cursor())
+
+    def get_paginated_response(self, data):
+        response = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+
+class CourseKeysetPagination(KeysetPagination):
+    ordering = ('department__code', 'course_number')
+
+
+class CourseOfferingKeysetPagination(KeysetPagination):
+    ordering = ('year', 'semester', 'course_id', 'section')
+
+
+class OptionalKeysetPaginationMixin:
+    """
+    View mixin that pages lists by number (``pagination_class``) by default and by
+    keyset (``keyset_pagination_class``) once a ``cursor`` parameter is sent, empty
+    for the first page. Numbered responses keep ``count`` and page navigation.
+    """
+    keyset_pagination_class = None
+
+    def get_pagination_class(self):
+        keyset = self.keyset_pagination_class
+        if keyset is not None and keyset.cursor_query_param in self.request.query_params:
+            return keyset
+        return self.pagination_class
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            pagination_class = self.get_pagination_class()
+            self._paginator = None if pagination_class is None else pagination_class()
+        return self._paginator
+
+
+class RankedSearchPagination(PageNumberPagination):
+    """
+    Numbered pages over ranked search results.
+
+    The view supplies the ranked course ids as ``search_ids``; the queryset is
+    only used to drop ids excluded by other filters and to load the current page.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        matching = set(queryset.prefetch_related(None).values_list('id', flat=True))
+        ranked_ids = [pk for pk in view.search_ids if pk in matching]
+        page = super().paginate_queryset(ranked_ids, request, view)
+        if page is None:
+            return None
+        courses = queryset.in_bulk(page)
+        return [courses[pk] for pk in page]
@@ -0,0 +1,192 @@
+"""
+Full-text course search.
+
+Courses are indexed by code, title and description in a side table that the
+database searches natively: an FTS5 virtual table on SQLite and a weighted
+tsvector with a GIN index on PostgreSQL. The index is kept in sync by signals
+(see courses.signals); bulk writes that bypass signals should call
+rebuild_search_index().
+"""
+
+import re
+from django.db import connection as default_connection
+
+
+SEARCH_TABLE = 'courses_course_search'
+
+# Upper bound on ranked matches returned for one query
+SEARCH_RESULT_LIMIT = 1000
+
+# Most matches bm25() ranks per query on SQLite. Scoring costs about 1.5 us per
+# match, so a term found in most descriptions would otherwise take ~80 ms over
+# 50k courses. Above the budget only code and title hits are ranked, followed
+# by the remaining matches in catalog order.
+SQLITE_RANKING_BUDGET = 2000
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Column weights for bm25()/ts_rank(): code, title, description
+_SQLITE_WEIGHTS = (10.0, 5.0, 1.0)
+
+# INSERT ... SELECT producing the index rows for courses joined to their department
+_DOCUMENT_SQL = {
+    'sqlite': (
+        "(rowid, code, title, description) "
+        "SELECT c.id, d.code || ' ' || c.course_number || ' ' || d.code || c.course_number, "
+        "c.title, c.description "
+        "FROM courses_course c JOIN courses_department d ON d.id = c.department_id"
+    ),
+    'postgresql': (
+        "(course_id, document) SELECT c.id, "
+        "setweight(to_tsvector('simple', d.code || ' ' || c.course_number || ' ' || d.code || c.course_number), 'A') || "
+        "setweight(to_tsvector('simple', c.title), 'B') || "
+        "setweight(to_tsvector('simple', c.description), 'C') "
+        "FROM courses_course c JOIN courses_department d ON d.id = c.department_id"
+    ),
+}
+
+
+def is_search_supported(connection=None):
+    connection = connection or default_connection
+    return connection.vendor in _DOCUMENT_SQL
+
+
+def create_search_index(connection=None):
+    """Create the search table and fill it from the catalog"""
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                "code, title, description, tokenize='unicode61', prefix='2 3')"
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+                "course_id integer PRIMARY KEY REFERENCES courses_course(id) ON DELETE CASCADE "
+                "DEFERRABLE INITIALLY DEFERRED, document tsvector NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)"
+            )
+        else:
+            return
+    rebuild_search_index(connection)
+
+
+def drop_search_index(connection=None):
+    connection = connection or default_connection
+    if is_search_supported(connection):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def rebuild_search_index(connection=None):
+    """Re-index every course; use after bulk writes that skip signals"""
+    connection = connection or default_connection
+    if not is_search_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} {_DOCUMENT_SQL[connection.vendor]}")
+
+
+def index_courses(course_ids=None, department_id=None):
+    """Refresh the index entries of the given courses or of a whole department"""
+    if not is_search_supported():
+        return
+    if department_id is not None:
+        condition, params = 'c.department_id = %s', [department_id]
+    else:
+        course_ids = list(course_ids)
+        if not course_ids:
+            return
+        condition, params = 'c.id IN ({})'.format(', '.join(['%s'] * len(course_ids))), course_ids
+
+    with default_connection.cursor() as cursor:
+        key = 'rowid' if default_connection.vendor == 'sqlite' else 'course_id'
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE {key} IN "
+            f"(SELECT c.id FROM courses_course c WHERE {condition})",
+            params
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} {_DOCUMENT_SQL[default_connection.vendor]} WHERE {condition}",
+            params
+        )
+
+
+def unindex_course(course_id):
+    if not is_search_supported():
+        return
+    key = 'rowid' if default_connection.vendor == 'sqlite' else 'course_id'
+    with default_connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {key} = %s", [course_id])
+
+
+def search_course_ids(text, limit=SEARCH_RESULT_LIMIT):
+    """
+    Search the catalog, matching every word of ``text`` as a prefix.
+
+    Returns:
+        List of course ids, best match first. Code matches outrank title
+        matches, which outrank description matches.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return []
+
+    if default_connection.vendor == 'sqlite':
+        return _search_course_ids_sqlite(' '.join(f'"{token}"*' for token in tokens), limit)
+    if default_connection.vendor == 'postgresql':
+        return _search_course_ids_postgresql(' & '.join(f"'{token}':*" for token in tokens), limit)
+    return _search_course_ids_fallback(tokens, limit)
+
+
+def _search_course_ids_sqlite(match, limit):
+    ranked_sql = (
+        f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+        f"ORDER BY bm25({SEARCH_TABLE}, %s, %s, %s) LIMIT %s"
+    )
+    with default_connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s LIMIT %s",
+            [match, SQLITE_RANKING_BUDGET + 1]
+        )
+        matches = [row[0] for row in cursor.fetchall()]
+        if len(matches) <= SQLITE_RANKING_BUDGET:
+            if not matches:
+                return []
+            cursor.execute(ranked_sql, [match, *_SQLITE_WEIGHTS, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+        cursor.execute(ranked_sql, [f'{{code title}} : ({match})', *_SQLITE_WEIGHTS, limit])
+        ranked = [row[0] for row in cursor.fetchall()]
+
+    seen = set(ranked)
+    ranked.extend(pk for pk in matches if pk not in seen)
+    return ranked[:limit]
+
+
+def _search_course_ids_postgresql(tsquery, limit):
+    with default_connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT course_id FROM {SEARCH_TABLE}, to_tsquery('simple', %s) query "
+            f"WHERE document @@ query ORDER BY ts_rank(document, query) DESC, course_id LIMIT %s",
+            [tsquery, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_course_ids_fallback(tokens, limit):
+    """Unranked substring search for backends without a native index"""
+    from django.db.models import Q
+    from .models import Course
+
+    queryset = Course.objects.order_by()
+    for token in tokens:
+        queryset = queryset.filter(
+            Q(department__code__icontains=token) | Q(course_number__icontains=token) |
+            Q(title__icontains=token) | Q(description__icontains=token)
+        )
+    return list(queryset.values_list('id', flat=True)[:limit])
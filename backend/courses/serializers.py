@@ -1,10 +1,14 @@
+from django.db import models
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from .models import (
     Department, Course, Prerequisite, DegreeProgram, DegreeRequirement,
     CourseRequirement, CourseOffering, TimeSlot, ProgramType, Program, 
     ProgramRequirement, ProgramCourseRequirement, ProgramConstraint
 )
-from .services import PrerequisiteValidator
+from .compact import SideloadMixin
+from .fieldsets import SparseFieldsetMixin
+from .services import PrerequisiteValidator, ProgramRequirementTree
 
 
 class DepartmentSerializer(serializers.ModelSerializer):
@@ -13,7 +17,9 @@ class DepartmentSerializer(serializers.ModelSerializer):
         fields = ['id', 'code', 'name']
 
 
-class DegreeProgramSerializer(serializers.ModelSerializer):
+class DegreeProgramSerializer(SideloadMixin, serializers.ModelSerializer):
+    SIDELOADED_FIELDS = {'department': 'departments'}
+    
     department = DepartmentSerializer(read_only=True)
     department_id = serializers.IntegerField(write_only=True)
     
@@ -25,7 +31,9 @@ class DegreeProgramSerializer(serializers.ModelSerializer):
         ]
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SideloadMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    SIDELOADED_FIELDS = {'department': 'departments', 'restricted_to_majors': 'programs'}
+    
     department = DepartmentSerializer(read_only=True)
     department_id = serializers.IntegerField(write_only=True)
     full_code = serializers.ReadOnlyField()
@@ -66,7 +74,9 @@ class CourseSerializer(serializers.ModelSerializer):
         return [{'id': antireq.id, 'full_code': antireq.full_code, 'title': antireq.title} for antireq in obj.get_antirequisites()]
 
 
-class PrerequisiteSerializer(serializers.ModelSerializer):
+class PrerequisiteSerializer(SideloadMixin, serializers.ModelSerializer):
+    SIDELOADED_FIELDS = {'course': 'courses', 'prerequisite_course': 'courses'}
+    
     course = CourseSerializer(read_only=True)
     prerequisite_course = CourseSerializer(read_only=True)
     course_id = serializers.IntegerField(write_only=True)
@@ -85,6 +95,16 @@ class ProgramTypeSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'display_name', 'description']
 
 
+class ProgramListSerializer(serializers.ListSerializer):
+    """Loads the requirement trees and constraints of every program on the page up front"""
+    
+    def to_representation(self, data):
+        programs = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        prefetch_related_objects(programs, 'program_type', 'department', 'constraints')
+        self.context['requirement_tree'] = ProgramRequirementTree(program.id for program in programs)
+        return super().to_representation(programs)
+
+
 class ProgramSerializer(serializers.ModelSerializer):
     program_type = ProgramTypeSerializer(read_only=True)
     program_type_id = serializers.IntegerField(write_only=True)
@@ -101,9 +121,13 @@ class ProgramSerializer(serializers.ModelSerializer):
             'total_credits_required', 'co_op_available', 'honours_available',
             'is_active', 'created_at', 'updated_at', 'requirements', 'constraints'
         ]
+        list_serializer_class = ProgramListSerializer
 
     def get_requirements(self, obj):
-        return ProgramRequirementSerializer(obj.requirements.all(), many=True).data
+        tree = self.context.get('requirement_tree') or ProgramRequirementTree([obj.id])
+        return ProgramRequirementSerializer(
+            tree.get_requirements(obj.id), many=True, context={'requirement_tree': tree}
+        ).data
 
     def get_constraints(self, obj):
         return ProgramConstraintSerializer(obj.constraints.all(), many=True).data
@@ -131,10 +155,20 @@ class ProgramRequirementSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
     def get_course_requirements(self, obj):
-        return ProgramCourseRequirementSerializer(obj.course_requirements.all(), many=True).data
+        tree = self.context.get('requirement_tree')
+        if tree is None:
+            course_requirements = obj.course_requirements.all()
+        else:
+            course_requirements = tree.get_course_requirements(obj.id)
+        return ProgramCourseRequirementSerializer(course_requirements, many=True).data
 
     def get_sub_requirements(self, obj):
-        return ProgramRequirementSerializer(obj.sub_requirements.all(), many=True).data
+        tree = self.context.get('requirement_tree')
+        if tree is None:
+            return ProgramRequirementSerializer(obj.sub_requirements.all(), many=True).data
+        return ProgramRequirementSerializer(
+            tree.get_sub_requirements(obj.id), many=True, context=self.context
+        ).data
 
 
 class ProgramCourseRequirementSerializer(serializers.ModelSerializer):
@@ -184,7 +218,9 @@ class TimeSlotSerializer(serializers.ModelSerializer):
         ]
 
 
-class CourseOfferingSerializer(serializers.ModelSerializer):
+class CourseOfferingSerializer(SideloadMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    SIDELOADED_FIELDS = {'course': 'courses'}
+    
     course = CourseSerializer(read_only=True)
     course_id = serializers.IntegerField(write_only=True)
     time_slots = TimeSlotSerializer(many=True, read_only=True)
@@ -198,23 +234,42 @@ class CourseOfferingSerializer(serializers.ModelSerializer):
         ]
 
 
+class CourseEligibilityListSerializer(serializers.ListSerializer):
+    """Computes eligibility for the whole page in one batch before serializing rows"""
+    
+    def to_representation(self, data):
+        courses = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        validator = self.child.get_validator()
+        if validator is not None:
+            validator.prime(courses)
+        return super().to_representation(courses)
+
+
 class CourseWithPrerequisitesSerializer(CourseSerializer):
     prerequisites = PrerequisiteSerializer(many=True, read_only=True)
     can_take = serializers.SerializerMethodField()
     missing_prerequisites = serializers.SerializerMethodField()
     
+    def get_validator(self):
+        """One PrerequisiteValidator per request, shared through the serializer context"""
+        if 'prerequisite_validator' not in self.context:
+            request = self.context.get('request')
+            validator = None
+            if request and hasattr(request.user, 'student_profile'):
+                validator = PrerequisiteValidator(request.user.student_profile)
+            self.context['prerequisite_validator'] = validator
+        return self.context['prerequisite_validator']
+    
     def get_can_take(self, obj):
-        request = self.context.get('request')
-        if request and hasattr(request.user, 'student_profile'):
-            validator = PrerequisiteValidator(request.user.student_profile)
+        validator = self.get_validator()
+        if validator is not None:
             can_take, _ = validator.can_take_course(obj)
             return can_take
         return False
     
     def get_missing_prerequisites(self, obj):
-        request = self.context.get('request')
-        if request and hasattr(request.user, 'student_profile'):
-            validator = PrerequisiteValidator(request.user.student_profile)
+        validator = self.get_validator()
+        if validator is not None:
             _, missing = validator.can_take_course(obj)
             return missing
         return []
@@ -223,6 +278,7 @@ class CourseWithPrerequisitesSerializer(CourseSerializer):
         fields = CourseSerializer.Meta.fields + [
             'prerequisites', 'can_take', 'missing_prerequisites'
         ]
+        list_serializer_class = CourseEligibilityListSerializer
 
 
 class CourseRecommendationSerializer(serializers.Serializer):
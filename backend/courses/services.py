@@ -1,7 +1,9 @@
 from collections import defaultdict, deque
 from typing import List, Set, Dict, Tuple
 from django.db.models import Q
-from .models import Course, Prerequisite
+from users.models import CompletedCourse
+from .models import Course, CourseQuerySet, Prerequisite, ProgramRequirement, ProgramCourseRequirement
+from .snapshot import get_catalog_snapshot
 
 
 class PrerequisiteValidator:
@@ -10,14 +12,21 @@ class PrerequisiteValidator:
     Implements topological sorting and cycle detection for prerequisite chains.
     """
     
-    def __init__(self, student_profile):
+    def __init__(self, student_profile, completed_courses=None):
         self.student = student_profile
-        from users.models import CompletedCourse
-        self.completed_courses = set(
-            student_profile.completed_courses
-            .filter(grade__in=['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'P'])
-            .values_list('course_id', flat=True)
-        )
+        if completed_courses is None:
+            completed_courses = self.passed_course_ids(student_profile)
+        self.completed_courses = set(completed_courses)
+        
+        # Memoized can_take_course() results keyed by course ID
+        self._eligibility = {}
+    
+    @staticmethod
+    def passed_course_ids(student_profile):
+        """IDs of the courses the student passed (a values_list queryset, also usable with async for)"""
+        return student_profile.completed_courses.filter(
+            grade__in=CompletedCourse.PASSING_GRADES
+        ).values_list('course_id', flat=True)
     
     def can_take_course(self, course: Course) -> Tuple[bool, List[str]]:
         """
@@ -26,18 +35,58 @@ class PrerequisiteValidator:
         Returns:
             Tuple of (can_take: bool, missing_prerequisites: List[str])
         """
-        missing_prerequisites = []
-        
-        # Get all prerequisites for this course
-        prerequisites = course.prerequisites.all()
-        
-        for prereq in prerequisites:
-            if prereq.prerequisite_course.id not in self.completed_courses:
-                missing_prerequisites.append(prereq.prerequisite_course.full_code)
+        if course.id not in self._eligibility:
+            # Get all prerequisites for this course
+            prerequisites = course.prerequisites.all()
+            self._eligibility[course.id] = self._check_prerequisites(
+                (prereq.prerequisite_course.id, prereq.prerequisite_course.full_code)
+                for prereq in prerequisites
+            )
+        return self._eligibility[course.id]
+    
+    def _check_prerequisites(self, prerequisites) -> Tuple[bool, List[str]]:
+        """Evaluate (course_id, full_code) prerequisite pairs against completed courses"""
+        missing_prerequisites = [
+            full_code for course_id, full_code in prerequisites
+            if course_id not in self.completed_courses
+        ]
         
         can_take = len(missing_prerequisites) == 0
         return can_take, missing_prerequisites
     
+    def prime(self, courses: List[Course]):
+        """
+        Compute eligibility for a batch of courses up front.
+        Courses with prefetched prerequisites are evaluated from the prefetch cache;
+        the rest share a single query.
+        """
+        unfetched = []
+        for course in courses:
+            if course.id in self._eligibility:
+                continue
+            if 'prerequisites' in getattr(course, '_prefetched_objects_cache', {}):
+                self.can_take_course(course)
+            else:
+                unfetched.append(course.id)
+        
+        if not unfetched:
+            return
+        
+        prerequisites = defaultdict(list)
+        for course_id, prereq_id, department_code, course_number in (
+            Prerequisite.objects
+            .filter(course_id__in=unfetched)
+            .order_by('id')
+            .values_list(
+                'course_id', 'prerequisite_course_id',
+                'prerequisite_course__department__code', 'prerequisite_course__course_number'
+            )
+        ):
+            prerequisites[course_id].append((prereq_id, f"{department_code} {course_number}"))
+        
+        for course_id in unfetched:
+            self._eligibility[course_id] = self._check_prerequisites(prerequisites[course_id])
+    
     def get_available_courses(self, courses: List[Course] = None) -> List[Course]:
         """
         Get all courses that a student can take (prerequisites satisfied).
@@ -51,6 +100,9 @@ class PrerequisiteValidator:
         if courses is None:
             courses = Course.objects.filter(is_active=True)
         
+        courses = list(courses)
+        self.prime(courses)
+        
         available_courses = []
         for course in courses:
             can_take, _ = self.can_take_course(course)
@@ -62,10 +114,16 @@ class PrerequisiteValidator:
     def get_prerequisite_chain(self, course: Course) -> Dict[str, List[str]]:
         """
         Get the complete prerequisite chain for a course using BFS.
+        The catalog snapshot answers without queries; the database is walked
+        while the snapshot is missing or stale.
         
         Returns:
             Dictionary with course codes as keys and their prerequisites as values
         """
+        snapshot = get_catalog_snapshot()
+        if snapshot is not None:
+            return snapshot.prerequisite_chain(course.id)
+        
         chain = defaultdict(list)
         visited = set()
         queue = deque([course])
@@ -164,12 +222,14 @@ class PrerequisiteValidator:
         
         return result
     
-    def get_recommended_course_sequence(self, target_course: Course = None) -> List[Dict]:
+    def get_recommended_course_sequence(self, target_course: Course = None, courses: List[Course] = None) -> List[Dict]:
         """
         Get a recommended sequence of courses for a student.
         
         Args:
             target_course: Optional target course to work towards
+            courses: Optional candidate courses for general recommendations
+                (e.g. with prefetched serializer relations). If None, all active courses.
         
         Returns:
             List of course recommendations with metadata
@@ -179,7 +239,7 @@ class PrerequisiteValidator:
             return self._get_path_to_course(target_course)
         else:
             # Get general recommendations based on completed courses
-            return self._get_general_recommendations()
+            return self._get_general_recommendations(courses)
     
     def _get_path_to_course(self, target_course: Course) -> List[Dict]:
         """Get the optimal path to a target course"""
@@ -221,9 +281,9 @@ class PrerequisiteValidator:
         
         return []
     
-    def _get_general_recommendations(self) -> List[Dict]:
+    def _get_general_recommendations(self, courses: List[Course] = None) -> List[Dict]:
         """Get general course recommendations"""
-        available_courses = self.get_available_courses()
+        available_courses = self.get_available_courses(courses)
         
         recommendations = []
         for course in available_courses:
@@ -274,3 +334,43 @@ class PrerequisiteValidator:
             return "High credit course"
         else:
             return "Available prerequisite"
+
+
+class ProgramRequirementTree:
+    """
+    Every requirement, course link and linked course of some programs, loaded in
+    a fixed number of queries and indexed so the requirement tree can be walked
+    (and serialized) without per-node queries.
+    """
+    
+    def __init__(self, program_ids):
+        program_ids = list(program_ids)
+        self.requirements = defaultdict(list)
+        self.sub_requirements = defaultdict(list)
+        self.course_requirements = defaultdict(list)
+        
+        # Default orderings match program.requirements, sub_requirements and course_requirements
+        for requirement in ProgramRequirement.objects.filter(program_id__in=program_ids):
+            self.requirements[requirement.program_id].append(requirement)
+            if requirement.parent_requirement_id is not None:
+                self.sub_requirements[requirement.parent_requirement_id].append(requirement)
+        
+        course_requirements = ProgramCourseRequirement.objects.filter(
+            requirement__program_id__in=program_ids
+        ).select_related(
+            *CourseQuerySet.serializer_select_related('course__')
+        ).prefetch_related(
+            *CourseQuerySet.serializer_prefetches('course__')
+        )
+        for course_requirement in course_requirements:
+            self.course_requirements[course_requirement.requirement_id].append(course_requirement)
+    
+    def get_requirements(self, program_id) -> List[ProgramRequirement]:
+        """All requirements of a program, nested ones included"""
+        return self.requirements[program_id]
+    
+    def get_sub_requirements(self, requirement_id) -> List[ProgramRequirement]:
+        return self.sub_requirements[requirement_id]
+    
+    def get_course_requirements(self, requirement_id) -> List[ProgramCourseRequirement]:
+        return self.course_requirements[requirement_id]
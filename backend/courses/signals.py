@@ -0,0 +1,74 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from .models import (
+    Department, Course, PrerequisiteGroup, Prerequisite, DegreeProgram, DegreeRequirement,
+    CourseRequirement, CourseOffering, TimeSlot, Program, ProgramRequirement,
+    ProgramCourseRequirement, ProgramConstraint
+)
+from .search import index_courses, unindex_course
+from .versioning import bump_catalog_version_on_commit
+
+
+@receiver(post_save, sender=ProgramRequirement)
+@receiver(post_delete, sender=ProgramRequirement)
+@receiver(post_save, sender=ProgramConstraint)
+@receiver(post_delete, sender=ProgramConstraint)
+def bump_version_for_program_rule(sender, instance, **kwargs):
+    Program.bump_requirements_version(pk=instance.program_id)
+
+
+@receiver(post_save, sender=ProgramCourseRequirement)
+@receiver(post_delete, sender=ProgramCourseRequirement)
+def bump_version_for_course_requirement(sender, instance, **kwargs):
+    Program.bump_requirements_version(requirements__id=instance.requirement_id)
+
+
+@receiver(post_save, sender=Course)
+def bump_version_for_course(sender, instance, created, **kwargs):
+    """Compiled evaluators embed course codes, titles and credits"""
+    if not created:
+        Program.bump_requirements_version(requirements__course_requirements__course=instance)
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=PrerequisiteGroup)
+@receiver(post_delete, sender=PrerequisiteGroup)
+@receiver(post_save, sender=Prerequisite)
+@receiver(post_delete, sender=Prerequisite)
+@receiver(post_save, sender=DegreeProgram)
+@receiver(post_delete, sender=DegreeProgram)
+@receiver(post_save, sender=DegreeRequirement)
+@receiver(post_delete, sender=DegreeRequirement)
+@receiver(post_save, sender=CourseRequirement)
+@receiver(post_delete, sender=CourseRequirement)
+@receiver(post_save, sender=CourseOffering)
+@receiver(post_delete, sender=CourseOffering)
+@receiver(post_save, sender=TimeSlot)
+@receiver(post_delete, sender=TimeSlot)
+@receiver(m2m_changed, sender=Course.corequisites.through)
+@receiver(m2m_changed, sender=Course.antirequisites.through)
+@receiver(m2m_changed, sender=Course.restricted_to_majors.through)
+def bump_catalog_version_for_write(sender, **kwargs):
+    """Any write to catalog data invalidates cached catalog responses"""
+    if kwargs.get('action', 'post_').startswith('post_'):
+        bump_catalog_version_on_commit()
+
+
+@receiver(post_save, sender=Course)
+def index_course(sender, instance, **kwargs):
+    index_courses([instance.pk])
+
+
+@receiver(post_delete, sender=Course)
+def unindex_deleted_course(sender, instance, **kwargs):
+    unindex_course(instance.pk)
+
+
+@receiver(post_save, sender=Department)
+def reindex_department(sender, instance, created, **kwargs):
+    """Department codes are part of every course code in the index"""
+    if not created:
+        index_courses(department_id=instance.pk)
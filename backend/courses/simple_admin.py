@@ -5,48 +5,62 @@ from rest_framework.permissions import AllowAny
 from django.db import transaction
 from .models import Course, Department, DegreeProgram, Prerequisite
 from .serializers import CourseSerializer, DepartmentSerializer, DegreeProgramSerializer
+from .pagination import CourseKeysetPagination, cached_count
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def simple_admin_courses(request):
-    """Simple admin courses endpoint for testing"""
-    # Get pagination parameters
-    page = int(request.GET.get('page', 1))
-    page_size = int(request.GET.get('page_size', 50))  # Default 50 courses per page
+    """
+    Simple admin courses endpoint for testing
+    
+    Pages by number by default; pass ``cursor`` (empty for the first page) to page
+    by keyset instead, which keeps deep pages as cheap as the first.
+    """
     department_filter = request.GET.get('department', '')
     
     # Build optimized query
-    courses_query = Course.objects.select_related('department').prefetch_related(
-        'prerequisites__prerequisite_course__department',
-        'prerequisite_groups',
-        'corequisites__department',
-        'antirequisites__department',
-        'restricted_to_majors'
-    ).order_by('department__code', 'course_number')
+    courses_query = Course.objects.with_serializer_relations().order_by('department__code', 'course_number')
     
     # Apply department filter if provided
     if department_filter:
         courses_query = courses_query.filter(department__code=department_filter)
     
-    # Get total count
-    total_count = courses_query.count()
-    
-    # Apply pagination
-    start = (page - 1) * page_size
-    end = start + page_size
-    courses = courses_query[start:end]
+    if 'cursor' in request.GET:
+        paginator = CourseKeysetPagination()
+        paginator.page_size = 50
+        courses = paginator.paginate_queryset(courses_query, request)
+        pagination = {
+            'page_size': paginator.page_size,
+            'next_cursor': paginator.get_next_cursor(),
+            'previous_cursor': paginator.get_previous_cursor(),
+        }
+        if paginator.count is not None:
+            pagination['total_count'] = paginator.count
+    else:
+        # Get pagination parameters
+        page = int(request.GET.get('page', 1))
+        page_size = int(request.GET.get('page_size', 50))  # Default 50 courses per page
+        
+        # Get total count (cached per catalog version)
+        total_count = cached_count(courses_query)
+        
+        # Apply pagination
+        start = (page - 1) * page_size
+        end = start + page_size
+        courses = courses_query[start:end]
+        pagination = {
+            'page': page,
+            'page_size': page_size,
+            'total_count': total_count,
+            'total_pages': (total_count + page_size - 1) // page_size
+        }
     
     serializer = CourseSerializer(courses, many=True)
     
     return Response({
         'success': True,
         'courses': serializer.data,
-        'pagination': {
-            'page': page,
-            'page_size': page_size,
-            'total_count': total_count,
-            'total_pages': (total_count + page_size - 1) // page_size
-        },
+        'pagination': pagination,
         'message': 'This is a test endpoint - no authentication required'
     }, status=status.HTTP_200_OK)
 
@@ -0,0 +1,286 @@
+"""
+Memory-mapped catalog snapshot.
+
+``manage.py build_catalog_snapshot`` writes the catalog into one binary file of
+fixed-width arrays: departments, courses, the prerequisite graph in CSR form
+(``indptr``/``indices``) and a weekly occupancy bitmap per offering. Workers
+map the file read-only, so lookups read straight from the page cache and every
+process on the host shares the same pages.
+
+The header records the catalog version the file was built from. Requests
+never rebuild the file: while it is missing or stale get_catalog_snapshot()
+returns None and callers read the database. Every catalog write queues the
+catalog.build_snapshot task when it commits (see
+courses.versioning.bump_catalog_version), which rebuilds the file out of band.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left
+from collections import deque
+from django.conf import settings
+from django.db import connection
+from .models import CatalogVersion, Course, CourseOffering, Department, Prerequisite, TimeSlot
+from .versioning import get_catalog_version
+
+
+MAGIC = b'UPCS'
+FORMAT_VERSION = 3
+
+# magic, format version, catalog version, database fingerprint,
+# departments, courses, prerequisite edges, offerings, string bytes
+HEADER = struct.Struct('<4sIQ16sIIIII')
+
+# Occupancy bitmaps cover the week in 5 minute slots
+OCCUPANCY_SLOT_MINUTES = 5
+OCCUPANCY_SLOTS_PER_DAY = 24 * 60 // OCCUPANCY_SLOT_MINUTES
+OCCUPANCY_BYTES = 7 * OCCUPANCY_SLOTS_PER_DAY // 8
+
+DAYS = [day for day, _ in TimeSlot.DAYS_OF_WEEK]
+
+_DEFAULT_PATH = os.path.join(settings.BASE_DIR, 'catalog.snapshot')
+
+
+class SnapshotFormatError(Exception):
+    """The file is not a snapshot this code can read"""
+
+
+def snapshot_path():
+    return str(getattr(settings, 'CATALOG_SNAPSHOT_PATH', _DEFAULT_PATH))
+
+
+def database_fingerprint():
+    """Identify the database a snapshot was built from, so test and dev databases never share one"""
+    name = f"{connection.vendor}:{connection.settings_dict['NAME']}"
+    return hashlib.md5(name.encode()).digest()
+
+
+def _sections(departments, courses, edges, offerings, string_bytes):
+    """(name, typecode, length) of each section, in file order"""
+    return [
+        ('department_ids', 'q', departments),
+        ('course_ids', 'q', courses),
+        ('offering_ids', 'q', offerings),
+        # Department codes, then course numbers
+        ('string_offsets', 'I', departments + courses + 1),
+        ('course_departments', 'I', courses),
+        ('prerequisite_indptr', 'I', courses + 1),
+        ('prerequisite_indices', 'I', edges),
+        ('offering_occupancy', 'B', offerings * OCCUPANCY_BYTES),
+        ('strings', 'B', string_bytes),
+    ]
+
+
+def _occupancy(time_slots):
+    """Bitmap of the 5 minute slots of the week the time slots touch (widened to slot boundaries)"""
+    bitmap = bytearray(OCCUPANCY_BYTES)
+    for day, start, end in time_slots:
+        base = DAYS.index(day) * OCCUPANCY_SLOTS_PER_DAY
+        first = (start.hour * 60 + start.minute) // OCCUPANCY_SLOT_MINUTES
+        last = -(-(end.hour * 60 + end.minute) // OCCUPANCY_SLOT_MINUTES)
+        for slot in range(base + first, base + last):
+            bitmap[slot >> 3] |= 1 << (slot & 7)
+    return bitmap
+
+
+def build_catalog_snapshot(path=None):
+    """
+    Write a snapshot of the current catalog to ``path`` (atomically replaced).
+
+    Returns:
+        The catalog version recorded in the snapshot
+    """
+    path = path or snapshot_path()
+    # Read before the catalog so concurrent writes can only make the snapshot look older
+    version = CatalogVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    departments = list(Department.objects.order_by('id').values_list('id', 'code'))
+    department_index = {pk: index for index, (pk, _) in enumerate(departments)}
+    courses = list(Course.objects.order_by('id').values_list('id', 'department_id', 'course_number'))
+    course_index = {pk: index for index, (pk, _, _) in enumerate(courses)}
+
+    sections = {name: array(typecode) for name, typecode, _ in _sections(0, 0, 0, 0, 0)}
+    strings = bytearray()
+    sections['string_offsets'].append(0)
+    for value in [code for _, code in departments] + [number for _, _, number in courses]:
+        strings += value.encode()
+        sections['string_offsets'].append(len(strings))
+    sections['strings'] = array('B', strings)
+
+    sections['department_ids'].extend(pk for pk, _ in departments)
+    for pk, department_id, _ in courses:
+        sections['course_ids'].append(pk)
+        sections['course_departments'].append(department_index[department_id])
+
+    prerequisites = [[] for _ in courses]
+    for course_id, prerequisite_id in Prerequisite.objects.order_by('course_id', 'id').values_list(
+        'course_id', 'prerequisite_course_id'
+    ):
+        prerequisites[course_index[course_id]].append(course_index[prerequisite_id])
+    sections['prerequisite_indptr'].append(0)
+    for indices in prerequisites:
+        sections['prerequisite_indices'].extend(indices)
+        sections['prerequisite_indptr'].append(len(sections['prerequisite_indices']))
+
+    time_slots = {}
+    for offering_id, day, start, end in TimeSlot.objects.values_list(
+        'offering_id', 'day_of_week', 'start_time', 'end_time'
+    ):
+        time_slots.setdefault(offering_id, []).append((day, start, end))
+    for pk in CourseOffering.objects.order_by('id').values_list('id', flat=True):
+        sections['offering_ids'].append(pk)
+        sections['offering_occupancy'].extend(_occupancy(time_slots.get(pk, ())))
+
+    counts = (
+        len(departments), len(courses), len(sections['prerequisite_indices']),
+        len(sections['offering_ids']), len(strings)
+    )
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.catalog-snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            output.write(HEADER.pack(MAGIC, FORMAT_VERSION, version, database_fingerprint(), *counts))
+            for name, _, _ in _sections(*counts):
+                output.write(b'\0' * (-output.tell() % 8))
+                output.write(sections[name].tobytes())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return version
+
+
+class CatalogSnapshot:
+    """Read-only view of a snapshot file; every array is a memoryview into the mapping"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if len(buffer) < HEADER.size:
+            raise SnapshotFormatError(f'{path} is truncated')
+        magic, format_version, self.catalog_version, self.fingerprint, *counts = HEADER.unpack_from(buffer)
+        if magic != MAGIC or format_version != FORMAT_VERSION or sys.byteorder != 'little':
+            raise SnapshotFormatError(f'{path} is not a catalog snapshot in format {FORMAT_VERSION}')
+
+        offset = HEADER.size
+        for name, typecode, length in _sections(*counts):
+            offset += -offset % 8
+            size = length * array(typecode).itemsize
+            if offset + size > len(buffer):
+                raise SnapshotFormatError(f'{path} is truncated')
+            setattr(self, name, buffer[offset:offset + size].cast(typecode))
+            offset += size
+
+    def is_current(self, catalog_version):
+        return (
+            self.catalog_version >= catalog_version and self.fingerprint == database_fingerprint()
+            and self.path == snapshot_path()
+        )
+
+    def _string(self, index):
+        return str(self.strings[self.string_offsets[index]:self.string_offsets[index + 1]], 'utf-8')
+
+    @staticmethod
+    def _find(ids, pk):
+        index = bisect_left(ids, pk)
+        return index if index < len(ids) and ids[index] == pk else None
+
+    def course_index(self, course_id):
+        return self._find(self.course_ids, course_id)
+
+    def department_code(self, index):
+        return self._string(index)
+
+    def course_code(self, index):
+        department = self.department_code(self.course_departments[index])
+        return f'{department} {self._string(len(self.department_ids) + index)}'
+
+    def prerequisite_indices_of(self, index):
+        return self.prerequisite_indices[self.prerequisite_indptr[index]:self.prerequisite_indptr[index + 1]]
+
+    def prerequisite_ids(self, course_id):
+        index = self.course_index(course_id)
+        if index is None:
+            return []
+        return [self.course_ids[prerequisite] for prerequisite in self.prerequisite_indices_of(index)]
+
+    def prerequisite_chain(self, course_id):
+        """Same result as PrerequisiteValidator.get_prerequisite_chain(), without queries"""
+        start = self.course_index(course_id)
+        chain = {}
+        visited = set()
+        queue = deque([start] if start is not None else [])
+        while queue:
+            index = queue.popleft()
+            if index in visited:
+                continue
+            visited.add(index)
+            for prerequisite in self.prerequisite_indices_of(index):
+                chain.setdefault(self.course_code(index), []).append(self.course_code(prerequisite))
+                if prerequisite not in visited:
+                    queue.append(prerequisite)
+        return chain
+
+    def occupancy(self, offering_id):
+        """
+        The offering's weekly occupancy bitmap as an int, or None if it is not in
+        the snapshot. Times are widened to 5 minute slot boundaries, so offerings
+        whose bitmaps do not intersect never meet at the same time.
+        """
+        index = self._find(self.offering_ids, offering_id)
+        if index is None:
+            return None
+        return int.from_bytes(
+            self.offering_occupancy[index * OCCUPANCY_BYTES:(index + 1) * OCCUPANCY_BYTES], 'little'
+        )
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def load_catalog_snapshot():
+    """Map the snapshot file if it exists; used at startup, without touching the database"""
+    global _snapshot
+    try:
+        _snapshot = CatalogSnapshot(snapshot_path())
+    except (OSError, ValueError, SnapshotFormatError):
+        _snapshot = None
+    return _snapshot
+
+
+def get_catalog_snapshot():
+    """
+    Return the snapshot if it is current with the catalog version, or None.
+
+    A missing or stale file is reloaded from disk, in case a rebuild already
+    replaced it. Nothing is built or queued here, so read requests never write.
+    """
+    version = get_catalog_version()[0]
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.is_current(version):
+        return snapshot
+
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is None or not snapshot.is_current(version):
+            snapshot = load_catalog_snapshot()
+    if snapshot is not None and snapshot.is_current(version):
+        return snapshot
+    return None
+
+
+def queue_snapshot_rebuild():
+    """Queue the catalog.build_snapshot task, unless a rebuild is already pending or running"""
+    from .tasks import rebuild_catalog_snapshot
+
+    rebuild_catalog_snapshot.enqueue(dedup_key=rebuild_catalog_snapshot.task_name)
@@ -0,0 +1,16 @@
+"""Background tasks for the catalog (run by manage.py run_task_worker)"""
+
+from tasks.registry import task
+from .importer import CatalogImporter
+from .snapshot import build_catalog_snapshot
+
+
+@task('catalog.import', max_attempts=1)
+def import_catalog(data, dry_run=False):
+    """Run a catalog import; invalid rows fail the task without retrying"""
+    return CatalogImporter(data).run(dry_run=dry_run)
+
+
+@task('catalog.build_snapshot', priority=-10)
+def rebuild_catalog_snapshot():
+    return {'catalog_version': build_catalog_snapshot()}
@@ -1,3 +1,939 @@
-from django.test import TestCase
+import gzip
+import io
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from .models import (
+    Department, Course, Prerequisite, PrerequisiteGroup, DegreeProgram, CourseOffering, TimeSlot,
+    ProgramType, Program, ProgramRequirement, ProgramCourseRequirement, ProgramConstraint, CatalogVersion
+)
+from .snapshot import CatalogSnapshot, build_catalog_snapshot, get_catalog_snapshot
+from .versioning import get_catalog_version
+from uniplanner.caching import response_cache
+from uniplanner.db_router import STICKY_COOKIE, PrimaryStickinessMiddleware, ReplicaRouter, use_primary
 
-# Create your tests here.
+
+def create_course_graph(department, count, start=0):
+    """Create ``count`` courses that each use every relation CourseSerializer reads"""
+    admin = User.objects.get_or_create(username='catalog-admin')[0]
+    major = DegreeProgram.objects.get_or_create(
+        name=f'{department.code} Major', department=department, defaults={'total_credits_required': 120}
+    )[0]
+    base = Course.objects.create(
+        department=department, course_number=f'{start}00', title='Base', credits=3
+    )
+    courses = []
+    for number in range(start + 1, start + count + 1):
+        course = Course.objects.create(
+            department=department, course_number=f'{number}01', title=f'Course {number}',
+            credits=3, created_by=admin, last_modified_by=admin
+        )
+        group = PrerequisiteGroup.objects.create(course=course, name='Group')
+        Prerequisite.objects.create(course=course, prerequisite_course=base, group=group)
+        course.corequisites.add(base)
+        course.antirequisites.add(base)
+        course.restricted_to_majors.add(major)
+        offering = CourseOffering.objects.create(course=course, semester='fall', year=2025, capacity=30)
+        TimeSlot.objects.create(offering=offering, day_of_week='monday', start_time='09:00', end_time='10:00')
+        courses.append(course)
+    return courses
+
+
+class CourseQueryCountTests(TestCase):
+    """Catalog endpoints must not issue per-row queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(code='CS', name='Computer Science')
+        cls.courses = create_course_graph(cls.department, 3)
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        get_catalog_version()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertQueryCountIndependentOfRows(self, url):
+        small = self.count_queries(url)
+        create_course_graph(self.department, 12, start=10)
+        self.assertEqual(self.count_queries(url), small)
+
+    def test_course_list_query_count(self):
+        self.assertQueryCountIndependentOfRows('/api/courses/courses/')
+
+    def test_course_list_with_prerequisites_query_count(self):
+        self.assertQueryCountIndependentOfRows('/api/courses/courses/?with_prerequisites=1')
+
+    def test_offering_list_query_count(self):
+        self.assertQueryCountIndependentOfRows('/api/courses/offerings/')
+
+    def test_prerequisite_list_query_count(self):
+        self.assertQueryCountIndependentOfRows('/api/courses/prerequisites/')
+
+    def test_course_detail_query_count(self):
+        with self.assertNumQueries(7):
+            response = self.client.get(f'/api/courses/courses/{self.courses[0].id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['prerequisite_groups'][0]['courses'][0]['full_code'], 'CS 000')
+
+    def test_course_list_query_count_is_small(self):
+        with self.assertNumQueries(8):
+            self.client.get('/api/courses/courses/')
+        # Keyset pagination skips the COUNT query unless include_total is requested
+        with self.assertNumQueries(7):
+            self.client.get('/api/courses/courses/?cursor=')
+
+
+class KeysetPaginationTests(TestCase):
+    """Catalog lists page by key, so deep pages cost the same as the first"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(code='CS', name='Computer Science')
+        cls.courses = create_course_graph(cls.department, 7)
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        get_catalog_version()
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            url = response.data['next']
+        return pages
+
+    def test_walk_forward_and_back(self):
+        pages = self.walk('/api/courses/courses/?cursor=&page_size=3')
+        codes = [course['full_code'] for page in pages for course in page['results']]
+        self.assertEqual(codes, sorted(codes))
+        self.assertEqual(len(codes), 8)
+        self.assertIsNone(pages[0]['previous'])
+
+        previous = self.client.get(pages[-1]['previous']).data
+        self.assertEqual(previous['results'], pages[-2]['results'])
+
+    def test_offering_walk_covers_every_row(self):
+        pages = self.walk('/api/courses/offerings/?cursor=&page_size=2')
+        self.assertEqual(sum(len(page['results']) for page in pages), 7)
+
+    def test_deep_page_costs_the_same_as_first(self):
+        first = self.client.get('/api/courses/courses/?cursor=&page_size=2')
+        with CaptureQueriesContext(connection) as first_queries:
+            self.client.get('/api/courses/courses/?cursor=&page_size=2')
+        last = self.walk('/api/courses/courses/?cursor=&page_size=2')[-2]
+        with CaptureQueriesContext(connection) as deep_queries:
+            self.client.get(last['next'])
+        self.assertEqual(len(deep_queries), len(first_queries))
+        self.assertNotIn('count', first.data)
+
+    def test_total_is_cached(self):
+        self.assertEqual(self.client.get('/api/courses/courses/?cursor=&include_total=1').data['count'], 8)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/courses/courses/?cursor=&include_total=1')
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/courses/courses/?cursor=bogus').status_code, 404)
+
+    def test_numbered_pages_by_default(self):
+        response = self.client.get('/api/courses/courses/?page=1')
+        self.assertEqual(set(response.data), {'count', 'next', 'previous', 'results'})
+        self.assertEqual(response.data['count'], 8)
+        self.assertEqual(len(response.data['results']), 8)
+        self.assertEqual(self.client.get('/api/courses/courses/?page=2').status_code, 404)
+        self.assertEqual(
+            self.client.get('/api/courses/offerings/').data['count'], CourseOffering.objects.count()
+        )
+
+
+class SparseFieldsetTests(TestCase):
+    """?fields= and ?omit= trim the payload and the queries behind it"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(code='CS', name='Computer Science')
+        cls.courses = create_course_graph(cls.department, 3)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data, [query['sql'] for query in queries]
+
+    def test_course_fields(self):
+        data, queries = self.get('/api/courses/courses/?fields=id,full_code,title,credits')
+        self.assertEqual(set(data['results'][0]), {'id', 'full_code', 'title', 'credits'})
+        course_queries = [sql for sql in queries if 'courses_course' in sql and 'COUNT(' not in sql]
+        self.assertEqual(len(course_queries), 1)
+        self.assertNotIn('description', course_queries[0])
+
+    def test_course_omit(self):
+        data, queries = self.get('/api/courses/courses/?omit=description,prerequisite_groups,corequisites')
+        course = data['results'][1]
+        self.assertNotIn('description', course)
+        self.assertNotIn('corequisites', course)
+        self.assertEqual(course['prerequisites'][0]['full_code'], 'CS 000')
+        self.assertFalse(any('courses_prerequisitegroup' in sql for sql in queries))
+
+    def test_nested_offering_fields(self):
+        data, queries = self.get('/api/courses/offerings/?fields=id,semester,course.full_code,time_slots')
+        offering = data['results'][0]
+        self.assertEqual(set(offering), {'id', 'semester', 'course', 'time_slots'})
+        self.assertEqual(set(offering['course']), {'full_code'})
+        self.assertEqual(len(offering['time_slots']), 1)
+        self.assertEqual(len([sql for sql in queries if 'courses_' in sql and 'COUNT(' not in sql]), 2)
+
+
+class CompactResponseTests(TestCase):
+    """?compact=1 replaces nested objects with ids and side-loads each object once"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(code='CS', name='Computer Science')
+        cls.courses = create_course_graph(cls.department, 3)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_course_list(self):
+        data = self.client.get('/api/courses/courses/?compact=1').data
+        course = data['results'][1]
+        self.assertEqual(course['department'], self.department.id)
+        self.assertEqual(len(course['restricted_to_majors']), 1)
+        self.assertEqual(list(data['included']['departments']), [self.department.id])
+        self.assertEqual(data['included']['departments'][self.department.id]['code'], 'CS')
+        self.assertIn(course['restricted_to_majors'][0], data['included']['programs'])
+        self.assertIn('next', data)
+
+    def test_offering_list_includes_courses_once(self):
+        data = self.client.get('/api/courses/offerings/?compact=1').data
+        offering = data['results'][0]
+        self.assertIsInstance(offering['course'], int)
+        included_course = data['included']['courses'][offering['course']]
+        self.assertEqual(included_course['department'], self.department.id)
+        self.assertEqual(len(data['included']['courses']), 3)
+        self.assertEqual(len(data['included']['departments']), 1)
+
+    def test_retrieve_and_default_format(self):
+        course = self.courses[0]
+        data = self.client.get(f'/api/courses/courses/{course.id}/?compact=1').data
+        self.assertEqual(data['data']['department'], self.department.id)
+        self.assertIn(self.department.id, data['included']['departments'])
+
+        data = self.client.get(f'/api/courses/courses/{course.id}/').data
+        self.assertEqual(data['department']['code'], 'CS')
+        self.assertNotIn('included', data)
+
+    def test_compact_with_fields(self):
+        data = self.client.get('/api/courses/offerings/?compact=1&fields=id,course.title').data
+        self.assertEqual(set(data['results'][0]), {'id', 'course'})
+        self.assertEqual(set(data['included']['courses'][data['results'][0]['course']]), {'title'})
+
+
+class RendererAndCompressionTests(TestCase):
+    """Catalog responses render with orjson and are compressed above the size threshold"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(code='CS', name='Computer Science')
+        create_course_graph(cls.department, 3)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_orjson_matches_drf_json(self):
+        from rest_framework.renderers import JSONRenderer
+        from uniplanner.renderers import ORJSONRenderer
+
+        response = self.client.get('/api/courses/offerings/')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('Accept', response['Vary'])
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        data = {1: {'price': Decimal('1.50'), 'at': datetime(2025, 1, 2, 3, 4, 5, 678901)}}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_gzip_above_threshold(self):
+        plain = self.client.get('/api/courses/offerings/')
+        response = self.client.get('/api/courses/offerings/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(len(response.content), len(plain.content))
+
+    def test_small_and_streaming_responses_are_not_compressed(self):
+        response = self.client.get('/api/courses/departments/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertLess(len(response.content), settings.RESPONSE_COMPRESSION_MIN_SIZE)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        from users.models import UserProfile
+        admin = User.objects.create_user(username='registrar', password='password')
+        UserProfile.objects.create(user=admin, role='admin')
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/courses/admin/export/courses/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class DatabaseProfileTests(TestCase):
+    """uniplanner.db selects and tunes the database from the environment"""
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite pragmas')
+    def test_sqlite_pragmas_applied_on_connect(self):
+        with connection.cursor() as cursor:
+            pragmas = {}
+            for name in ('synchronous', 'busy_timeout', 'temp_store'):
+                cursor.execute(f'PRAGMA {name}')
+                pragmas[name] = cursor.fetchone()[0]
+        # synchronous NORMAL = 1, temp_store MEMORY = 2; the in-memory test database has no WAL or mmap
+        self.assertEqual(pragmas, {'synchronous': 1, 'busy_timeout': 5000, 'temp_store': 2})
+
+    def test_profiles(self):
+        from uniplanner.db import database_config
+
+        with mock.patch.dict(os.environ, {'POSTGRES_HOST': 'db', 'DATABASE_CONN_MAX_AGE': '60'}):
+            postgres = database_config(settings.BASE_DIR, 'postgres')['default']
+        self.assertEqual(postgres['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((postgres['HOST'], postgres['CONN_MAX_AGE']), ('db', 60))
+        self.assertTrue(postgres['CONN_HEALTH_CHECKS'])
+
+        with mock.patch.dict(os.environ, {'UNIPLANNER_DATABASE': 'sqlite'}):
+            sqlite = database_config(settings.BASE_DIR)['default']
+        self.assertEqual(sqlite['NAME'], settings.BASE_DIR / 'db.sqlite3')
+        with self.assertRaises(ValueError):
+            database_config(settings.BASE_DIR, 'oracle')
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    """Catalog reads go to replicas unless the client has just written"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.replicas = self.settings(DATABASE_REPLICAS=['replica_1'])
+        self.replicas.enable()
+        self.addCleanup(self.replicas.disable)
+
+    def test_routing(self):
+        from users.models import StudentProfile
+
+        self.assertEqual(self.router.db_for_read(Course), 'replica_1')
+        self.assertEqual(self.router.db_for_read(StudentProfile), 'default')
+        self.assertEqual(self.router.db_for_write(Course), 'default')
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Course), 'default')
+        self.assertFalse(self.router.allow_migrate('replica_1', 'courses'))
+        self.assertTrue(self.router.allow_migrate('default', 'courses'))
+
+        with self.settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.router.db_for_read(Course), 'default')
+
+    def test_catalog_version_read_from_primary(self):
+        # A lagging version would answer conditional requests with 304 for changed data
+        self.assertEqual(self.router.db_for_read(CatalogVersion), 'default')
+        with mock.patch('uniplanner.db_router.random.choice', side_effect=AssertionError):
+            self.assertEqual(CatalogVersion.objects.all().db, 'default')
+
+    def test_sticky_primary_after_write(self):
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(Course))
+            return HttpResponse()
+
+        middleware = PrimaryStickinessMiddleware(view)
+        factory = RequestFactory()
+        response = middleware(factory.post('/api/schedules/schedules/'))
+        cookie = response.cookies[STICKY_COOKIE].value
+
+        follow_up = factory.get('/api/courses/courses/')
+        follow_up.COOKIES[STICKY_COOKIE] = cookie
+        middleware(follow_up)
+        expired = factory.get('/api/courses/courses/')
+        expired.COOKIES[STICKY_COOKIE] = str(time.time() - 1)
+        middleware(expired)
+        middleware(factory.get('/api/courses/courses/'))
+        self.assertEqual(seen, ['default', 'default', 'replica_1', 'replica_1'])
+
+    async def test_sticky_primary_async(self):
+        seen = []
+
+        async def view(request):
+            seen.append(self.router.db_for_read(Course))
+            return HttpResponse()
+
+        middleware = PrimaryStickinessMiddleware(view)
+        factory = RequestFactory()
+        response = await middleware(factory.post('/api/schedules/schedules/'))
+        follow_up = factory.get('/api/courses/courses/')
+        follow_up.COOKIES[STICKY_COOKIE] = response.cookies[STICKY_COOKIE].value
+        await middleware(follow_up)
+        await middleware(factory.get('/api/courses/courses/'))
+        self.assertEqual(seen, ['default', 'default', 'replica_1'])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite backup API')
+class SyncReplicaTests(TransactionTestCase):
+    """The backup runs on a committed database, as the command does outside tests"""
+
+    def test_copies_primary(self):
+        Department.objects.create(code='CS', name='Computer Science')
+        with tempfile.TemporaryDirectory() as directory:
+            target = os.path.join(directory, 'replica.sqlite3')
+            call_command('sync_replica', target=[target], stdout=io.StringIO())
+            replica = sqlite3.connect(target)
+            try:
+                rows = replica.execute('SELECT code FROM courses_department').fetchall()
+            finally:
+                replica.close()
+        self.assertEqual(rows, [('CS',)])
+
+
+class ProgramRequirementTreeTests(TestCase):
+    """Program requirement trees serialize in a constant number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(code='CS', name='Computer Science')
+        cls.courses = create_course_graph(cls.department, 2)
+        cls.program_type = ProgramType.objects.create(name='major', display_name='Major')
+        cls.programs = [cls.create_program(number) for number in range(3)]
+
+    @classmethod
+    def create_program(cls, number):
+        program = Program.objects.create(
+            name=f'Program {number}', code=f'P{number}', program_type=cls.program_type, department=cls.department
+        )
+        ProgramConstraint.objects.create(
+            program=program, constraint_type='credit_limit', name='Limit', description='Limit'
+        )
+        root = ProgramRequirement.objects.create(program=program, name='Core', requirement_type='core')
+        for order in range(2):
+            sub = ProgramRequirement.objects.create(
+                program=program, name=f'Core {order}', requirement_type='core', order=order,
+                parent_requirement=root
+            )
+            for course in cls.courses:
+                ProgramCourseRequirement.objects.create(requirement=sub, course=course)
+        return program
+
+    def test_program_list_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/courses/simple-admin/programs/')
+        program = response.json()['programs'][0]
+        core = next(requirement for requirement in program['requirements'] if requirement['name'] == 'Core')
+        self.assertEqual([sub['name'] for sub in core['sub_requirements']], ['Core 0', 'Core 1'])
+        self.assertEqual(
+            [link['course']['full_code'] for link in core['sub_requirements'][0]['course_requirements']],
+            ['CS 101', 'CS 201']
+        )
+        self.assertEqual(len(program['requirements']), 3)
+        self.assertEqual(len(program['constraints']), 1)
+
+        self.create_program(3)
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get('/api/courses/simple-admin/programs/')
+        self.assertEqual(len(response.json()['programs']), 4)
+
+    def test_program_requirements_query_count_is_constant(self):
+        program = self.programs[0]
+        url = f'/api/courses/simple-admin/programs/{program.id}/requirements/'
+        with CaptureQueriesContext(connection) as queries:
+            requirements = self.client.get(url).json()['requirements']
+        self.assertEqual(len(requirements[0]['sub_requirements'][0]['course_requirements']), 2)
+
+        parent = ProgramRequirement.objects.get(program=program, name='Core 0')
+        ProgramRequirement.objects.create(
+            program=program, name='Deep', requirement_type='core', parent_requirement=parent
+        )
+        with self.assertNumQueries(len(queries)):
+            self.client.get(url)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plans are checked with SQLite EXPLAIN QUERY PLAN')
+class QueryPlanTests(TestCase):
+    """Hot queries must use an index on a realistically sized catalog, never a full table scan"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from users.models import StudentProfile, CompletedCourse
+        from schedules.models import Schedule, ScheduleItem, DegreeAudit, UserCourseSelection
+
+        departments = Department.objects.bulk_create(
+            Department(code=f'D{number}', name=f'Department {number}') for number in range(20)
+        )
+        courses = Course.objects.bulk_create(
+            Course(
+                department=department, course_number=str(100 + number), title=f'Course {number}',
+                credits=3, is_active=number % 10 != 0
+            )
+            for department in departments for number in range(100)
+        )
+        Prerequisite.objects.bulk_create(
+            Prerequisite(course=course, prerequisite_course=courses[index - 1])
+            for index, course in enumerate(courses) if index % 100
+        )
+        offerings = CourseOffering.objects.bulk_create(
+            CourseOffering(course=course, semester=semester, year=2025, capacity=30)
+            for course in courses for semester in ('fall', 'winter')
+        )
+        program_type = ProgramType.objects.create(name='major', display_name='Major')
+        program = Program.objects.create(name='Program', code='P', program_type=program_type)
+        users = User.objects.bulk_create(User(username=f'student{number}') for number in range(100))
+        students = StudentProfile.objects.bulk_create(
+            StudentProfile(user=user, student_id=f'S{number:04d}') for number, user in enumerate(users)
+        )
+        audits = DegreeAudit.objects.bulk_create(DegreeAudit(student=student, program=program) for student in students)
+        schedules = Schedule.objects.bulk_create(
+            Schedule(student=student, semester='fall', year=2025, name='Plan') for student in students
+        )
+        grades = ['A', 'B', 'C', 'F', 'W']
+        for number, (student, audit, schedule) in enumerate(zip(students, audits, schedules)):
+            picked = courses[number * 20:number * 20 + 20]
+            CompletedCourse.objects.bulk_create(
+                CompletedCourse(student=student, course=course, semester='fall', year=2024,
+                                grade=grades[index % 5], credits_earned=3)
+                for index, course in enumerate(picked)
+            )
+            UserCourseSelection.objects.bulk_create(
+                UserCourseSelection(student=student, degree_audit=audit, course=course,
+                                    status='completed' if index % 2 else 'planned')
+                for index, course in enumerate(picked)
+            )
+            ScheduleItem.objects.bulk_create(
+                ScheduleItem(schedule=schedule, offering=offerings[number * 20 + index]) for index in range(10)
+            )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        cls.department, cls.course, cls.student, cls.audit, cls.schedule = (
+            departments[3], courses[350], students[7], audits[7], schedules[7]
+        )
+
+    def hot_queries(self):
+        """(name, table that must not be scanned, queryset)"""
+        from users.models import CompletedCourse
+        from schedules.models import ScheduleItem, UserCourseSelection
+
+        return [
+            ('active courses of a department', 'courses_course',
+             Course.objects.filter(is_active=True, department=self.department).order_by('course_number')),
+            ('active catalog page', 'courses_course', Course.objects.filter(is_active=True)[:20]),
+            ('offerings of a course in a term', 'courses_courseoffering',
+             CourseOffering.objects.filter(course=self.course, semester='fall', year=2025)),
+            ('offering term page', 'courses_courseoffering',
+             CourseOffering.objects.filter(year=2025, semester='winter').order_by(
+                 'year', 'semester', 'course_id', 'section')[:20]),
+            ('passing completed courses', 'users_completedcourse',
+             CompletedCourse.objects.filter(
+                 student=self.student, grade__in=CompletedCourse.PASSING_GRADES
+             ).values_list('course_id', flat=True)),
+            ('completed selections of an audit', 'schedules_usercourseselection',
+             UserCourseSelection.objects.filter(degree_audit=self.audit, status='completed')),
+            ('courses unlocked by a course', 'courses_prerequisite',
+             Prerequisite.objects.filter(prerequisite_course=self.course)),
+            ('items of a schedule', 'schedules_scheduleitem', ScheduleItem.objects.filter(schedule=self.schedule)),
+        ]
+
+    def test_hot_queries_use_indexes(self):
+        for name, table, queryset in self.hot_queries():
+            with self.subTest(name):
+                plan = queryset.explain()
+                full_scans = re.findall(rf'\bSCAN {table}(?! USING)\b', plan)
+                self.assertFalse(full_scans, f'{name} scans {table}:\n{plan}')
+
+
+class CatalogExportTests(TestCase):
+    """Admin exports stream one record per line"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from users.models import UserProfile
+        cls.department = Department.objects.create(code='CS', name='Computer Science')
+        cls.courses = create_course_graph(cls.department, 3)
+        cls.admin = User.objects.create_user(username='registrar', password='password')
+        UserProfile.objects.create(user=cls.admin, role='admin')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_courses_ndjson(self):
+        import json
+        rows = [json.loads(line) for line in self.export('/api/courses/admin/export/courses/').splitlines()]
+        self.assertEqual([row['course_number'] for row in rows], ['000', '101', '201', '301'])
+        self.assertEqual(rows[1]['prerequisites'], ['CS 000'])
+
+    def test_offerings_csv(self):
+        import csv
+        rows = list(csv.DictReader(self.export('/api/courses/admin/export/offerings/?output=csv').splitlines()))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['course'], 'CS 101')
+        self.assertIn('monday', rows[0]['time_slots'])
+
+    def test_requires_admin_and_known_dataset(self):
+        self.assertEqual(self.client.get('/api/courses/admin/export/students/').status_code, 404)
+        self.client.force_authenticate(User.objects.get(username='catalog-admin'))
+        self.assertEqual(self.client.get('/api/courses/admin/export/courses/').status_code, 403)
+
+
+class CatalogImportTests(TestCase):
+    """Bulk import plans by natural key and writes in batches"""
+
+    CATALOG = {
+        'departments': [{'code': 'CS', 'name': 'Computer Science'}],
+        'courses': [
+            {'department': 'CS', 'course_number': '101', 'title': 'Intro', 'credits': '3'},
+            {'department': 'CS', 'course_number': '201', 'title': 'Data Structures', 'credits': '4',
+             'prerequisites': 'CS 101', 'terms_offered': 'fall;winter'},
+        ],
+        'prerequisites': [{'course': 'CS 301', 'prerequisite_course': 'CS 201', 'group': 'Core'}],
+        'offerings': [{
+            'course': 'CS 201', 'semester': 'fall', 'year': '2025', 'capacity': '40',
+            'time_slots': [{'day_of_week': 'monday', 'start_time': '09:00', 'end_time': '10:30'}],
+        }],
+    }
+
+    def catalog(self):
+        import copy
+        catalog = copy.deepcopy(self.CATALOG)
+        catalog['courses'].append({'department': 'CS', 'course_number': '301', 'title': 'Algorithms', 'credits': '4'})
+        return catalog
+
+    def test_dry_run_writes_nothing(self):
+        from .importer import CatalogImporter
+        result = CatalogImporter(self.catalog()).run(dry_run=True)
+        self.assertEqual(result['diff']['courses']['created'], 3)
+        self.assertEqual(result['diff']['prerequisites']['created'], 2)
+        self.assertFalse(Course.objects.exists())
+
+    def test_import_then_update(self):
+        from .importer import CatalogImporter
+        with self.captureOnCommitCallbacks(execute=True):
+            CatalogImporter(self.catalog()).run()
+        course = Course.objects.get(course_number='201')
+        self.assertEqual(course.terms_offered, ['fall', 'winter'])
+        self.assertEqual([prereq.full_code for prereq in course.get_prerequisites()], ['CS 101'])
+        self.assertEqual(Prerequisite.objects.get(course__course_number='301').group.name, 'Core')
+        self.assertEqual(course.offerings.get().time_slots.count(), 1)
+        self.assertEqual(get_catalog_version()[0], 1)
+
+        catalog = self.catalog()
+        catalog['courses'][0]['title'] = 'Introduction to Computing'
+        result = CatalogImporter(catalog).run()
+        self.assertEqual(result['diff']['courses']['updated'], 1)
+        self.assertEqual(result['diff']['courses']['unchanged'], 2)
+        self.assertEqual(result['diff']['courses']['changes'][0]['fields']['title'][1], 'Introduction to Computing')
+        self.assertEqual(result['diff']['time_slots']['unchanged'], 1)
+        self.assertEqual(APIClient().get('/api/courses/courses/?search=computing').data['results'][0]['full_code'], 'CS 101')
+
+    def test_invalid_rows_abort_the_import(self):
+        from .importer import CatalogImporter, CatalogImportError
+        catalog = self.catalog()
+        catalog['prerequisites'].append({'course': 'CS 101', 'prerequisite_course': 'CS 301'})
+        catalog['offerings'][0]['capacity'] = ''
+        with self.assertRaises(CatalogImportError) as raised:
+            CatalogImporter(catalog).run()
+        errors = {(error['kind'], error['row']) for error in raised.exception.errors}
+        # Every new edge on the CS 101 -> 301 -> 201 -> 101 cycle is reported
+        self.assertEqual(errors, {('courses', 2), ('prerequisites', 1), ('prerequisites', 2), ('offerings', 1)})
+        self.assertFalse(Department.objects.exists())
+
+    def test_forward_referenced_corequisites(self):
+        from .importer import CatalogImporter, CatalogImportError
+        catalog = self.catalog()
+        catalog['courses'][0]['corequisites'] = 'CS 301'
+        catalog['courses'][1]['antirequisites'] = 'CS 301'
+        CatalogImporter(catalog).run()
+        intro = Course.objects.get(course_number='101')
+        self.assertEqual([course.full_code for course in intro.corequisites.all()], ['CS 301'])
+        self.assertEqual(
+            [course.full_code for course in Course.objects.get(course_number='301').antirequisites.all()], ['CS 201']
+        )
+
+        catalog['courses'][2]['corequisites'] = 'ZZ 200'
+        with self.assertRaises(CatalogImportError) as raised:
+            CatalogImporter(catalog).run()
+        self.assertEqual(raised.exception.errors, [{'kind': 'courses', 'row': 3, 'error': 'unknown course ZZ 200'}])
+
+
+class CourseSearchTests(TestCase):
+    """Full-text search over code, title and description"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(code='CS', name='Computer Science')
+        cls.math = Department.objects.create(code='MATH', name='Mathematics')
+        cls.algorithms = Course.objects.create(
+            department=cls.department, course_number='301', title='Algorithms', credits=3,
+            description='Graph search and dynamic programming'
+        )
+        cls.graphs = Course.objects.create(
+            department=cls.math, course_number='210', title='Graph Theory', credits=3,
+            description='Trees, matchings and colourings'
+        )
+        cls.intro = Course.objects.create(
+            department=cls.department, course_number='101', title='Introduction to Programming', credits=4
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def search(self, text, **params):
+        response = self.client.get('/api/courses/courses/', {'search': text, **params})
+        self.assertEqual(response.status_code, 200)
+        return [course['full_code'] for course in response.data['results']]
+
+    def test_ranked_prefix_search(self):
+        self.assertEqual(self.search('graph'), ['MATH 210', 'CS 301'])
+        self.assertEqual(self.search('progr'), ['CS 101', 'CS 301'])
+        self.assertEqual(self.search('cs 30'), ['CS 301'])
+        self.assertEqual(self.search('CS101'), ['CS 101'])
+
+    def test_unspecific_query_ranks_code_and_title_first(self):
+        with mock.patch('courses.search.SQLITE_RANKING_BUDGET', 1):
+            self.assertEqual(self.search('graph'), ['MATH 210', 'CS 301'])
+
+    def test_search_combines_with_filters(self):
+        self.assertEqual(self.search('graph', department='CS'), ['CS 301'])
+
+    def test_index_follows_writes(self):
+        self.intro.title = 'Programming Fundamentals'
+        self.intro.save()
+        self.assertEqual(self.search('fundamentals'), ['CS 101'])
+
+        self.math.code = 'MA'
+        self.math.save()
+        self.assertEqual(self.search('ma 210'), ['MA 210'])
+
+        self.graphs.delete()
+        self.assertEqual(self.search('graph'), ['CS 301'])
+
+
+class PrerequisiteValidatorReuseTests(TestCase):
+    """Eligibility is computed once per request, not per course and field"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from users.models import StudentProfile, CompletedCourse
+        cls.department = Department.objects.create(code='CS', name='Computer Science')
+        cls.courses = create_course_graph(cls.department, 3)
+        user = User.objects.create_user(username='student', password='password')
+        cls.student = StudentProfile.objects.create(user=user, student_id='S0001')
+        CompletedCourse.objects.create(
+            student=cls.student, course=Course.objects.get(course_number='000'),
+            semester='fall', year=2024, grade='A', credits_earned=3
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student.user)
+
+    def count_queries(self, url):
+        # Measure the computation, not the per-student response cache
+        response_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_with_prerequisites_list_query_count(self):
+        small, response = self.count_queries('/api/courses/courses/?with_prerequisites=1')
+        self.assertTrue(all(course['can_take'] for course in response.data['results'][1:]))
+        create_course_graph(self.department, 12, start=10)
+        self.assertEqual(self.count_queries('/api/courses/courses/?with_prerequisites=1')[0], small)
+
+    def test_available_query_count(self):
+        small, response = self.count_queries('/api/courses/courses/available/')
+        self.assertEqual(len(response.data), 4)
+        create_course_graph(self.department, 12, start=10)
+        self.assertEqual(self.count_queries('/api/courses/courses/available/')[0], small)
+
+
+class CatalogConditionalGetTests(TestCase):
+    """Catalog responses carry the catalog version and honour conditional GETs"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(code='CS', name='Computer Science')
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+
+    def bump(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Course.objects.create(department=self.department, course_number='101', title='Intro', credits=3)
+
+    def test_not_modified_without_queries(self):
+        self.bump()
+        response = self.client.get('/api/courses/courses/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/courses/courses/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(
+            '/api/courses/courses/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_catalog_write_changes_etag(self):
+        etag = self.client.get('/api/courses/departments/')['ETag']
+        self.bump()
+        response = self.client.get('/api/courses/departments/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_student_specific_list_is_not_conditional(self):
+        response = self.client.get('/api/courses/courses/?with_prerequisites=1')
+        self.assertFalse(response.has_header('ETag'))
+
+
+class CatalogSnapshotTests(TestCase):
+    """The memory-mapped snapshot mirrors the prerequisite graph and is rebuilt out of band when stale"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from users.models import StudentProfile
+        cls.department = Department.objects.create(code='CS', name='Computer Science')
+        cls.courses = create_course_graph(cls.department, 2)
+        Prerequisite.objects.create(course=cls.courses[1], prerequisite_course=cls.courses[0])
+        user = User.objects.create_user(username='snapshot-student', password='password')
+        cls.student = StudentProfile.objects.create(user=user, student_id='S0002')
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'catalog.snapshot')
+        override = self.settings(CATALOG_SNAPSHOT_PATH=self.path)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def prerequisite_chain(self):
+        client = APIClient()
+        client.force_authenticate(self.student.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(f'/api/courses/courses/{self.courses[1].id}/prerequisite_chain/')
+        self.assertEqual(response.data, {'CS 201': ['CS 000', 'CS 101'], 'CS 101': ['CS 000']})
+        return any('courses_prerequisite' in query['sql'] for query in queries)
+
+    def test_lookups(self):
+        output = io.StringIO()
+        call_command('build_catalog_snapshot', stdout=output)
+        self.assertIn('1 departments, 3 courses, 3 prerequisites, 2 offerings', output.getvalue())
+        snapshot = CatalogSnapshot(self.path)
+        course = self.courses[1]
+        self.assertEqual(snapshot.course_code(snapshot.course_index(course.id)), 'CS 201')
+        self.assertIsNone(snapshot.course_index(-1))
+        base = Course.objects.get(course_number='000')
+        self.assertEqual(snapshot.prerequisite_ids(course.id), [base.id, self.courses[0].id])
+        self.assertEqual(snapshot.prerequisite_chain(course.id), {
+            'CS 201': ['CS 000', 'CS 101'], 'CS 101': ['CS 000'],
+        })
+        index = snapshot.course_index(course.id)
+        self.assertEqual(snapshot.department_code(snapshot.course_departments[index]), 'CS')
+
+        # Monday 09:00-10:00 is slots 108 to 119 of the week
+        offering = course.offerings.get()
+        self.assertEqual(snapshot.occupancy(offering.id), ((1 << 12) - 1) << 108)
+        self.assertIsNone(snapshot.occupancy(-1))
+
+    def test_alternatives_filtered_by_occupancy(self):
+        from schedules.models import Schedule, ScheduleItem
+        from schedules.services import ScheduleConflictDetector
+
+        schedule = Schedule.objects.create(student=self.student, semester='fall', year=2025, name='Plan')
+        ScheduleItem.objects.create(schedule=schedule, offering=self.courses[0].offerings.get())
+        conflicting = self.courses[1].offerings.get()
+        alternatives = {}
+        for section, start, end in [('B', '09:30', '10:30'), ('C', '10:05', '11:00'), ('D', '10:03', '11:00')]:
+            offering = CourseOffering.objects.create(
+                course=self.courses[1], section=section, semester='fall', year=2025, capacity=30
+            )
+            TimeSlot.objects.create(offering=offering, day_of_week='monday', start_time=start, end_time=end)
+            alternatives[section] = offering
+        # 10:02 and 10:03 share a 5 minute slot, so D falls back to the exact check
+        schedule_slot = TimeSlot.objects.get(offering__course=self.courses[0])
+        schedule_slot.end_time = '10:02'
+        schedule_slot.save()
+
+        def suggest():
+            with CaptureQueriesContext(connection) as queries:
+                suggested = ScheduleConflictDetector(schedule).suggest_alternatives(conflicting)
+            return suggested, sum('"courses_timeslot"' in query['sql'] for query in queries)
+
+        from_database, database_queries = suggest()
+        build_catalog_snapshot()
+        from_snapshot, snapshot_queries = suggest()
+        self.assertEqual(set(from_database), {alternatives['C'], alternatives['D']})
+        self.assertEqual(set(from_snapshot), set(from_database))
+        # The schedule's slots, then one per alternative checked exactly: B and D, not C
+        self.assertEqual((database_queries, snapshot_queries), (4, 3))
+
+    def test_stale_snapshot_is_rebuilt_out_of_band(self):
+        from tasks.models import BackgroundTask
+        from tasks.worker import TaskWorker
+
+        # Requests read the database and never build the file or queue a rebuild themselves
+        self.assertIsNone(get_catalog_snapshot())
+        self.assertTrue(self.prerequisite_chain())
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(BackgroundTask.objects.exists())
+
+        # Catalog writes queue one rebuild when they commit
+        with self.captureOnCommitCallbacks(execute=True):
+            Prerequisite.objects.create(course=self.courses[0], prerequisite_course=self.courses[1])
+        with self.captureOnCommitCallbacks(execute=True):
+            Department.objects.create(code='MATH', name='Mathematics')
+        self.assertEqual(BackgroundTask.objects.filter(name='catalog.build_snapshot').count(), 1)
+        self.assertIsNone(get_catalog_snapshot())
+
+        TaskWorker(processes=0).run(once=True)
+        snapshot = get_catalog_snapshot()
+        self.assertIsNotNone(snapshot)
+        self.assertIs(get_catalog_snapshot(), snapshot)
+        self.assertIn(self.courses[1].id, snapshot.prerequisite_ids(self.courses[0].id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Prerequisite.objects.filter(course=self.courses[0]).delete()
+        self.assertIsNone(get_catalog_snapshot())
+        TaskWorker(processes=0).run(once=True)
+        rebuilt = get_catalog_snapshot()
+        self.assertGreater(rebuilt.catalog_version, snapshot.catalog_version)
+        self.assertEqual(rebuilt.prerequisite_ids(self.courses[0].id), [])
@@ -7,7 +7,8 @@ from .views import (
 )
 from .admin_views import (
     admin_courses_list, admin_create_course, admin_update_course, admin_delete_course,
-    admin_departments_list, admin_degree_programs_list
+    admin_departments_list, admin_degree_programs_list, admin_export,
+    admin_import_catalog
 )
 from .simple_admin import simple_admin_courses, simple_admin_departments, simple_admin_degree_programs, simple_admin_create_course, simple_admin_delete_course, simple_admin_update_course
 from .program_admin_views import (
@@ -38,6 +39,8 @@ urlpatterns = [
     path('admin/courses/<int:course_id>/delete/', admin_delete_course, name='admin_delete_course'),
     path('admin/departments/', admin_departments_list, name='admin_departments_list'),
     path('admin/degree-programs/', admin_degree_programs_list, name='admin_degree_programs_list'),
+    path('admin/export/<str:dataset>/', admin_export, name='admin_export'),
+    path('admin/import/', admin_import_catalog, name='admin_import_catalog'),
     # Simple admin endpoints
     path('simple-admin/courses/', simple_admin_courses, name='simple_admin_courses'),
     path('simple-admin/courses/create/', simple_admin_create_course, name='simple_admin_create_course'),
@@ -0,0 +1,109 @@
+"""
+Catalog version tracking and HTTP conditional GET support for catalog endpoints.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponseNotModified
+from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from .models import CatalogVersion
+
+
+CATALOG_VERSION_CACHE_KEY = 'courses:catalog_version'
+
+# Other processes observe a bump within this many seconds; the writing process
+# sees it immediately.
+CATALOG_VERSION_CACHE_TIMEOUT = 5
+
+
+def get_catalog_version():
+    """
+    Get the current catalog version.
+    
+    Returns:
+        Tuple of (version: int, updated_at: datetime or None)
+    """
+    current = cache.get(CATALOG_VERSION_CACHE_KEY)
+    if current is None:
+        current = (
+            CatalogVersion.objects.filter(pk=1).values_list('version', 'updated_at').first()
+            or (0, None)
+        )
+        cache.set(CATALOG_VERSION_CACHE_KEY, current, CATALOG_VERSION_CACHE_TIMEOUT)
+    return current
+
+
+def bump_catalog_version():
+    """
+    Increment the catalog version and queue a rebuild of the catalog snapshot,
+    which is stale from now on; call after the catalog write has committed
+    """
+    from .snapshot import queue_snapshot_rebuild
+
+    now = timezone.now()
+    if not CatalogVersion.objects.filter(pk=1).update(version=F('version') + 1, updated_at=now):
+        CatalogVersion.objects.get_or_create(pk=1, defaults={'version': 1, 'updated_at': now})
+    cache.delete(CATALOG_VERSION_CACHE_KEY)
+    queue_snapshot_rebuild()
+
+
+def bump_catalog_version_on_commit():
+    transaction.on_commit(bump_catalog_version)
+
+
+class CatalogNotModified(Exception):
+    """Raised from initial() to answer a conditional GET with 304"""
+
+
+class CatalogConditionalGetMixin:
+    """
+    ViewSet mixin that emits the catalog version as ETag/Last-Modified on list and
+    retrieve responses, and answers matching If-None-Match/If-Modified-Since
+    requests with 304 before authentication or any catalog query runs.
+    """
+    conditional_actions = ('list', 'retrieve')
+    
+    def is_conditional_request(self, request):
+        return request.method in ('GET', 'HEAD') and self.action in self.conditional_actions
+    
+    def initial(self, request, *args, **kwargs):
+        self.catalog_version = None
+        if self.is_conditional_request(request):
+            self.catalog_version = get_catalog_version()
+            if self._is_not_modified(request):
+                raise CatalogNotModified()
+        super().initial(request, *args, **kwargs)
+    
+    def handle_exception(self, exc):
+        if isinstance(exc, CatalogNotModified):
+            return self._set_validators(HttpResponseNotModified())
+        return super().handle_exception(exc)
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'catalog_version', None) and response.status_code == 200:
+            self._set_validators(response)
+        return response
+    
+    def _etag(self):
+        return f'W/"catalog-{self.catalog_version[0]}"'
+    
+    def _is_not_modified(self, request):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or any(
+                etag.removeprefix('W/') == self._etag().removeprefix('W/') for etag in etags
+            )
+        
+        updated_at = self.catalog_version[1]
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return bool(updated_at and if_modified_since and int(updated_at.timestamp()) <= if_modified_since)
+    
+    def _set_validators(self, response):
+        response['ETag'] = self._etag()
+        if self.catalog_version[1]:
+            response['Last-Modified'] = http_date(self.catalog_version[1].timestamp())
+        return response
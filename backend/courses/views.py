@@ -3,8 +3,9 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q, F
+from uniplanner.caching import cached_response
 from .models import (
-    Department, Course, Prerequisite, DegreeProgram, DegreeRequirement,
+    Department, Course, CourseQuerySet, Prerequisite, DegreeProgram, DegreeRequirement,
     CourseRequirement, CourseOffering, TimeSlot
 )
 from .serializers import (
@@ -13,27 +14,65 @@ from .serializers import (
     CourseRequirementSerializer, CourseOfferingSerializer,
     CourseWithPrerequisitesSerializer, CourseRecommendationSerializer
 )
+from .compact import CompactResponseMixin
+from .fieldsets import SparseFieldsetViewMixin, nested_serializer
+from .pagination import (
+    CourseKeysetPagination, CourseOfferingKeysetPagination, OptionalKeysetPaginationMixin, RankedSearchPagination
+)
+from .search import search_course_ids
 from .services import PrerequisiteValidator
+from .versioning import CatalogConditionalGetMixin
 
 
-class DepartmentViewSet(viewsets.ReadOnlyModelViewSet):
+class DepartmentViewSet(CatalogConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for departments"""
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
 
 
-class CourseViewSet(viewsets.ReadOnlyModelViewSet):
+class CourseViewSet(CatalogConditionalGetMixin, CompactResponseMixin, SparseFieldsetViewMixin,
+                    OptionalKeysetPaginationMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for courses"""
     queryset = Course.objects.filter(is_active=True)
     serializer_class = CourseSerializer
+    keyset_pagination_class = CourseKeysetPagination
     
     def get_serializer_class(self):
         if self.action == 'list' and self.request.query_params.get('with_prerequisites'):
             return CourseWithPrerequisitesSerializer
         return CourseSerializer
     
+    def is_conditional_request(self, request):
+        # can_take/missing_prerequisites depend on the student, not only the catalog
+        return (
+            super().is_conditional_request(request)
+            and self.get_serializer_class() is not CourseWithPrerequisitesSerializer
+        )
+    
+    def get_pagination_class(self):
+        # Ranked search results are always paged by rank
+        if self.request.query_params.get('search', '').strip():
+            return RankedSearchPagination
+        return super().get_pagination_class()
+    
     def get_queryset(self):
         queryset = Course.objects.filter(is_active=True)
+        if self.action in ('list', 'retrieve'):
+            nested_prerequisites = self.get_serializer_class() is CourseWithPrerequisitesSerializer
+            selected = self.get_selected_fields()
+            if selected is None:
+                queryset = queryset.with_serializer_relations(nested_prerequisites=nested_prerequisites)
+            else:
+                # full_code covers the department code and course number keyset pagination reads
+                queryset = queryset.with_serializer_fields(
+                    [*selected, 'full_code'], nested_prerequisites=nested_prerequisites
+                )
+        
+        # Full-text search over code, title and description
+        search = self.request.query_params.get('search', '').strip()
+        if search and self.action == 'list':
+            self.search_ids = search_course_ids(search)
+            queryset = queryset.filter(id__in=self.search_ids)
         
         # Filter by department
         department = self.request.query_params.get('department')
@@ -61,6 +100,7 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    @cached_response('courses.available')
     def available(self, request):
         """Get courses available to the current student (prerequisites satisfied)"""
         if not hasattr(request.user, 'student_profile'):
@@ -70,14 +110,18 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
             )
         
         validator = PrerequisiteValidator(request.user.student_profile)
-        available_courses = validator.get_available_courses()
+        available_courses = validator.get_available_courses(
+            Course.objects.filter(is_active=True).with_serializer_relations(nested_prerequisites=True)
+        )
         
         serializer = CourseWithPrerequisitesSerializer(
-            available_courses, many=True, context={'request': request}
+            available_courses, many=True,
+            context={'request': request, 'prerequisite_validator': validator}
         )
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    @cached_response('courses.recommendations')
     def recommendations(self, request):
         """Get course recommendations for the current student"""
         if not hasattr(request.user, 'student_profile'):
@@ -105,6 +149,7 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    @cached_response('courses.prerequisite_chain')
     def prerequisite_chain(self, request, pk=None):
         """Get the complete prerequisite chain for a course"""
         if not hasattr(request.user, 'student_profile'):
@@ -138,13 +183,19 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
         })
 
 
-class PrerequisiteViewSet(viewsets.ReadOnlyModelViewSet):
+class PrerequisiteViewSet(CatalogConditionalGetMixin, CompactResponseMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for prerequisites"""
     queryset = Prerequisite.objects.all()
     serializer_class = PrerequisiteSerializer
     
     def get_queryset(self):
-        queryset = Prerequisite.objects.all()
+        queryset = Prerequisite.objects.select_related(
+            *CourseQuerySet.serializer_select_related('course__'),
+            *CourseQuerySet.serializer_select_related('prerequisite_course__')
+        ).prefetch_related(
+            *CourseQuerySet.serializer_prefetches('course__'),
+            *CourseQuerySet.serializer_prefetches('prerequisite_course__')
+        )
         
         # Filter by course
         course_id = self.request.query_params.get('course')
@@ -159,7 +210,7 @@ class PrerequisiteViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
-class DegreeProgramViewSet(viewsets.ReadOnlyModelViewSet):
+class DegreeProgramViewSet(CatalogConditionalGetMixin, CompactResponseMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for degree programs"""
     queryset = DegreeProgram.objects.filter(is_active=True)
     serializer_class = DegreeProgramSerializer
@@ -175,7 +226,7 @@ class DegreeProgramViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
-class DegreeRequirementViewSet(viewsets.ReadOnlyModelViewSet):
+class DegreeRequirementViewSet(CatalogConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for degree requirements"""
     queryset = DegreeRequirement.objects.all()
     serializer_class = DegreeRequirementSerializer
@@ -196,7 +247,7 @@ class DegreeRequirementViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
-class CourseRequirementViewSet(viewsets.ReadOnlyModelViewSet):
+class CourseRequirementViewSet(CatalogConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for course requirements"""
     queryset = CourseRequirement.objects.all()
     serializer_class = CourseRequirementSerializer
@@ -217,13 +268,29 @@ class CourseRequirementViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
-class CourseOfferingViewSet(viewsets.ReadOnlyModelViewSet):
+class CourseOfferingViewSet(CatalogConditionalGetMixin, CompactResponseMixin, SparseFieldsetViewMixin,
+                            OptionalKeysetPaginationMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for course offerings"""
     queryset = CourseOffering.objects.all()
     serializer_class = CourseOfferingSerializer
+    keyset_pagination_class = CourseOfferingKeysetPagination
+    
+    # Offering columns read by serializer fields beyond the keyset pagination columns
+    FIELD_SOURCES = {
+        'instructor': ['instructor'],
+        'capacity': ['capacity'],
+        'enrolled': ['enrolled'],
+        'is_available': ['capacity', 'enrolled'],
+    }
     
     def get_queryset(self):
-        queryset = CourseOffering.objects.all()
+        selected = self.get_selected_fields()
+        if selected is None:
+            queryset = CourseOffering.objects.select_related(
+                *CourseQuerySet.serializer_select_related('course__')
+            ).prefetch_related('time_slots', *CourseQuerySet.serializer_prefetches('course__'))
+        else:
+            queryset = self.get_sparse_queryset(selected)
         
         # Filter by course
         course_id = self.request.query_params.get('course')
@@ -245,4 +312,19 @@ class CourseOfferingViewSet(viewsets.ReadOnlyModelViewSet):
         if available_only and available_only.lower() == 'true':
             queryset = queryset.filter(enrolled__lt=F('capacity'))
         
-        return queryset
\ No newline at end of file
+        return queryset
+    
+    def get_sparse_queryset(self, selected):
+        """Load only the columns and relations a sparse fieldset renders"""
+        only = ['id', 'course', 'semester', 'year', 'section']
+        only += sorted({source for field in selected for source in self.FIELD_SOURCES.get(field, ())})
+        select_related, prefetches = [], []
+        if 'course' in selected:
+            course_only, select_related, prefetches = CourseQuerySet.serializer_projection(
+                nested_serializer(selected['course']).fields, prefix='course__'
+            )
+            only += course_only
+            select_related = ['course', *select_related]
+        if 'time_slots' in selected:
+            prefetches = ['time_slots', *prefetches]
+        return CourseOffering.objects.only(*only).select_related(*select_related).prefetch_related(*prefetches)
@@ -0,0 +1,154 @@
+"""
+Async variants of the heaviest read endpoints, for ASGI deployments.
+
+Under ASGI a slow dashboard or what-if audit no longer holds a worker thread
+for its whole duration: the independent reads are issued with the async ORM
+and awaited together with asyncio.gather, and only serialization runs in the
+sync thread. Responses are the same as the synchronous endpoints'. The
+project's middleware is all async capable, so requests reach these views
+without being adapted to a thread on the way.
+
+DRF views are synchronous, so these are plain Django async views with their
+own token authentication (through the CachedTokenAuthentication cache) and
+JSON rendering.
+"""
+
+import asyncio
+import time
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework.exceptions import AuthenticationFailed
+from courses.models import Course, Program
+from courses.serializers import CourseRecommendationSerializer, CourseWithPrerequisitesSerializer
+from courses.services import PrerequisiteValidator
+from uniplanner.renderers import ORJSONRenderer
+from users.authentication import CachedTokenAuthentication
+from users.serializers import StudentWithProfileSerializer
+from .dashboard import DashboardBootstrap, RECOMMENDATION_LIMIT
+from .models import DegreeAudit, Schedule
+from .serializers import DegreeAuditSerializer, ScheduleSerializer
+from .services import Transcript, WhatIfAuditor, get_compiled_programs
+
+
+def json_response(data, status=200):
+    return HttpResponse(ORJSONRenderer().render(data), content_type='application/json', status=status)
+
+
+async def authenticate(request):
+    """Return the active user for an ``Authorization: Token <key>`` header, or None"""
+    keyword, _, key = request.headers.get('Authorization', '').partition(' ')
+    if keyword != 'Token' or not key:
+        return None
+    authenticate_credentials = sync_to_async(CachedTokenAuthentication().authenticate_credentials)
+    try:
+        user, _ = await authenticate_credentials(key.strip())
+    except AuthenticationFailed:
+        return None
+    return user
+
+
+async def authenticate_student(request):
+    """Authenticate the request; return (student, None) or (None, error response)"""
+    if request.method != 'GET':
+        return None, HttpResponseNotAllowed(['GET'])
+    user = await authenticate(request)
+    if user is None:
+        return None, json_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+    if not hasattr(user, 'student_profile'):
+        return None, json_response({'error': 'User is not a student'}, status=400)
+    request.user = user
+    return user.student_profile, None
+
+
+class AsyncDashboardBootstrap:
+    """
+    Async DashboardBootstrap: the sections run concurrently on the event loop.
+
+    The passed course IDs and the active courses are loaded once, as tasks
+    that the available course and recommendation sections both await.
+    """
+    SECTIONS = DashboardBootstrap.SECTIONS
+
+    def __init__(self, request):
+        self.request = request
+        self.student = request.user.student_profile
+        self.context = {'request': request}
+
+    async def build(self):
+        self._validator = asyncio.ensure_future(self._load_validator())
+        self._courses = asyncio.ensure_future(self._load_courses())
+        timings = {}
+        sections = await asyncio.gather(*(self._run(name, timings) for name in self.SECTIONS))
+        payload = dict(zip(self.SECTIONS, sections))
+        payload['timings'] = timings
+        return payload
+
+    async def _run(self, name, timings):
+        start = time.perf_counter()
+        try:
+            return await getattr(self, f'get_{name}')()
+        finally:
+            timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    async def _load_validator(self):
+        passed = PrerequisiteValidator.passed_course_ids(self.student)
+        validator = PrerequisiteValidator(self.student, [course_id async for course_id in passed])
+        self.context['prerequisite_validator'] = validator
+        return validator
+
+    async def _load_courses(self):
+        courses = Course.objects.filter(is_active=True).with_serializer_relations(nested_prerequisites=True)
+        return [course async for course in courses]
+
+    @sync_to_async
+    def _serialize(self, serializer_class, instances, **context):
+        return serializer_class(instances, many=True, context={**self.context, **context}).data
+
+    async def get_user(self):
+        return await sync_to_async(lambda: StudentWithProfileSerializer(self.request.user).data)()
+
+    async def get_degree_audits(self):
+        audits = DegreeAudit.objects.filter(student=self.student).with_progress()
+        return await self._serialize(DegreeAuditSerializer, [audit async for audit in audits], expand=set())
+
+    async def get_schedules(self):
+        schedules = Schedule.objects.filter(student=self.student).select_related('student__user')
+        return await self._serialize(ScheduleSerializer, [schedule async for schedule in schedules])
+
+    async def get_available_courses(self):
+        validator, courses = await asyncio.gather(self._validator, self._courses)
+        available = await sync_to_async(validator.get_available_courses)(courses)
+        return await self._serialize(CourseWithPrerequisitesSerializer, available)
+
+    async def get_recommendations(self):
+        validator, courses = await asyncio.gather(self._validator, self._courses)
+        recommendations = await sync_to_async(validator.get_recommended_course_sequence)(courses=courses)
+        return await self._serialize(CourseRecommendationSerializer, recommendations[:RECOMMENDATION_LIMIT])
+
+
+async def dashboard(request):
+    """Async /api/schedules/dashboard/"""
+    student, error = await authenticate_student(request)
+    if error is not None:
+        return error
+
+    payload = await AsyncDashboardBootstrap(request).build()
+    response = json_response(payload)
+    response['Server-Timing'] = ', '.join(
+        f'{name};dur={duration}' for name, duration in payload['timings'].items()
+    )
+    return response
+
+
+async def what_if(request):
+    """Async /api/schedules/degree-audits/what_if/: the transcript and compiled programs load concurrently"""
+    student, error = await authenticate_student(request)
+    if error is not None:
+        return error
+
+    transcript, compiled_programs = await asyncio.gather(
+        Transcript.afor_student(student),
+        sync_to_async(get_compiled_programs)(Program.objects.filter(is_active=True)),
+    )
+    auditor = WhatIfAuditor(student, transcript=transcript)
+    return json_response(auditor.evaluate_compiled(compiled_programs))
@@ -0,0 +1,122 @@
+"""
+Dashboard bootstrap: everything the dashboard shows, in one response.
+
+The student context (profile, passed courses, prerequisite validator) and the
+active catalog are loaded once and shared by every section. Sections are
+independent reads, so they run on a process-wide thread pool. Its threads
+are long-lived and keep their database connections between requests the way
+request threads do: a connection is only closed once it is past
+CONN_MAX_AGE or unusable, and with connection pooling it goes back to the
+pool.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.db import close_old_connections, connection
+from courses.models import Course
+from courses.serializers import CourseRecommendationSerializer, CourseWithPrerequisitesSerializer
+from courses.services import PrerequisiteValidator
+from users.serializers import StudentWithProfileSerializer
+from .models import DegreeAudit, Schedule
+from .serializers import DegreeAuditSerializer, ScheduleSerializer
+
+
+DASHBOARD_MAX_WORKERS = 4
+
+# Number of recommendations the dashboard shows
+RECOMMENDATION_LIMIT = 5
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The shared section thread pool, started on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DASHBOARD_MAX_WORKERS, thread_name_prefix='dashboard')
+        return _executor
+
+
+class DashboardBootstrap:
+    """
+    Build the combined dashboard payload for one request.
+
+    ``build()`` returns the sections keyed by name plus ``timings``, the
+    milliseconds each section took. With ``threaded=False`` the sections run
+    one after another in the calling thread.
+    """
+    SECTIONS = ['user', 'degree_audits', 'schedules', 'available_courses', 'recommendations']
+
+    def __init__(self, request, threaded=True):
+        self.request = request
+        self.threaded = threaded
+        self.student = request.user.student_profile
+        self.validator = PrerequisiteValidator(self.student)
+        self.context = {'request': request, 'prerequisite_validator': self.validator}
+        self._courses = None
+        self._courses_lock = threading.Lock()
+
+    def build(self):
+        timings = {}
+        if self.threaded and not connection.in_atomic_block:
+            executor = get_executor()
+            # Each thread runs in a copy of this context, so use_primary() pinning carries over
+            futures = {
+                name: executor.submit(contextvars.copy_context().run, self._run_in_thread, name, timings)
+                for name in self.SECTIONS
+            }
+            payload = {name: future.result() for name, future in futures.items()}
+        else:
+            # Other connections cannot see an open transaction's writes (ATOMIC_REQUESTS, tests)
+            payload = {name: self._run(name, timings) for name in self.SECTIONS}
+        payload['timings'] = timings
+        return payload
+
+    def _run(self, name, timings):
+        start = time.perf_counter()
+        try:
+            return getattr(self, f'get_{name}')()
+        finally:
+            timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    def _run_in_thread(self, name, timings):
+        # What request_started/request_finished do for request threads
+        close_old_connections()
+        try:
+            return self._run(name, timings)
+        finally:
+            close_old_connections()
+
+    def courses(self):
+        """The active courses, loaded once for the available course and recommendation sections"""
+        with self._courses_lock:
+            if self._courses is None:
+                self._courses = list(
+                    Course.objects.filter(is_active=True).with_serializer_relations(nested_prerequisites=True)
+                )
+            return self._courses
+
+    def get_user(self):
+        return StudentWithProfileSerializer(self.request.user).data
+
+    def get_degree_audits(self):
+        audits = DegreeAudit.objects.filter(student=self.student).with_progress()
+        return DegreeAuditSerializer(audits, many=True, context={**self.context, 'expand': set()}).data
+
+    def get_schedules(self):
+        schedules = Schedule.objects.filter(student=self.student).select_related('student__user')
+        return ScheduleSerializer(schedules, many=True, context=self.context).data
+
+    def get_available_courses(self):
+        courses = self.validator.get_available_courses(self.courses())
+        return CourseWithPrerequisitesSerializer(courses, many=True, context=self.context).data
+
+    def get_recommendations(self):
+        recommendations = self.validator.get_recommended_course_sequence(
+            courses=self.courses()
+        )[:RECOMMENDATION_LIMIT]
+        return CourseRecommendationSerializer(recommendations, many=True, context=self.context).data
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import Counter
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from rest_framework.test import APIClient
+from courses.models import CourseOffering
+from users.models import StudentProfile
+from schedules.models import Schedule
+
+USERNAME_PREFIX = 'benchmark-add-course-'
+
+
+class Command(BaseCommand):
+    help = 'Add courses to schedules from many threads at once and report throughput, latency and lock errors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=25, help='add_course requests per client')
+
+    def handle(self, *args, **options):
+        offerings = list(CourseOffering.objects.values_list('id', flat=True)[:options['requests']])
+        if not offerings:
+            self.stdout.write(self.style.WARNING('No course offerings to add; load sample data first'))
+            return
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+            self.stdout.write(f'SQLite {connection.settings_dict["NAME"]} (journal_mode={journal_mode})')
+        else:
+            self.stdout.write(f'{connection.vendor} (CONN_MAX_AGE={connection.settings_dict["CONN_MAX_AGE"]})')
+
+        self._cleanup()
+        clients = [self._create_client(number, options['requests']) for number in range(options['threads'])]
+        latencies = []
+        statuses = Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(clients))
+
+        def run(user, schedule_ids):
+            client = APIClient()
+            client.force_authenticate(user)
+            barrier.wait()
+            try:
+                for schedule_id, offering_id in zip(schedule_ids, offerings * len(schedule_ids)):
+                    start = time.perf_counter()
+                    try:
+                        response = client.post(
+                            f'/api/schedules/schedules/{schedule_id}/add_course/',
+                            {'offering_id': offering_id}, format='json'
+                        )
+                        outcome = response.status_code
+                    except OperationalError as error:
+                        outcome = str(error)
+                    with lock:
+                        latencies.append(time.perf_counter() - start)
+                        statuses[outcome] += 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=run, args=client) for client in clients]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        self._cleanup()
+
+        latencies.sort()
+        percentile = lambda fraction: latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+        self.stdout.write(
+            f'{len(latencies)} requests from {len(clients)} threads in {elapsed:.2f} s '
+            f'({len(latencies) / elapsed:.1f} req/s)'
+        )
+        self.stdout.write(
+            f'Latency p50 {percentile(0.5):.1f} ms, p95 {percentile(0.95):.1f} ms, max {latencies[-1] * 1000:.1f} ms'
+        )
+        for outcome, count in sorted(statuses.items(), key=str):
+            style = self.style.SUCCESS if outcome == 201 else self.style.ERROR
+            self.stdout.write(style(f'  {outcome}: {count}'))
+
+    def _create_client(self, number, requests):
+        user = User.objects.create_user(username=f'{USERNAME_PREFIX}{number}')
+        student = StudentProfile.objects.create(user=user, student_id=f'BENCH{number:04d}')
+        schedules = Schedule.objects.bulk_create(
+            Schedule(student=student, semester='fall', year=2025, name=f'Benchmark {index}')
+            for index in range(requests)
+        )
+        return User.objects.get(pk=user.pk), [schedule.pk for schedule in schedules]
+
+    def _cleanup(self):
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client
+from rest_framework.authtoken.models import Token
+from users.models import StudentProfile
+
+ENDPOINTS = {
+    'dashboard': ('/api/schedules/dashboard/', '/api/schedules/async/dashboard/'),
+    'what_if': ('/api/schedules/degree-audits/what_if/', '/api/schedules/async/degree-audits/what_if/'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare a synchronous endpoint served through the WSGI handler from a thread pool with its '
+        'async variant served through the ASGI handler on one event loop. For a deployment benchmark, '
+        'run "uvicorn uniplanner.asgi:application" and point a load generator at both URLs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='dashboard')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per handler')
+        parser.add_argument('--concurrency', type=int, default=8, help='WSGI threads / concurrent ASGI requests')
+
+    def handle(self, *args, **options):
+        student = StudentProfile.objects.select_related('user').first()
+        if student is None:
+            raise CommandError('No students; load sample data first')
+        token, _ = Token.objects.get_or_create(user=student.user)
+        headers = {'Authorization': f'Token {token.key}'}
+        sync_url, async_url = ENDPOINTS[options['endpoint']]
+        self.stdout.write(
+            f'{options["requests"]} requests per handler, concurrency {options["concurrency"]}, '
+            f'as {student.user.username}'
+        )
+
+        wsgi = self.report('WSGI ' + sync_url, self.run_wsgi(sync_url, headers, options))
+        asgi = self.report('ASGI ' + async_url, asyncio.run(self.run_asgi(async_url, headers, options)))
+        self.stdout.write(self.style.SUCCESS(f'ASGI/WSGI throughput x{asgi / wsgi:.2f}'))
+
+    def run_wsgi(self, url, headers, options):
+        def get(_):
+            start = time.perf_counter()
+            try:
+                response = Client().get(url, headers=headers)
+                return response.status_code, time.perf_counter() - start
+            finally:
+                connections.close_all()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(get, range(options['requests'])))
+        return results, time.perf_counter() - start
+
+    async def run_asgi(self, url, headers, options):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def get():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                return response.status_code, time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(get() for _ in range(options['requests'])))
+        return results, time.perf_counter() - start
+
+    def report(self, label, run):
+        results, elapsed = run
+        latencies = sorted(latency for _, latency in results)
+        failures = sum(status != 200 for status, _ in results)
+        throughput = len(results) / elapsed
+        self.stdout.write(
+            f'  {label:<50} {throughput:8.1f} req/s  p50 {latencies[len(latencies) // 2] * 1000:7.1f} ms  '
+            f'p95 {latencies[int(len(latencies) * 0.95)] * 1000:7.1f} ms  failures {failures}'
+        )
+        return throughput
@@ -0,0 +1,88 @@
+import random
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from courses.models import (
+    Course, Department, Program, ProgramCourseRequirement, ProgramRequirement, ProgramType
+)
+from schedules import services
+from schedules.services import Transcript, WhatIfAuditor
+
+CODE_PREFIX = 'WHATIF-'
+
+
+class Command(BaseCommand):
+    help = (
+        'Build a set of synthetic programs, evaluate one transcript against all of them with the what-if '
+        'auditor and report the latency against the target. Nothing is left in the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--programs', type=int, default=300)
+        parser.add_argument('--requirements', type=int, default=6, help='Requirements per program')
+        parser.add_argument('--courses', type=int, default=5, help='Courses per requirement')
+        parser.add_argument('--runs', type=int, default=20, help='Timed evaluations with compiled programs cached')
+        parser.add_argument('--target-ms', type=float, default=200.0)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                transaction.set_rollback(True)
+        finally:
+            services._compiled_programs.clear()
+
+    def run(self, options):
+        rng = random.Random(0)
+        department = Department.objects.create(code='WHATIF', name='What-if benchmark')
+        courses = Course.objects.bulk_create(
+            Course(department=department, course_number=f'{number:04d}', title=f'Course {number}', credits=3)
+            for number in range(options['requirements'] * options['courses'] * 4)
+        )
+        program_type, _ = ProgramType.objects.get_or_create(name='major', defaults={'display_name': 'Major'})
+        programs = Program.objects.bulk_create(
+            Program(
+                name=f'{CODE_PREFIX}{number}', code=f'{CODE_PREFIX}{number}', program_type=program_type,
+                department=department, total_credits_required=120
+            )
+            for number in range(options['programs'])
+        )
+        requirements = ProgramRequirement.objects.bulk_create(
+            ProgramRequirement(
+                program=program, name=f'Requirement {order}', requirement_type='required_courses',
+                credits_required=options['courses'] * 3, order=order
+            )
+            for program in programs for order in range(options['requirements'])
+        )
+        ProgramCourseRequirement.objects.bulk_create(
+            ProgramCourseRequirement(requirement=requirement, course=course)
+            for requirement in requirements for course in rng.sample(courses, options['courses'])
+        )
+
+        passed = rng.sample(courses, len(courses) // 3)
+        auditor = WhatIfAuditor(None, Transcript({course.id: Decimal('3') for course in passed}))
+        benchmark_programs = Program.objects.filter(code__startswith=CODE_PREFIX, is_active=True)
+
+        start = time.perf_counter()
+        results = auditor.evaluate_all(benchmark_programs)
+        cold = (time.perf_counter() - start) * 1000
+
+        timings = []
+        for _ in range(options['runs']):
+            start = time.perf_counter()
+            auditor.evaluate_all(benchmark_programs)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p50 = timings[len(timings) // 2]
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+        self.stdout.write(
+            f'{len(results)} programs x {options["requirements"]} requirements, '
+            f'transcript of {len(passed)} courses'
+        )
+        self.stdout.write(f'  compile and evaluate  {cold:8.1f} ms')
+        self.stdout.write(f'  cached evaluate       p50 {p50:6.1f} ms  p95 {p95:6.1f} ms  max {timings[-1]:6.1f} ms')
+        if p95 > options['target_ms']:
+            raise CommandError(f'p95 {p95:.1f} ms is over the {options["target_ms"]:.0f} ms target')
+        self.stdout.write(self.style.SUCCESS(f'Within the {options["target_ms"]:.0f} ms target'))
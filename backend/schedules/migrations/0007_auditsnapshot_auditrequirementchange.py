@@ -0,0 +1,108 @@
+# Generated by Django 4.2.24 on 2026-10-19 00:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schedules", "0006_usercourseselection_timetable_box_id"),
+        ("users", "0003_auto_20250916_0612"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sequence", models.PositiveIntegerField()),
+                ("is_checkpoint", models.BooleanField(default=False)),
+                (
+                    "payload",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Full state for checkpoints, changes otherwise",
+                    ),
+                ),
+                ("recorded_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "degree_audit",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshots",
+                        to="schedules.degreeaudit",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="audit_snapshots",
+                        to="users.studentprofile",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["degree_audit", "sequence"],
+                "unique_together": {("degree_audit", "sequence")},
+            },
+        ),
+        migrations.CreateModel(
+            name="AuditRequirementChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "requirement_id",
+                    models.PositiveIntegerField(
+                        help_text="ID of the program requirement (kept if the requirement is deleted)"
+                    ),
+                ),
+                ("requirement_name", models.CharField(max_length=200)),
+                ("was_satisfied", models.BooleanField(blank=True, null=True)),
+                ("is_satisfied", models.BooleanField()),
+                ("recorded_at", models.DateTimeField()),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="audit_requirement_changes",
+                        to="users.studentprofile",
+                    ),
+                ),
+                (
+                    "snapshot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="requirement_changes",
+                        to="schedules.auditsnapshot",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-recorded_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["student", "requirement_id", "recorded_at"],
+                        name="schedules_a_student_814a96_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.24 on 2026-10-19 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0012_course_course_active_dept_number_idx_and_more"),
+        ("schedules", "0007_auditsnapshot_auditrequirementchange"),
+        ("users", "0005_completedcourse_completed_student_grade_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="usercourseselection",
+            index=models.Index(
+                fields=["degree_audit", "status"], name="selection_audit_status_idx"
+            ),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Count, Q, Sum
 from django.contrib.auth.models import User
 
 
@@ -98,12 +99,25 @@ class ScheduleItem(models.Model):
         return True
 
 
+class DegreeAuditQuerySet(models.QuerySet):
+    def with_progress(self):
+        """Annotate the inputs of calculate_progress so it needs no further queries"""
+        completed = Q(course_selections__status='completed')
+        return self.select_related('student', 'program__program_type').annotate(
+            completed_selection_credits=Sum('course_selections__course__credits', filter=completed),
+            course_selections_count=Count('course_selections'),
+            completed_course_selections=Count('course_selections', filter=completed),
+        ).order_by(*DegreeAudit._meta.ordering)  # Meta.ordering is dropped from aggregate queries
+
+
 class DegreeAudit(models.Model):
     """Tracks degree progress for a student"""
     student = models.ForeignKey('users.StudentProfile', on_delete=models.CASCADE, related_name='degree_audits')
     program = models.ForeignKey('courses.Program', on_delete=models.CASCADE, related_name='audits')
     last_updated = models.DateTimeField(auto_now=True)
     
+    objects = DegreeAuditQuerySet.as_manager()
+    
     class Meta:
         unique_together = ['student', 'program']
         ordering = ['-last_updated']
@@ -115,11 +129,19 @@ class DegreeAudit(models.Model):
         """Calculate degree completion progress"""
         total_credits_required = self.program.total_credits_required
         
-        course_selections = UserCourseSelection.objects.filter(degree_audit=self)
-        completed_courses = course_selections.filter(status='completed')
-        credits_earned = sum(
-            float(selection.course.credits) for selection in completed_courses
-        )
+        if hasattr(self, 'completed_selection_credits'):
+            # Annotated by DegreeAuditQuerySet.with_progress()
+            credits_earned = float(self.completed_selection_credits or 0)
+            course_selections_count = self.course_selections_count
+            completed_course_selections = self.completed_course_selections
+        else:
+            course_selections = UserCourseSelection.objects.filter(degree_audit=self)
+            completed_courses = course_selections.filter(status='completed')
+            credits_earned = sum(
+                float(selection.course.credits) for selection in completed_courses
+            )
+            course_selections_count = course_selections.count()
+            completed_course_selections = completed_courses.count()
         
         student_completed_credits = self.student.total_credits_earned or 0
         total_credits_earned = max(credits_earned, student_completed_credits)
@@ -129,65 +151,40 @@ class DegreeAudit(models.Model):
             'credits_earned': total_credits_earned,
             'credits_remaining': float(total_credits_required) - total_credits_earned,
             'percentage_complete': (total_credits_earned / float(total_credits_required) * 100) if total_credits_required > 0 else 0,
-            'course_selections_count': course_selections.count(),
-            'completed_course_selections': completed_courses.count()
+            'course_selections_count': course_selections_count,
+            'completed_course_selections': completed_course_selections
         }
     
     def get_requirement_status(self):
         """Get status of each degree requirement"""
-        requirements_status = []
-        
-        for requirement in self.program.requirements.all():
-            satisfied_courses = []
-            for course_req in requirement.course_requirements.filter(is_required=True):
-                if (self.student.completed_courses
-                    .filter(course=course_req.course, 
-                           grade__in=['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'P'])
-                    .exists()):
-                    satisfied_courses.append(course_req.course)
-            
-            credits_earned = sum(course.credits for course in satisfied_courses)
-            credits_required = requirement.credits_required or 0
-            
-            requirements_status.append({
-                'requirement': {
-                    'id': requirement.id,
-                    'name': requirement.name,
-                    'requirement_type': requirement.requirement_type,
-                    'description': requirement.description,
-                    'credits_required': requirement.credits_required,
-                },
-                'credits_required': requirement.credits_required,
-                'credits_earned': credits_earned,
-                'is_satisfied': credits_earned >= credits_required,
-                'satisfied_courses': [
-                    {
-                        'id': course.id,
-                        'full_code': course.full_code,
-                        'title': course.title,
-                        'credits': course.credits,
-                    }
-                    for course in satisfied_courses
-                ]
-            })
+        from .services import Transcript, get_compiled_program
         
-        return requirements_status
+        compiled = get_compiled_program(self.program)
+        return compiled.requirement_status(Transcript.for_student(self.student))
     
     def get_cross_program_satisfaction(self):
         """Get courses that satisfy multiple programs for this student"""
-        student_audits = DegreeAudit.objects.filter(student=self.student).exclude(id=self.id)
-        cross_program_courses = []
+        from .services import Transcript, get_compiled_program
         
-        all_selections = UserCourseSelection.objects.filter(
+        student_audits = DegreeAudit.objects.filter(student=self.student).exclude(id=self.id).select_related('program')
+        all_selections = list(UserCourseSelection.objects.filter(
             student=self.student,
             status='completed'
-        )
+        ).select_related('course__department'))
+        transcript = Transcript({selection.course_id: selection.course.credits for selection in all_selections})
+        
+        # Program constraints (exclusions, caps, cross-listings, substitutions) decide what counts
+        other_programs = [
+            (audit.program.name, get_compiled_program(audit.program).satisfying_courses(transcript))
+            for audit in student_audits
+        ]
+        cross_program_courses = []
         
         for selection in all_selections:
-            other_programs_satisfied = []
-            for audit in student_audits:
-                if self._course_satisfies_program_requirements(selection.course, audit.program):
-                    other_programs_satisfied.append(audit.program.name)
+            other_programs_satisfied = [
+                program_name for program_name, satisfying in other_programs
+                if selection.course_id in satisfying
+            ]
             
             if other_programs_satisfied:
                 cross_program_courses.append({
@@ -202,14 +199,6 @@ class DegreeAudit(models.Model):
                 })
         
         return cross_program_courses
-    
-    def _course_satisfies_program_requirements(self, course, program):
-        """Check if a course satisfies requirements for a specific program"""
-        for requirement in program.requirements.all():
-            for course_req in requirement.course_requirements.filter(is_required=True):
-                if course_req.course == course:
-                    return True
-        return False
 
 
 class UserCourseSelection(models.Model):
@@ -234,6 +223,51 @@ class UserCourseSelection(models.Model):
     class Meta:
         unique_together = ['student', 'course', 'degree_audit']
         ordering = ['-added_at']
+        indexes = [
+            models.Index(fields=['degree_audit', 'status'], name='selection_audit_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.student.user.get_full_name()} - {self.course.full_code} ({self.status})"
+
+class AuditSnapshot(models.Model):
+    """
+    One step in a degree audit's history.
+    Checkpoints store the full requirement state; all other snapshots store only
+    the diff against the previous snapshot.
+    """
+    degree_audit = models.ForeignKey(DegreeAudit, on_delete=models.CASCADE, related_name='snapshots')
+    student = models.ForeignKey('users.StudentProfile', on_delete=models.CASCADE, related_name='audit_snapshots')
+    sequence = models.PositiveIntegerField()
+    is_checkpoint = models.BooleanField(default=False)
+    payload = models.JSONField(default=dict, help_text="Full state for checkpoints, changes otherwise")
+    recorded_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['degree_audit', 'sequence']
+        ordering = ['degree_audit', 'sequence']
+    
+    def __str__(self):
+        kind = 'checkpoint' if self.is_checkpoint else 'diff'
+        return f"{self.degree_audit} #{self.sequence} ({kind})"
+
+
+class AuditRequirementChange(models.Model):
+    """Index of requirement satisfaction changes recorded in audit snapshots"""
+    snapshot = models.ForeignKey(AuditSnapshot, on_delete=models.CASCADE, related_name='requirement_changes')
+    student = models.ForeignKey('users.StudentProfile', on_delete=models.CASCADE, related_name='audit_requirement_changes')
+    requirement_id = models.PositiveIntegerField(help_text="ID of the program requirement (kept if the requirement is deleted)")
+    requirement_name = models.CharField(max_length=200)
+    was_satisfied = models.BooleanField(null=True, blank=True)
+    is_satisfied = models.BooleanField()
+    recorded_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['-recorded_at']
+        indexes = [
+            models.Index(fields=['student', 'requirement_id', 'recorded_at']),
+        ]
     
     def __str__(self):
-        return f"{self.student.user.get_full_name()} - {self.course.full_code} ({self.status})"
\ No newline at end of file
+        state = 'satisfied' if self.is_satisfied else 'unsatisfied'
+        return f"{self.requirement_name} became {state} at {self.recorded_at}"
@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from .models import Schedule, ScheduleItem, DegreeAudit, UserCourseSelection
+from .models import Schedule, ScheduleItem, DegreeAudit, UserCourseSelection, AuditRequirementChange
 from .services import ScheduleConflictDetector
+from courses.compact import SideloadMixin
 from courses.serializers import CourseOfferingSerializer
 from users.serializers import StudentProfileSerializer
 
@@ -19,7 +20,9 @@ class ScheduleSerializer(serializers.ModelSerializer):
         ]
 
 
-class ScheduleItemSerializer(serializers.ModelSerializer):
+class ScheduleItemSerializer(SideloadMixin, serializers.ModelSerializer):
+    SIDELOADED_FIELDS = {'offering': 'offerings'}
+    
     offering = CourseOfferingSerializer(read_only=True)
     offering_id = serializers.IntegerField(write_only=True)
     
@@ -57,12 +60,27 @@ class ScheduleWithItemsSerializer(ScheduleSerializer):
 
 
 class DegreeAuditSerializer(serializers.ModelSerializer):
+    """
+    Full degree audit representation.
+    When the context carries an ``expand`` set (list mode), the expensive sections in
+    EXPANDABLE_FIELDS are only included if they were explicitly requested.
+    """
+    EXPANDABLE_FIELDS = ['student', 'requirement_status', 'cross_program_satisfaction']
+    
     student = StudentProfileSerializer(read_only=True)
     program = serializers.StringRelatedField(read_only=True)
     progress = serializers.SerializerMethodField()
     requirement_status = serializers.SerializerMethodField()
     cross_program_satisfaction = serializers.SerializerMethodField()
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        expand = self.context.get('expand')
+        if expand is not None:
+            for field_name in self.EXPANDABLE_FIELDS:
+                if field_name not in expand:
+                    self.fields.pop(field_name)
+    
     def get_progress(self, obj):
         """Get degree completion progress"""
         return obj.calculate_progress()
@@ -83,6 +101,18 @@ class DegreeAuditSerializer(serializers.ModelSerializer):
         ]
 
 
+class AuditRequirementChangeSerializer(serializers.ModelSerializer):
+    degree_audit = serializers.IntegerField(source='snapshot.degree_audit_id', read_only=True)
+    sequence = serializers.IntegerField(source='snapshot.sequence', read_only=True)
+    
+    class Meta:
+        model = AuditRequirementChange
+        fields = [
+            'id', 'degree_audit', 'sequence', 'requirement_id', 'requirement_name',
+            'was_satisfied', 'is_satisfied', 'recorded_at'
+        ]
+
+
 class UserCourseSelectionSerializer(serializers.ModelSerializer):
     course_details = serializers.SerializerMethodField()
     student = serializers.PrimaryKeyRelatedField(read_only=True)
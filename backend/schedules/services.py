@@ -1,8 +1,17 @@
+import threading
+from collections import defaultdict
+from decimal import Decimal
 from typing import List, Dict, Tuple, Set
 from datetime import time, datetime
+from django.db import IntegrityError, transaction
 from django.db.models import Q
-from .models import Schedule, ScheduleItem
-from courses.models import CourseOffering, TimeSlot
+from .models import Schedule, ScheduleItem, AuditSnapshot, AuditRequirementChange
+from courses.models import (
+    CourseOffering, TimeSlot, Program, ProgramRequirement, ProgramCourseRequirement,
+    ProgramConstraint
+)
+from courses.snapshot import get_catalog_snapshot
+from users.models import CompletedCourse
 
 
 class ScheduleConflictDetector:
@@ -200,13 +209,31 @@ class ScheduleConflictDetector:
             year=self.schedule.year
         ).exclude(id=conflicting_offering.id)
         
+        snapshot = get_catalog_snapshot()
+        busy = self._occupancy(snapshot) if snapshot is not None else None
         for offering in other_offerings:
+            if busy is not None:
+                occupancy = snapshot.occupancy(offering.id)
+                if occupancy is not None and not occupancy & busy:
+                    # Free at every slot the schedule uses, so no time slot can overlap
+                    alternatives.append(offering)
+                    continue
             can_add, _ = self.can_add_course(offering)
             if can_add:
                 alternatives.append(offering)
         
         return alternatives
     
+    def _occupancy(self, snapshot):
+        """Weekly occupancy bitmap of the schedule's offerings, or None if the snapshot lacks one"""
+        busy = 0
+        for offering_id in {slot['offering'].id for slot in self.time_slots}:
+            occupancy = snapshot.occupancy(offering_id)
+            if occupancy is None:
+                return None
+            busy |= occupancy
+        return busy
+    
     def optimize_schedule(self) -> Dict:
         """
         Suggest optimizations for the current schedule.
@@ -291,3 +318,491 @@ class ScheduleConflictDetector:
         start_minutes = start.hour * 60 + start.minute
         end_minutes = end.hour * 60 + end.minute
         return end_minutes - start_minutes
+
+
+def course_mask(course_ids) -> int:
+    """
+    Course bitmap with bit ``n`` set for each course ID ``n``.
+    
+    Masks are plain ints as wide as their largest course ID, and &, | and shifts
+    cost time proportional to that width: with dense autoincrement IDs a mask of
+    the whole catalog is a few KB, but a single course with ID 10**7 makes every
+    mask holding it over 1 MB. If course IDs ever become sparse or very large
+    (imported external keys, UUID-derived integers), map them to dense indexes
+    before building masks.
+    """
+    mask = 0
+    for course_id in course_ids:
+        mask |= 1 << course_id
+    return mask
+
+
+class Transcript:
+    """
+    Bitmap view of a student's passed courses.
+    Bit ``n`` of ``mask`` is set when the course with ID ``n`` has been passed
+    (see course_mask()).
+    """
+    
+    def __init__(self, course_credits: Dict[int, Decimal]):
+        self.credits = course_credits
+        self.mask = course_mask(course_credits)
+        self.total_credits = sum(course_credits.values(), Decimal('0'))
+    
+    @staticmethod
+    def _passed_course_credits(student_profile):
+        return (
+            CompletedCourse.objects
+            .filter(student=student_profile, grade__in=CompletedCourse.PASSING_GRADES)
+            .order_by('year', 'id')
+            .values_list('course_id', 'course__credits')
+        )
+    
+    @classmethod
+    def for_student(cls, student_profile) -> 'Transcript':
+        """Build the transcript for a student with a single query"""
+        return cls(dict(cls._passed_course_credits(student_profile)))
+    
+    @classmethod
+    async def afor_student(cls, student_profile) -> 'Transcript':
+        """Async version of for_student(), using the async ORM"""
+        rows = cls._passed_course_credits(student_profile)
+        return cls({course_id: credits async for course_id, credits in rows})
+    
+    def credits_in(self, mask: int) -> Decimal:
+        """Sum the credits of passed courses whose bits are set in ``mask``"""
+        matched = mask & self.mask
+        total = Decimal('0')
+        while matched:
+            lowest = matched & -matched
+            total += self.credits[lowest.bit_length() - 1]
+            matched ^= lowest
+        return total
+
+
+class CompiledProgram:
+    """
+    Precompiled requirement representation for a single program.
+    Each requirement is reduced to one instruction — a course bitmap and a credit
+    threshold — so a transcript can be evaluated without touching the ORM.
+    Compiled programs are cached per process and keyed by Program.requirements_version.
+    """
+    
+    def __init__(self, program_id: int, version: int, name: str, code: str, total_credits_required: Decimal):
+        self.program_id = program_id
+        self.version = version
+        self.name = name
+        self.code = code
+        self.total_credits_required = total_credits_required
+        self.instructions = []  # (requirement_id, course_mask, credits_threshold)
+        self.requirements = {}  # requirement_id -> (requirement metadata, ordered course IDs)
+        self.courses = {}  # course_id -> course details
+        self.required_mask = 0
+        
+        # Compiled ProgramConstraint rules, see add_constraint()
+        self.substitutions = {}  # substitute course_id -> replaced course_id
+        self.excluded_mask = 0
+        self.credit_caps = []  # max_credits
+        self.course_caps = defaultdict(list)  # course_id -> indexes into credit_caps
+        self.cross_listings = {}  # course_id -> cross-listing group; only one course per group counts
+        self.cross_listing_groups = 0
+        self.constrained_mask = 0
+    
+    def add_requirement(self, requirement: Dict, course_ids: List[int]):
+        mask = course_mask(course_ids)
+        self.required_mask |= mask
+        self.requirements[requirement['id']] = (requirement, course_ids)
+        self.instructions.append((requirement['id'], mask, requirement['credits_required'] or 0))
+    
+    def add_constraint(self, constraint_type: str, affected_courses: List, conditions: Dict):
+        """
+        Compile one ProgramConstraint. ``affected_courses`` holds course IDs:
+        
+        - substitution: each affected course counts as ``conditions['replaces']``
+        - exclusion: affected courses never count toward the program
+        - credit_limit: at most ``conditions['max_credits']`` from affected courses count
+        - cross_listing: affected courses are listings of one course; only the first counts
+        
+        Malformed rules and prerequisite overrides have no effect on audits.
+        """
+        try:
+            course_ids = [int(course_id) for course_id in affected_courses]
+            mask = course_mask(course_ids)
+            
+            if constraint_type == 'substitution':
+                replaces = int(conditions['replaces'])
+                for course_id in course_ids:
+                    self.substitutions[course_id] = replaces
+            elif constraint_type == 'exclusion':
+                self.excluded_mask |= mask
+            elif constraint_type == 'credit_limit':
+                self.credit_caps.append(Decimal(str(conditions['max_credits'])))
+                for course_id in set(course_ids):
+                    self.course_caps[course_id].append(len(self.credit_caps) - 1)
+            elif constraint_type == 'cross_listing':
+                for course_id in course_ids:
+                    self.cross_listings.setdefault(course_id, self.cross_listing_groups)
+                self.cross_listing_groups += 1
+            else:
+                return
+        except (KeyError, TypeError, ValueError, ArithmeticError):
+            return
+        
+        self.constrained_mask |= mask
+    
+    def counted_courses(self, transcript: Transcript):
+        """
+        Yield (course_id, counts_as, credits) for each of the transcript's courses
+        that still counts once the compiled constraints are applied, in one pass.
+        """
+        cap_used = [Decimal('0')] * len(self.credit_caps)
+        listed = set()
+        
+        for course_id, credits in transcript.credits.items():
+            counts_as = course_id
+            if self.constrained_mask >> course_id & 1:
+                if self.excluded_mask >> course_id & 1:
+                    continue
+                
+                group = self.cross_listings.get(course_id)
+                if group is not None:
+                    if group in listed:
+                        continue
+                    listed.add(group)
+                
+                for index in self.course_caps.get(course_id, ()):
+                    credits = min(credits, self.credit_caps[index] - cap_used[index])
+                    cap_used[index] += max(credits, Decimal('0'))
+                if credits <= 0:
+                    continue
+                
+                counts_as = self.substitutions.get(course_id, course_id)
+            
+            yield course_id, counts_as, credits
+    
+    def apply_constraints(self, transcript: Transcript) -> Transcript:
+        """Apply compiled constraints to a transcript in one pass over its courses"""
+        if not self.constrained_mask & transcript.mask:
+            return transcript
+        
+        effective = {}
+        for _, counts_as, credits in self.counted_courses(transcript):
+            effective.setdefault(counts_as, credits)
+        return Transcript(effective)
+    
+    def satisfying_courses(self, transcript: Transcript) -> Set[int]:
+        """IDs of the transcript's courses that count toward a requirement once constraints are applied"""
+        satisfying = set()
+        counted = set()
+        for course_id, counts_as, _ in self.counted_courses(transcript):
+            # As in apply_constraints(), only the first course counted as a given course counts
+            if counts_as not in counted and self.required_mask >> counts_as & 1:
+                satisfying.add(course_id)
+            counted.add(counts_as)
+        return satisfying
+    
+    @property
+    def requirement_credits_required(self) -> Decimal:
+        return sum((threshold for _, _, threshold in self.instructions), Decimal('0'))
+    
+    def requirement_status(self, transcript: Transcript) -> List[Dict]:
+        """Evaluate each requirement; same structure as DegreeAudit.get_requirement_status()"""
+        transcript = self.apply_constraints(transcript)
+        status = []
+        for requirement_id, mask, threshold in self.instructions:
+            requirement, course_ids = self.requirements[requirement_id]
+            satisfied_ids = [course_id for course_id in course_ids if transcript.mask >> course_id & 1]
+            satisfied_courses = [self.courses[course_id] for course_id in satisfied_ids]
+            credits_earned = sum(transcript.credits[course_id] for course_id in satisfied_ids)
+            status.append({
+                'requirement': dict(requirement),
+                'credits_required': requirement['credits_required'],
+                'credits_earned': credits_earned,
+                'is_satisfied': credits_earned >= threshold,
+                'satisfied_courses': [dict(course) for course in satisfied_courses],
+            })
+        return status
+    
+    def evaluate(self, transcript: Transcript) -> Dict:
+        """Summarize a transcript's progress through this program"""
+        transcript = self.apply_constraints(transcript)
+        requirements_remaining = Decimal('0')
+        requirements_satisfied = 0
+        
+        for _, mask, threshold in self.instructions:
+            earned = transcript.credits_in(mask)
+            if earned >= threshold:
+                requirements_satisfied += 1
+            else:
+                requirements_remaining += threshold - earned
+        
+        credits_required = max(self.total_credits_required, self.requirement_credits_required)
+        credits_remaining = max(
+            self.total_credits_required - transcript.total_credits,
+            requirements_remaining,
+            Decimal('0')
+        )
+        
+        return {
+            'program': {
+                'id': self.program_id,
+                'name': self.name,
+                'code': self.code,
+            },
+            'total_credits_required': float(credits_required),
+            'credits_earned': float(credits_required - credits_remaining),
+            'credits_remaining': float(credits_remaining),
+            'percentage_complete': float(
+                (credits_required - credits_remaining) / credits_required * 100
+            ) if credits_required > 0 else 0,
+            'requirements_satisfied': requirements_satisfied,
+            'requirements_total': len(self.instructions),
+        }
+
+
+_compiled_programs = {}
+_compiled_programs_lock = threading.Lock()
+
+
+def compile_programs(programs) -> List[CompiledProgram]:
+    """
+    Compile a queryset of programs into CompiledProgram objects.
+    Runs a fixed number of queries regardless of how many programs are compiled.
+    """
+    compiled = {
+        program_id: CompiledProgram(program_id, version, name, code, total_credits_required)
+        for program_id, version, name, code, total_credits_required in
+        programs.values_list('id', 'requirements_version', 'name', 'code', 'total_credits_required')
+    }
+    
+    required_courses = defaultdict(list)
+    for requirement_id, program_id, course_id, department_code, course_number, title, credits in (
+        ProgramCourseRequirement.objects
+        .filter(requirement__program_id__in=compiled.keys(), is_required=True)
+        .values_list(
+            'requirement_id', 'requirement__program_id', 'course_id',
+            'course__department__code', 'course__course_number', 'course__title', 'course__credits'
+        )
+    ):
+        required_courses[requirement_id].append(course_id)
+        compiled[program_id].courses[course_id] = {
+            'id': course_id,
+            'full_code': f"{department_code} {course_number}",
+            'title': title,
+            'credits': credits,
+        }
+    
+    for requirement in (
+        ProgramRequirement.objects
+        .filter(program_id__in=compiled.keys())
+        .values('id', 'program_id', 'name', 'requirement_type', 'description', 'credits_required')
+    ):
+        program_id = requirement.pop('program_id')
+        compiled[program_id].add_requirement(requirement, required_courses[requirement['id']])
+    
+    for program_id, constraint_type, affected_courses, conditions in (
+        ProgramConstraint.objects
+        .filter(program_id__in=compiled.keys(), is_active=True)
+        .values_list('program_id', 'constraint_type', 'affected_courses', 'conditions')
+    ):
+        compiled[program_id].add_constraint(constraint_type, affected_courses or [], conditions or {})
+    
+    return list(compiled.values())
+
+
+def get_compiled_programs(programs) -> List[CompiledProgram]:
+    """
+    Get compiled programs from the process cache, recompiling only those whose
+    requirements_version changed since they were cached.
+    """
+    versions = dict(programs.values_list('id', 'requirements_version'))
+    
+    with _compiled_programs_lock:
+        cached = {
+            program_id: _compiled_programs[program_id]
+            for program_id, version in versions.items()
+            if program_id in _compiled_programs and _compiled_programs[program_id].version == version
+        }
+    
+    stale = [program_id for program_id in versions if program_id not in cached]
+    if stale:
+        for compiled in compile_programs(Program.objects.filter(id__in=stale)):
+            cached[compiled.program_id] = compiled
+        with _compiled_programs_lock:
+            for program_id in stale:
+                if program_id in cached:
+                    _compiled_programs[program_id] = cached[program_id]
+    
+    return [cached[program_id] for program_id in versions if program_id in cached]
+
+
+def get_compiled_program(program) -> CompiledProgram:
+    """Get the compiled form of a single program instance"""
+    with _compiled_programs_lock:
+        compiled = _compiled_programs.get(program.id)
+    if compiled is not None and compiled.version == program.requirements_version:
+        return compiled
+    return get_compiled_programs(Program.objects.filter(id=program.id))[0]
+
+
+class WhatIfAuditor:
+    """
+    Evaluates one student's transcript against every active program in a single pass.
+    Used to answer "how far along would I be if I switched to program X?".
+    """
+    
+    def __init__(self, student_profile, transcript=None):
+        self.student = student_profile
+        self.transcript = transcript if transcript is not None else Transcript.for_student(student_profile)
+    
+    def evaluate_all(self, programs=None) -> List[Dict]:
+        """
+        Evaluate the transcript against all programs.
+        
+        Returns:
+            List of program results ranked by remaining credits (fewest first)
+        """
+        if programs is None:
+            programs = Program.objects.filter(is_active=True)
+        
+        return self.evaluate_compiled(get_compiled_programs(programs))
+    
+    def evaluate_compiled(self, compiled_programs) -> List[Dict]:
+        """Evaluate the transcript against already compiled programs, ranked as evaluate_all()"""
+        results = [program.evaluate(self.transcript) for program in compiled_programs]
+        results.sort(key=lambda result: (
+            result['credits_remaining'], -result['percentage_complete'], result['program']['name']
+        ))
+        return results
+
+
+class AuditHistory:
+    """
+    Diff-based history store for a degree audit's requirement status.
+    Every CHECKPOINT_INTERVAL-th snapshot stores the full state; the others only
+    store what changed, so any historical state is rebuilt by replaying the diffs
+    recorded since the nearest checkpoint.
+    """
+    
+    CHECKPOINT_INTERVAL = 20
+    
+    # Attempts at taking the next sequence number before a conflicting refresh wins outright
+    RECORD_ATTEMPTS = 3
+    
+    def __init__(self, degree_audit):
+        self.audit = degree_audit
+    
+    @staticmethod
+    def normalize_status(requirement_status: List[Dict]) -> Dict[str, Dict]:
+        """Reduce get_requirement_status() output to a JSON-safe state keyed by requirement ID"""
+        return {
+            str(entry['requirement']['id']): {
+                'name': entry['requirement']['name'],
+                'is_satisfied': bool(entry['is_satisfied']),
+                'credits_earned': str(entry['credits_earned']),
+                'satisfied_courses': sorted(course['id'] for course in entry['satisfied_courses']),
+            }
+            for entry in requirement_status
+        }
+    
+    @staticmethod
+    def diff(previous: Dict[str, Dict], current: Dict[str, Dict]) -> Dict:
+        """Compute the changes needed to turn ``previous`` into ``current``"""
+        changed = {
+            requirement_id: state for requirement_id, state in current.items()
+            if previous.get(requirement_id) != state
+        }
+        removed = sorted(requirement_id for requirement_id in previous if requirement_id not in current)
+        return {'set': changed, 'removed': removed}
+    
+    @staticmethod
+    def apply(state: Dict[str, Dict], changes: Dict) -> Dict[str, Dict]:
+        state = dict(state)
+        state.update(changes.get('set', {}))
+        for requirement_id in changes.get('removed', []):
+            state.pop(requirement_id, None)
+        return state
+    
+    def state_at(self, sequence: int = None, when: datetime = None) -> Tuple[int, Dict[str, Dict]]:
+        """
+        Rebuild the audit state as of a snapshot sequence number or a point in time.
+        Defaults to the latest recorded state.
+        
+        Returns:
+            Tuple of (sequence: int, state: Dict) where sequence is 0 if nothing was recorded yet
+        """
+        snapshots = AuditSnapshot.objects.filter(degree_audit=self.audit)
+        if sequence is not None:
+            snapshots = snapshots.filter(sequence__lte=sequence)
+        if when is not None:
+            snapshots = snapshots.filter(recorded_at__lte=when)
+        
+        checkpoint = snapshots.filter(is_checkpoint=True).order_by('-sequence').first()
+        if checkpoint is None:
+            return 0, {}
+        
+        state = checkpoint.payload
+        latest = checkpoint.sequence
+        for diff_sequence, changes in (
+            snapshots.filter(sequence__gt=checkpoint.sequence)
+            .order_by('sequence')
+            .values_list('sequence', 'payload')
+        ):
+            state = self.apply(state, changes)
+            latest = diff_sequence
+        
+        return latest, state
+    
+    def record(self):
+        """
+        Record the audit's current requirement status.
+        
+        Returns:
+            The new AuditSnapshot, or None if nothing changed since the last one
+        """
+        current = self.normalize_status(self.audit.get_requirement_status())
+        
+        for attempt in range(1, self.RECORD_ATTEMPTS + 1):
+            last_sequence, previous = self.state_at()
+            try:
+                return self._record(last_sequence, previous, current)
+            except IntegrityError:
+                # Only a concurrent refresh that took the next sequence number is retried,
+                # by diffing against its snapshot; any other integrity error is real
+                taken = AuditSnapshot.objects.filter(
+                    degree_audit=self.audit, sequence=last_sequence + 1
+                ).exists()
+                if not taken or attempt == self.RECORD_ATTEMPTS:
+                    raise
+    
+    def _record(self, last_sequence: int, previous: Dict[str, Dict], current: Dict[str, Dict]):
+        changes = self.diff(previous, current)
+        if last_sequence and not changes['set'] and not changes['removed']:
+            return None
+        
+        with transaction.atomic():
+            sequence = last_sequence + 1
+            is_checkpoint = (sequence - 1) % self.CHECKPOINT_INTERVAL == 0
+            snapshot = AuditSnapshot.objects.create(
+                degree_audit=self.audit,
+                student_id=self.audit.student_id,
+                sequence=sequence,
+                is_checkpoint=is_checkpoint,
+                payload=current if is_checkpoint else changes,
+            )
+            
+            AuditRequirementChange.objects.bulk_create([
+                AuditRequirementChange(
+                    snapshot=snapshot,
+                    student_id=self.audit.student_id,
+                    requirement_id=int(requirement_id),
+                    requirement_name=state['name'],
+                    was_satisfied=previous[requirement_id]['is_satisfied'] if requirement_id in previous else None,
+                    is_satisfied=state['is_satisfied'],
+                    recorded_at=snapshot.recorded_at,
+                )
+                for requirement_id, state in changes['set'].items()
+                if previous.get(requirement_id, {}).get('is_satisfied') != state['is_satisfied']
+            ])
+        
+        return snapshot
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from users.models import StudentProfile
+from .models import Schedule, ScheduleItem, UserCourseSelection
+
+
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+@receiver(post_save, sender=UserCourseSelection)
+@receiver(post_delete, sender=UserCourseSelection)
+def bump_student_data_version(sender, instance, **kwargs):
+    StudentProfile.bump_data_version(pk=instance.student_id)
+
+
+@receiver(post_save, sender=ScheduleItem)
+@receiver(post_delete, sender=ScheduleItem)
+def bump_student_data_version_for_item(sender, instance, **kwargs):
+    StudentProfile.bump_data_version(schedules__id=instance.schedule_id)
@@ -0,0 +1,13 @@
+"""Background tasks for degree audits (run by manage.py run_task_worker)"""
+
+from tasks.registry import task
+from .models import DegreeAudit
+from .services import AuditHistory
+
+
+@task('audits.refresh', priority=10)
+def refresh_degree_audit(degree_audit_id):
+    """Recompute an audit's requirement status and record it in the audit history"""
+    audit = DegreeAudit.objects.select_related('student', 'program').get(id=degree_audit_id)
+    snapshot = AuditHistory(audit).record()
+    return {'sequence': snapshot.sequence if snapshot is not None else None}
@@ -1,3 +1,662 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from django.core.cache import cache
+from courses.models import (
+    Department, Course, CourseOffering, Prerequisite, Program, ProgramConstraint, ProgramCourseRequirement,
+    ProgramRequirement, ProgramType
+)
+from uniplanner.caching import LRUBackend, response_cache
+from users.models import StudentProfile, CompletedCourse
+from . import services
+from .models import Schedule, ScheduleItem, DegreeAudit, UserCourseSelection
+from .services import Transcript, WhatIfAuditor, course_mask, get_compiled_program
 
-# Create your tests here.
+
+def create_dashboard_student():
+    department = Department.objects.create(code='CS', name='Computer Science')
+    intro = Course.objects.create(department=department, course_number='101', title='Intro', credits=3)
+    data = Course.objects.create(department=department, course_number='201', title='Data', credits=3)
+    systems = Course.objects.create(department=department, course_number='301', title='Systems', credits=3)
+    Prerequisite.objects.create(course=data, prerequisite_course=intro)
+    Prerequisite.objects.create(course=systems, prerequisite_course=data)
+
+    user = User.objects.create_user(username='dashboard-student', password='password')
+    student = StudentProfile.objects.create(user=user, student_id='S1000')
+    CompletedCourse.objects.create(
+        student=student, course=intro, semester='fall', year=2024, grade='A', credits_earned=3
+    )
+    program_type = ProgramType.objects.create(name='major', display_name='Major')
+    program = Program.objects.create(
+        name='Computer Science', code='CS-MAJ', program_type=program_type, department=department
+    )
+    DegreeAudit.objects.create(student=student, program=program)
+    Schedule.objects.create(student=student, semester='fall', year=2025, name='Plan A')
+    return student
+
+
+class DashboardBootstrapTests(TestCase):
+    """/api/schedules/dashboard/ combines the dashboard's sections"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_dashboard_student()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student.user)
+
+    def test_sections(self):
+        response = self.client.get('/api/schedules/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual(data['user']['username'], 'dashboard-student')
+        self.assertEqual([audit['program'] for audit in data['degree_audits']], ['Computer Science (Major)'])
+        self.assertEqual([schedule['name'] for schedule in data['schedules']], ['Plan A'])
+        self.assertEqual(
+            sorted(course['full_code'] for course in data['available_courses']), ['CS 101', 'CS 201']
+        )
+        self.assertEqual(set(data['timings']), {
+            'user', 'degree_audits', 'schedules', 'available_courses', 'recommendations'
+        })
+        self.assertIn('available_courses;dur=', response['Server-Timing'])
+
+    def test_student_context_loaded_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/schedules/dashboard/')
+        completed_course_queries = [
+            query for query in queries if 'FROM "users_completedcourse"' in query['sql']
+        ]
+        self.assertEqual(len(completed_course_queries), 1)
+        catalog_queries = [query for query in queries if 'WHERE "courses_course"."is_active"' in query['sql']]
+        self.assertEqual(len(catalog_queries), 1)
+
+    def test_requires_student(self):
+        self.client.force_authenticate(User.objects.create_user(username='staff', password='password'))
+        self.assertEqual(self.client.get('/api/schedules/dashboard/').status_code, 400)
+
+
+class ConcurrentDashboardBootstrapTests(TransactionTestCase):
+    """Outside a transaction the sections run on worker threads with their own connections"""
+
+    def test_threaded_matches_sequential(self):
+        from .dashboard import DashboardBootstrap
+
+        student = create_dashboard_student()
+        client = APIClient()
+        client.force_authenticate(student.user)
+        threaded = client.get('/api/schedules/dashboard/').data
+
+        request = client.get('/api/schedules/dashboard/').wsgi_request
+        request.user = student.user
+        sequential = DashboardBootstrap(request, threaded=False).build()
+        for name in DashboardBootstrap.SECTIONS:
+            self.assertEqual(threaded[name], sequential[name], name)
+
+    def test_threads_keep_their_connections(self):
+        from django.db import connections
+        from . import dashboard
+
+        student = create_dashboard_student()
+        client = APIClient()
+        client.force_authenticate(student.user)
+        with mock.patch.object(connections, 'close_all') as close_all:
+            self.assertEqual(client.get('/api/schedules/dashboard/').status_code, 200)
+            self.assertEqual(client.get('/api/schedules/dashboard/').status_code, 200)
+        close_all.assert_not_called()
+        self.assertLessEqual(len(dashboard.get_executor()._threads), dashboard.DASHBOARD_MAX_WORKERS)
+
+
+def create_program(code, total_credits_required, courses, credits_required=None):
+    """A program with one requirement made of ``courses``"""
+    program = Program.objects.create(
+        name=code, code=code, program_type=ProgramType.objects.get(),
+        department=courses[0].department, total_credits_required=total_credits_required
+    )
+    requirement = ProgramRequirement.objects.create(
+        program=program, name='Core', requirement_type='required_courses',
+        credits_required=sum(course.credits for course in courses) if credits_required is None else credits_required
+    )
+    for course in courses:
+        ProgramCourseRequirement.objects.create(requirement=requirement, course=course)
+    return program
+
+
+class WhatIfAuditTests(TestCase):
+    """The transcript bitmap is evaluated against every active program"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_dashboard_student()
+        courses = {course.course_number: course for course in Course.objects.all()}
+        create_program('INTRO', 6, [courses['101']])
+        create_program('DATA', 12, [courses['201']])
+        closed = create_program('CLOSED', 0, [courses['301']])
+        Program.objects.filter(pk=closed.pk).update(is_active=False)
+
+    def setUp(self):
+        services._compiled_programs.clear()
+
+    def test_transcript_bitmap(self):
+        transcript = Transcript({1: Decimal('3'), 4: Decimal('4')})
+        self.assertEqual(transcript.mask, 0b10010)
+        self.assertEqual(course_mask([4, 7]), 0b10010000)
+        self.assertEqual(transcript.credits_in(course_mask([4, 7])), Decimal('4'))
+        self.assertEqual(transcript.credits_in(course_mask([1, 4])), Decimal('7'))
+        self.assertEqual(transcript.total_credits, Decimal('7'))
+
+    def test_programs_ranked_by_remaining_credits(self):
+        results = WhatIfAuditor(self.student).evaluate_all()
+        self.assertEqual([result['program']['code'] for result in results], ['CS-MAJ', 'INTRO', 'DATA'])
+        intro, data = results[1], results[2]
+        self.assertEqual((intro['credits_remaining'], intro['percentage_complete']), (3.0, 50.0))
+        self.assertEqual((intro['requirements_satisfied'], intro['requirements_total']), (1, 1))
+        self.assertEqual((data['credits_remaining'], data['requirements_satisfied']), (9.0, 0))
+
+    def test_requirement_status(self):
+        courses = {course.course_number: course for course in Course.objects.all()}
+        CompletedCourse.objects.create(
+            student=self.student, course=courses['201'], semester='winter', year=2025, grade='F', credits_earned=0
+        )
+        program = Program.objects.create(
+            name='Fixture', code='FIXTURE', program_type=ProgramType.objects.get(), total_credits_required=9
+        )
+        core, intro, electives = [
+            ProgramRequirement.objects.create(
+                program=program, name=name, requirement_type='required_courses', credits_required=credits, order=order
+            )
+            for order, (name, credits) in enumerate([('Core', 6), ('Intro', 3), ('Electives', None)])
+        ]
+        for requirement, course, is_required in [
+            (core, courses['101'], True), (core, courses['201'], True), (intro, courses['101'], True),
+            (electives, courses['101'], False), (electives, courses['301'], False),
+        ]:
+            ProgramCourseRequirement.objects.create(requirement=requirement, course=course, is_required=is_required)
+
+        intro_course = {'id': courses['101'].id, 'full_code': 'CS 101', 'title': 'Intro', 'credits': Decimal('3')}
+
+        def expected(requirement, credits_earned, is_satisfied, satisfied_courses):
+            return {
+                'requirement': {
+                    'id': requirement.id, 'name': requirement.name, 'requirement_type': 'required_courses',
+                    'description': '', 'credits_required': requirement.credits_required,
+                },
+                'credits_required': requirement.credits_required,
+                'credits_earned': credits_earned,
+                'is_satisfied': is_satisfied,
+                'satisfied_courses': satisfied_courses,
+            }
+
+        # The failed course never counts, and optional course links are not requirements
+        audit = DegreeAudit.objects.create(student=self.student, program=program)
+        self.assertEqual(audit.get_requirement_status(), [
+            expected(core, Decimal('3'), False, [intro_course]),
+            expected(intro, Decimal('3'), True, [intro_course]),
+            expected(electives, 0, True, []),
+        ])
+
+        with self.assertNumQueries(2):
+            # The transcript and the program versions; compiled programs come from the cache
+            WhatIfAuditor(self.student).evaluate_all(Program.objects.filter(code='FIXTURE'))
+
+
+class WhatIfBenchmarkTests(TestCase):
+    """benchmark_what_if evaluates a transcript against 300 programs within the latency target"""
+
+    def test_300_programs_within_target(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        output = StringIO()
+        call_command('benchmark_what_if', programs=300, runs=5, stdout=output)
+        self.assertIn('300 programs', output.getvalue())
+        self.assertIn('Within the 200 ms target', output.getvalue())
+        self.assertFalse(Program.objects.filter(code__startswith='WHATIF-').exists())
+        self.assertEqual(services._compiled_programs, {})
+
+
+class DegreeAuditListTests(TestCase):
+    """The audit list returns annotated progress; expensive sections only on request"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_dashboard_student()
+        courses = {course.course_number: course for course in Course.objects.all()}
+        cls.audit = cls.student.degree_audits.get()
+        DegreeAudit.objects.create(student=cls.student, program=create_program('DATA', 12, [courses['201']]))
+        for number, selection_status in (('101', 'completed'), ('201', 'completed'), ('301', 'planned')):
+            UserCourseSelection.objects.create(
+                student=cls.student, degree_audit=cls.audit, course=courses[number], status=selection_status
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student.user)
+
+    def audits(self, query=''):
+        response = self.client.get(f'/api/schedules/degree-audits/{query}')
+        self.assertEqual(response.status_code, 200)
+        return {audit['id']: audit for audit in response.data.get('results', response.data)}
+
+    def test_list_mode(self):
+        audits = self.audits()
+        self.assertEqual(set(audits[self.audit.id]), {'id', 'program', 'last_updated', 'progress'})
+        progress = audits[self.audit.id]['progress']
+        self.assertEqual(progress, self.audit.calculate_progress())
+        self.assertEqual((progress['course_selections_count'], progress['completed_course_selections']), (3, 2))
+        self.assertEqual(progress['credits_earned'], 6.0)
+
+        expanded = self.audits('?expand=requirement_status')[self.audit.id]
+        self.assertEqual(set(expanded), {'id', 'program', 'last_updated', 'progress', 'requirement_status'})
+        self.assertIn('student', self.client.get(f'/api/schedules/degree-audits/{self.audit.id}/').data)
+
+    def test_list_queries_do_not_grow_with_audits(self):
+        with CaptureQueriesContext(connection) as two_audits:
+            self.audits()
+        DegreeAudit.objects.create(
+            student=self.student, program=create_program('SYS', 12, [Course.objects.get(course_number='301')])
+        )
+        with self.assertNumQueries(len(two_audits)):
+            self.assertEqual(len(self.audits()), 3)
+
+
+class CompiledProgramCacheTests(TestCase):
+    """Compiled programs are cached per process and recompiled when requirements_version changes"""
+
+    def setUp(self):
+        services._compiled_programs.clear()
+        department = Department.objects.create(code='CS', name='Computer Science')
+        program_type = ProgramType.objects.create(name='major', display_name='Major')
+        self.program = Program.objects.create(
+            name='Computer Science', code='CS-MAJ', program_type=program_type, department=department,
+            total_credits_required=20
+        )
+
+    def total_required(self, program):
+        return get_compiled_program(program).evaluate(Transcript({}))['total_credits_required']
+
+    def test_repeated_saves_recompile(self):
+        self.assertEqual(self.total_required(self.program), 20)
+        self.program.total_credits_required = 99
+        self.program.save()
+        self.program.save()
+        self.assertEqual(self.program.requirements_version, 2)
+        self.assertEqual(self.total_required(self.program), 99)
+        self.assertEqual(self.total_required(Program.objects.get(pk=self.program.pk)), 99)
+
+    def test_recompiled_only_when_version_changes(self):
+        from .services import get_compiled_programs
+
+        course = Course.objects.create(
+            department=self.program.department, course_number='101', title='Intro', credits=3
+        )
+        other = create_program('DATA', 12, [course])
+        programs = Program.objects.filter(pk__in=[self.program.pk, other.pk]).order_by('pk')
+        first, other_compiled = get_compiled_programs(programs)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_compiled_programs(programs), [first, other_compiled])
+
+        requirement = ProgramRequirement.objects.create(
+            program=self.program, name='Core', requirement_type='required_courses', credits_required=3
+        )
+        ProgramCourseRequirement.objects.create(requirement=requirement, course=course)
+        recompiled, cached_other = get_compiled_programs(programs)
+        self.assertIsNot(recompiled, first)
+        self.assertIs(cached_other, other_compiled)
+        self.assertEqual(recompiled.version, Program.objects.get(pk=self.program.pk).requirements_version)
+        self.assertEqual(recompiled.required_mask, course_mask([course.id]))
+
+    def test_version_bumped_in_the_save_query(self):
+        with self.assertNumQueries(1):
+            self.program.save()
+        with self.assertNumQueries(1):
+            self.program.is_active = False
+            self.program.save(update_fields=['is_active'])
+        self.assertEqual(self.program.requirements_version, 1)
+        self.program.name = 'Computing'
+        self.program.save(update_fields=['name'])
+        self.assertEqual(self.program.requirements_version, 2)
+
+    def test_stale_instance_does_not_lower_version(self):
+        stale = Program.objects.get(pk=self.program.pk)
+        Program.bump_requirements_version(pk=self.program.pk)
+        Program.bump_requirements_version(pk=self.program.pk)
+        self.total_required(Program.objects.get(pk=self.program.pk))
+
+        stale.total_credits_required = 99
+        stale.save()
+        self.assertEqual(Program.objects.get(pk=self.program.pk).requirements_version, 3)
+        self.assertEqual(self.total_required(stale), 99)
+
+
+class ConstraintCompilationTests(TestCase):
+    """ProgramConstraint rules are compiled into masks and lookups applied to the transcript"""
+
+    def compiled(self, *constraints):
+        program = services.CompiledProgram(1, 0, 'Program', 'P', Decimal('0'))
+        program.add_requirement({'id': 1, 'credits_required': Decimal('9')}, [1, 2, 3])
+        program.courses = {course_id: {'id': course_id} for course_id in (1, 2, 3)}
+        for constraint_type, affected_courses, conditions in constraints:
+            program.add_constraint(constraint_type, affected_courses, conditions)
+        return program
+
+    def effective(self, program, credits):
+        transcript = program.apply_constraints(Transcript({
+            course_id: Decimal(str(value)) for course_id, value in credits.items()
+        }))
+        return {course_id: float(value) for course_id, value in transcript.credits.items()}
+
+    def test_substitution_and_exclusion(self):
+        program = self.compiled(('substitution', [7], {'replaces': 3}), ('exclusion', [2], {}))
+        self.assertEqual(self.effective(program, {1: 3, 2: 3, 7: 3}), {1: 3, 3: 3})
+        result = program.evaluate(Transcript({1: Decimal('3'), 2: Decimal('3'), 7: Decimal('3')}))
+        self.assertEqual((result['requirements_satisfied'], result['credits_remaining']), (0, 3.0))
+        self.assertEqual(program.satisfying_courses(Transcript({1: Decimal('3'), 7: Decimal('3')})), {1, 7})
+        # A substitute does not count twice when the course it replaces was taken as well
+        self.assertEqual(program.satisfying_courses(Transcript({3: Decimal('3'), 7: Decimal('3')})), {3})
+
+    def test_credit_limit_and_cross_listing(self):
+        program = self.compiled(
+            ('credit_limit', ['1', '2', '3'], {'max_credits': '5'}),
+            ('cross_listing', [2, 5], {}),
+        )
+        self.assertEqual(program.cross_listings, {2: 0, 5: 0})
+        self.assertEqual(program.course_caps, {1: [0], 2: [0], 3: [0]})
+        self.assertEqual(self.effective(program, {1: 3, 2: 3, 3: 3}), {1: 3, 2: 2})
+        self.assertEqual(self.effective(program, {5: 3, 2: 3}), {5: 3})
+        [status] = program.requirement_status(Transcript({1: Decimal('3'), 2: Decimal('3')}))
+        self.assertEqual((status['credits_earned'], status['satisfied_courses']), (Decimal('5'), [{'id': 1}, {'id': 2}]))
+
+    def test_ignored_rules(self):
+        program = self.compiled(
+            ('substitution', [7], {}),
+            ('credit_limit', [1], {'max_credits': 'many'}),
+            ('exclusion', ['x'], {}),
+            ('prerequisite_override', [1], {}),
+        )
+        self.assertEqual(program.constrained_mask, 0)
+        self.assertEqual(self.effective(program, {1: 3, 7: 3}), {1: 3, 7: 3})
+
+    def test_constraint_changes_recompile(self):
+        services._compiled_programs.clear()
+        student = create_dashboard_student()
+        course = Course.objects.get(course_number='101')
+        program = create_program('INTRO', 0, [course])
+        result = get_compiled_program(program).evaluate(Transcript.for_student(student))
+        self.assertEqual(result['requirements_satisfied'], 1)
+        ProgramConstraint.objects.create(
+            program=program, constraint_type='exclusion', name='No intro', description='',
+            affected_courses=[course.id]
+        )
+        program.refresh_from_db()
+        compiled = get_compiled_program(program)
+        self.assertEqual(compiled.excluded_mask, course_mask([course.id]))
+        self.assertEqual(compiled.evaluate(Transcript.for_student(student))['requirements_satisfied'], 0)
+
+
+class CrossProgramSatisfactionTests(TestCase):
+    """Shared courses are those that still count toward another program after its constraints"""
+
+    def setUp(self):
+        services._compiled_programs.clear()
+        self.student = create_dashboard_student()
+        self.audit = self.student.degree_audits.get()
+        courses = {course.course_number: course for course in Course.objects.all()}
+        minor = Program.objects.create(
+            name='Computing Minor', code='CS-MIN', program_type=ProgramType.objects.get(),
+            department=Department.objects.get()
+        )
+        requirement = ProgramRequirement.objects.create(
+            program=minor, name='Core', requirement_type='required_courses', credits_required=6
+        )
+        for number in ('201', '301'):
+            ProgramCourseRequirement.objects.create(requirement=requirement, course=courses[number])
+        ProgramConstraint.objects.create(
+            program=minor, constraint_type='exclusion', name='No systems', description='',
+            affected_courses=[courses['301'].id]
+        )
+        ProgramConstraint.objects.create(
+            program=minor, constraint_type='substitution', name='Intro for systems', description='',
+            affected_courses=[courses['101'].id], conditions={'replaces': courses['301'].id}
+        )
+        DegreeAudit.objects.create(student=self.student, program=minor)
+        for course in courses.values():
+            UserCourseSelection.objects.create(
+                student=self.student, degree_audit=self.audit, course=course, status='completed'
+            )
+
+    def test_constraints_apply(self):
+        shared = self.audit.get_cross_program_satisfaction()
+        self.assertEqual(sorted(entry['course']['full_code'] for entry in shared), ['CS 101', 'CS 201'])
+        self.assertEqual(shared[0]['satisfies_programs'], ['Computing Minor'])
+
+
+class AuditHistoryTests(TestCase):
+    """Requirement status history is stored as checkpoints and diffs"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_dashboard_student()
+        cls.audit = cls.student.degree_audits.get()
+        cls.requirement = ProgramRequirement.objects.create(
+            program=cls.audit.program, name='Core', requirement_type='required_courses', credits_required=3
+        )
+        ProgramCourseRequirement.objects.create(
+            requirement=cls.requirement, course=Course.objects.get(course_number='201')
+        )
+
+    def setUp(self):
+        services._compiled_programs.clear()
+
+    def test_diff_and_apply(self):
+        previous = {'1': {'is_satisfied': False}, '2': {'is_satisfied': True}}
+        current = {'1': {'is_satisfied': True}, '3': {'is_satisfied': False}}
+        changes = services.AuditHistory.diff(previous, current)
+        self.assertEqual(changes, {'set': {'1': {'is_satisfied': True}, '3': {'is_satisfied': False}}, 'removed': ['2']})
+        self.assertEqual(services.AuditHistory.apply(previous, changes), current)
+        self.assertEqual(services.AuditHistory.diff(current, current), {'set': {}, 'removed': []})
+
+    def test_checkpoints_and_replay(self):
+        from .models import AuditRequirementChange
+
+        history = services.AuditHistory(self.audit)
+        course = Course.objects.get(course_number='201')
+        states = []
+        with mock.patch.object(services.AuditHistory, 'CHECKPOINT_INTERVAL', 2):
+            for _ in range(2):
+                states.append(history.record())
+                self.assertIsNone(history.record())
+                completed = CompletedCourse.objects.create(
+                    student=self.student, course=course, semester='winter', year=2025, grade='B', credits_earned=3
+                )
+                states.append(history.record())
+                completed.delete()
+
+        self.assertEqual([snapshot.sequence for snapshot in states], [1, 2, 3, 4])
+        self.assertEqual([snapshot.is_checkpoint for snapshot in states], [True, False, True, False])
+        self.assertEqual(set(states[1].payload), {'set', 'removed'})
+        satisfied = history.state_at(sequence=2)
+        self.assertEqual(satisfied, (2, history.state_at(sequence=4)[1]))
+        self.assertTrue(satisfied[1][str(self.requirement.id)]['is_satisfied'])
+        self.assertEqual(satisfied[1][str(self.requirement.id)]['satisfied_courses'], [course.id])
+        self.assertFalse(history.state_at(sequence=3)[1][str(self.requirement.id)]['is_satisfied'])
+
+        flips = AuditRequirementChange.objects.order_by('snapshot__sequence')
+        self.assertEqual(
+            [(change.was_satisfied, change.is_satisfied) for change in flips],
+            [(None, False), (False, True), (True, False), (False, True)]
+        )
+
+        client = APIClient()
+        client.force_authenticate(self.student.user)
+        response = client.get(f'/api/schedules/degree-audits/{self.audit.id}/snapshot/?sequence=3')
+        self.assertEqual(response.data, {'sequence': 3, 'requirements': history.state_at(sequence=3)[1]})
+
+    def test_concurrent_record_retries(self):
+        from .models import AuditSnapshot
+
+        history = services.AuditHistory(self.audit)
+        history.record()
+        CompletedCourse.objects.create(
+            student=self.student, course=Course.objects.get(course_number='201'),
+            semester='winter', year=2025, grade='B', credits_earned=3
+        )
+        # The first attempt reads the state from before another refresh recorded sequence 1
+        with mock.patch.object(history, 'state_at', side_effect=[(0, {}), history.state_at()]):
+            snapshot = history.record()
+        self.assertEqual(snapshot.sequence, 2)
+        self.assertEqual(AuditSnapshot.objects.filter(degree_audit=self.audit).count(), 2)
+
+    def test_record_retries_are_bounded(self):
+        from django.db import IntegrityError
+
+        history = services.AuditHistory(self.audit)
+        history.record()
+        CompletedCourse.objects.create(
+            student=self.student, course=Course.objects.get(course_number='201'),
+            semester='winter', year=2025, grade='B', credits_earned=3
+        )
+        with mock.patch.object(history, 'state_at', return_value=(0, {})) as state_at:
+            with self.assertRaises(IntegrityError):
+                history.record()
+        self.assertEqual(state_at.call_count, services.AuditHistory.RECORD_ATTEMPTS)
+
+        # Integrity errors other than a taken sequence number are not retried
+        with mock.patch.object(services.AuditSnapshot.objects, 'create', side_effect=IntegrityError) as create:
+            with self.assertRaises(IntegrityError):
+                history.record()
+        self.assertEqual(create.call_count, 1)
+
+    def test_history_filters_must_be_integers(self):
+        client = APIClient()
+        client.force_authenticate(self.student.user)
+        self.assertEqual(client.get('/api/schedules/degree-audits/history/?requirement=core').status_code, 400)
+        self.assertEqual(client.get('/api/schedules/degree-audits/history/?degree_audit=1.5').status_code, 400)
+        response = client.get(f'/api/schedules/degree-audits/history/?requirement={self.requirement.id}')
+        self.assertEqual(response.status_code, 200)
+
+
+class ResponseCacheTests(TestCase):
+    """Expensive per-student responses are cached until the student's data or the catalog changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_dashboard_student()
+        cls.schedule = cls.student.schedules.get()
+
+    def setUp(self):
+        cache.clear()
+        response_cache.clear()
+        self.client = APIClient()
+
+    def get(self, url):
+        # A fresh user per request, as authentication would load it
+        self.client.force_authenticate(User.objects.get(pk=self.student.user_id))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_completed_course_invalidates_available(self):
+        first = self.get('/api/courses/courses/available/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        second = self.get('/api/courses/courses/available/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+        CompletedCourse.objects.create(
+            student=self.student, course=Course.objects.get(course_number='201'),
+            semester='winter', year=2025, grade='B', credits_earned=3
+        )
+        third = self.get('/api/courses/courses/available/')
+        self.assertEqual(third['X-Cache'], 'MISS')
+        self.assertIn('CS 301', [course['full_code'] for course in third.data])
+        self.assertEqual(response_cache.stats()['courses.available'], {'hits': 1, 'misses': 2})
+
+    def test_schedule_item_invalidates_conflicts(self):
+        url = f'/api/schedules/schedules/{self.schedule.id}/conflicts/'
+        self.assertEqual(self.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.get(url)['X-Cache'], 'HIT')
+
+        offering = CourseOffering.objects.create(
+            course=Course.objects.get(course_number='101'), semester='fall', year=2025, capacity=30
+        )
+        ScheduleItem.objects.create(schedule=self.schedule, offering=offering)
+        self.assertEqual(self.get(url)['X-Cache'], 'MISS')
+
+    def test_entries_are_per_user(self):
+        self.get('/api/courses/courses/recommendations/')
+        other = User.objects.create_user(username='other-student', password='password')
+        StudentProfile.objects.create(user=other, student_id='S1001')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get('/api/courses/courses/recommendations/')['X-Cache'], 'MISS')
+
+    def test_lru_eviction(self):
+        backend = LRUBackend(max_entries=2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.get('a')
+        backend.set('c', 3)
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual((backend.get('a'), backend.get('c')), (1, 3))
+
+
+class AsyncViewTests(TransactionTestCase):
+    """The async endpoints return what their synchronous counterparts do"""
+
+    def setUp(self):
+        from rest_framework.authtoken.models import Token
+
+        self.student = create_dashboard_student()
+        self.token = Token.objects.create(user=self.student.user)
+        self.headers = {'Authorization': f'Token {self.token.key}'}
+
+    def sync_get(self, url):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    async def test_dashboard_matches_sync(self):
+        from .async_views import AsyncDashboardBootstrap
+
+        response = await self.async_client.get('/api/schedules/async/dashboard/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        expected = await sync_to_async(self.sync_get)('/api/schedules/dashboard/')
+        for name in AsyncDashboardBootstrap.SECTIONS:
+            self.assertEqual(data[name], expected[name], name)
+        self.assertIn('recommendations;dur=', response['Server-Timing'])
+
+    async def test_what_if_matches_sync(self):
+        response = await self.async_client.get('/api/schedules/async/degree-audits/what_if/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        expected = await sync_to_async(self.sync_get)('/api/schedules/degree-audits/what_if/')
+        self.assertEqual(response.json(), expected)
+
+    async def test_authentication(self):
+        url = '/api/schedules/async/dashboard/'
+        self.assertEqual((await self.async_client.get(url)).status_code, 401)
+        response = await self.async_client.get(url, headers={'Authorization': 'Token invalid'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual((await self.async_client.post(url, headers=self.headers)).status_code, 405)
+
+    async def test_authentication_is_cached(self):
+        from rest_framework.authtoken.models import Token
+
+        url = '/api/schedules/async/degree-audits/what_if/'
+        self.assertEqual((await self.async_client.get(url, headers=self.headers)).status_code, 200)
+        with mock.patch.object(Token.objects, 'select_related', side_effect=AssertionError('token queried')):
+            self.assertEqual((await self.async_client.get(url, headers=self.headers)).status_code, 200)
+
+    def test_asgi_middleware_is_not_adapted(self):
+        from django.core.handlers.asgi import ASGIHandler
+
+        # load_middleware() logs each sync middleware it wraps for the async chain when DEBUG is on
+        with self.settings(DEBUG=True), self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
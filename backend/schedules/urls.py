@@ -1,6 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ScheduleViewSet, ScheduleItemViewSet, DegreeAuditViewSet, UserCourseSelectionViewSet
+from . import async_views
+from .views import (
+    ScheduleViewSet, ScheduleItemViewSet, DegreeAuditViewSet, UserCourseSelectionViewSet, dashboard_bootstrap
+)
 
 router = DefaultRouter()
 router.register(r'schedules', ScheduleViewSet)
@@ -10,5 +13,9 @@ router.register(r'course-selections', UserCourseSelectionViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('dashboard/', dashboard_bootstrap, name='dashboard_bootstrap'),
+    # Async variants for ASGI deployments (see schedules.async_views)
+    path('async/dashboard/', async_views.dashboard, name='async_dashboard'),
+    path('async/degree-audits/what_if/', async_views.what_if, name='async_what_if'),
 ]
 
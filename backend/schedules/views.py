@@ -1,18 +1,24 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
-from .models import Schedule, ScheduleItem, DegreeAudit, UserCourseSelection
+from django.utils.dateparse import parse_datetime
+from courses.compact import CompactResponseMixin
+from uniplanner.caching import cached_response
+from .models import Schedule, ScheduleItem, DegreeAudit, UserCourseSelection, AuditRequirementChange
 from .serializers import (
     ScheduleSerializer, ScheduleItemSerializer, ScheduleWithItemsSerializer,
-    DegreeAuditSerializer, ScheduleOptimizationSerializer, UserCourseSelectionSerializer
+    DegreeAuditSerializer, ScheduleOptimizationSerializer, UserCourseSelectionSerializer,
+    AuditRequirementChangeSerializer
 )
-from .services import ScheduleConflictDetector
+from .services import ScheduleConflictDetector, WhatIfAuditor, AuditHistory
+from .dashboard import DashboardBootstrap
+from .tasks import refresh_degree_audit
 
 
-class ScheduleViewSet(viewsets.ModelViewSet):
-    """ViewSet for schedules"""
+class ScheduleViewSet(CompactResponseMixin, viewsets.ModelViewSet):
+    """ViewSet for schedules; ``?with_items=1&compact=1`` side-loads offerings and courses"""
     queryset = Schedule.objects.all()
     serializer_class = ScheduleSerializer
     permission_classes = [IsAuthenticated]
@@ -32,6 +38,7 @@ class ScheduleViewSet(viewsets.ModelViewSet):
             serializer.save(student=self.request.user.student_profile)
     
     @action(detail=True, methods=['get'])
+    @cached_response('schedules.conflicts')
     def conflicts(self, request, pk=None):
         """Get conflicts for a specific schedule"""
         schedule = self.get_object()
@@ -41,6 +48,7 @@ class ScheduleViewSet(viewsets.ModelViewSet):
         return Response(conflicts)
     
     @action(detail=True, methods=['get'])
+    @cached_response('schedules.optimize')
     def optimize(self, request, pk=None):
         """Get optimization suggestions for a schedule"""
         schedule = self.get_object()
@@ -166,17 +174,100 @@ class DegreeAuditViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         if hasattr(self.request.user, 'student_profile'):
-            return DegreeAudit.objects.filter(student=self.request.user.student_profile)
+            queryset = DegreeAudit.objects.filter(student=self.request.user.student_profile)
+            if self.action == 'list':
+                queryset = queryset.with_progress()
+            return queryset
         return DegreeAudit.objects.none()
     
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'list':
+            # List mode: only aggregated progress unless sections are expanded,
+            # e.g. ?expand=requirement_status,cross_program_satisfaction
+            expand = self.request.query_params.get('expand', '')
+            context['expand'] = {name.strip() for name in expand.split(',') if name.strip()}
+        return context
+    
     @action(detail=True, methods=['post'])
     def refresh(self, request, pk=None):
-        """Refresh degree audit data"""
+        """Refresh degree audit data; with ?background=1 the refresh is queued as a task"""
         audit = self.get_object()
+        if request.query_params.get('background') in ('1', 'true'):
+            task = refresh_degree_audit.enqueue(
+                {'degree_audit_id': audit.id}, dedup_key=f'audits.refresh:{audit.id}', user=request.user
+            )
+            return Response({'task': task.id, 'status': task.status}, status=status.HTTP_202_ACCEPTED)
+        
         # The audit is automatically updated when accessed due to the model methods
+        AuditHistory(audit).record()
         serializer = self.get_serializer(audit)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """Get requirement satisfaction changes for the current student"""
+        if not hasattr(request.user, 'student_profile'):
+            return Response(
+                {'error': 'User is not a student'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        requirement_id = request.query_params.get('requirement')
+        degree_audit_id = request.query_params.get('degree_audit')
+        if (requirement_id and not requirement_id.isdigit()) or (degree_audit_id and not degree_audit_id.isdigit()):
+            return Response(
+                {'error': 'requirement and degree_audit must be integers'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        changes = AuditRequirementChange.objects.filter(
+            student=request.user.student_profile
+        ).select_related('snapshot')
+        
+        if requirement_id:
+            changes = changes.filter(requirement_id=requirement_id)
+        
+        if degree_audit_id:
+            changes = changes.filter(snapshot__degree_audit_id=degree_audit_id)
+        
+        serializer = AuditRequirementChangeSerializer(changes, many=True)
+        return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def snapshot(self, request, pk=None):
+        """Rebuild the audit's requirement status at a past sequence number or time"""
+        audit = self.get_object()
+        
+        sequence = request.query_params.get('sequence')
+        at = request.query_params.get('at')
+        when = parse_datetime(at) if at else None
+        if (sequence and not sequence.isdigit()) or (at and when is None):
+            return Response(
+                {'error': 'sequence must be an integer and at an ISO 8601 datetime'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        sequence, state = AuditHistory(audit).state_at(
+            sequence=int(sequence) if sequence else None, when=when
+        )
+        return Response({
+            'sequence': sequence,
+            'requirements': state
+        })
+    
+    @action(detail=False, methods=['get'])
+    def what_if(self, request):
+        """Evaluate the student's transcript against every active program"""
+        if not hasattr(request.user, 'student_profile'):
+            return Response(
+                {'error': 'User is not a student'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        auditor = WhatIfAuditor(request.user.student_profile)
+        return Response(auditor.evaluate_all())
+    
     @action(detail=False, methods=['post'])
     def enroll(self, request):
         """Enroll student in a degree program"""
@@ -257,4 +348,25 @@ class UserCourseSelectionViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(selections, many=True)
             return Response(serializer.data)
         except DegreeAudit.DoesNotExist:
-            return Response({'error': 'Degree audit not found'}, status=status.HTTP_404_NOT_F)
\ No newline at end of file
+            return Response({'error': 'Degree audit not found'}, status=status.HTTP_404_NOT_F)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_bootstrap(request):
+    """
+    Everything the dashboard needs in one response: user, degree audits, schedules,
+    available courses and recommendations, with per-section timings in milliseconds.
+    """
+    if not hasattr(request.user, 'student_profile'):
+        return Response(
+            {'error': 'User is not a student'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    payload = DashboardBootstrap(request).build()
+    response = Response(payload)
+    response['Server-Timing'] = ', '.join(
+        f'{name};dur={duration}' for name, duration in payload['timings'].items()
+    )
+    return response
@@ -0,0 +1,28 @@
+import signal
+from django.core.management.base import BaseCommand
+from tasks.registry import registered_tasks
+from tasks.worker import TaskWorker
+
+
+class Command(BaseCommand):
+    help = 'Claim queued background tasks and run them in a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2, help='Pool size; 0 runs tasks in this process')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls when idle')
+        parser.add_argument('--once', action='store_true', help='Exit once no task is due')
+
+    def handle(self, *args, **options):
+        worker = TaskWorker(
+            processes=options['processes'], poll_interval=options['poll_interval'], stdout=self.stdout
+        )
+        # Finish the running tasks on SIGTERM/Ctrl-C instead of abandoning them to the lease
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+
+        self.stdout.write(
+            f'Worker {worker.worker_id} with {options["processes"]} processes; '
+            f'tasks: {", ".join(registered_tasks()) or "none"}'
+        )
+        count = worker.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS(f'Ran {count} tasks'))
@@ -0,0 +1,58 @@
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class BackgroundTask(models.Model):
+    """A unit of background work, stored in the database until a worker claims and runs it"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+    ACTIVE_STATUSES = [PENDING, RUNNING]
+    
+    name = models.CharField(max_length=100, help_text="Registered task name, e.g. 'catalog.import'")
+    arguments = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    priority = models.IntegerField(default=0, help_text="Higher priority tasks are claimed first")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    dedup_key = models.CharField(
+        max_length=200, null=True, blank=True,
+        help_text="At most one pending or running task may have this key"
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now, help_text="Not claimed before this time")
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='background_tasks'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Claiming: pending tasks by priority, then due time
+            models.Index(fields=['status', 'priority', 'run_at'], name='task_claim_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedup_key'], condition=Q(status__in=['pending', 'running']),
+                name='task_active_dedup_key'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,54 @@
+"""
+Task function registry.
+
+Apps define task functions in their tasks.py, which TasksConfig imports at
+startup, and register them under a dotted name:
+
+    @task('audits.refresh')
+    def refresh_degree_audit(degree_audit_id):
+        ...
+
+    refresh_degree_audit.enqueue({'degree_audit_id': audit.id}, dedup_key=f'audits.refresh:{audit.id}')
+
+Arguments and return values must be JSON serializable.
+"""
+
+from functools import partial
+
+
+_tasks = {}
+
+
+class TaskNotRegistered(KeyError):
+    """Raised for a task name that no app registered"""
+
+
+class TaskDefinition:
+    def __init__(self, name, func, max_attempts, priority):
+        self.name = name
+        self.func = func
+        self.max_attempts = max_attempts
+        self.priority = priority
+
+
+def task(name, max_attempts=3, priority=0):
+    """Register a task function; it gains an ``enqueue(arguments=None, **options)`` attribute"""
+    def decorator(func):
+        from .services import enqueue
+
+        _tasks[name] = TaskDefinition(name, func, max_attempts, priority)
+        func.task_name = name
+        func.enqueue = partial(enqueue, name)
+        return func
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise TaskNotRegistered(name) from None
+
+
+def registered_tasks():
+    return sorted(_tasks)
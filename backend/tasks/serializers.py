@@ -0,0 +1,12 @@
+from rest_framework import serializers
+from .models import BackgroundTask
+
+
+class BackgroundTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BackgroundTask
+        fields = [
+            'id', 'name', 'status', 'priority', 'dedup_key', 'attempts', 'max_attempts',
+            'run_at', 'created_at', 'started_at', 'finished_at', 'result', 'error'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,149 @@
+"""
+Database-backed task queue.
+
+Tasks are rows of BackgroundTask. enqueue() inserts one (or returns the active
+task with the same dedup_key); workers claim due tasks, highest priority
+first, run them and record the result. A failed task is retried with
+exponential backoff until it has used max_attempts. Workers renew the lease
+of each task they are running on every poll; a worker that dies leaves its
+tasks running, and once their lease expires they are released for another
+worker to claim.
+
+Claiming is safe with any number of workers: on databases with SKIP LOCKED
+(PostgreSQL, MySQL 8) the rows are locked with SELECT ... FOR UPDATE SKIP
+LOCKED; on SQLite, where writes are serialized, each row is claimed with a
+conditional UPDATE that only one worker can win.
+"""
+
+import traceback
+from datetime import timedelta
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import BackgroundTask
+from .registry import get_task
+
+
+# Running tasks whose worker has not finished them after this long are released
+TASK_LEASE_SECONDS = 600
+
+# A failed task is retried after RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+RETRY_BACKOFF_SECONDS = 30
+
+CLAIM_ORDER = ['-priority', 'run_at', 'id']
+
+# Attempts at inserting a deduplicated task while other requests race for the same key
+ENQUEUE_ATTEMPTS = 3
+
+
+def enqueue(name, arguments=None, *, priority=None, dedup_key=None, run_at=None, max_attempts=None, user=None):
+    """
+    Queue a registered task.
+
+    Returns:
+        The new BackgroundTask, or the pending/running task that already has ``dedup_key``
+    """
+    definition = get_task(name)
+    fields = {
+        'name': name,
+        'arguments': arguments or {},
+        'priority': definition.priority if priority is None else priority,
+        'max_attempts': definition.max_attempts if max_attempts is None else max_attempts,
+        'dedup_key': dedup_key,
+        'run_at': run_at or timezone.now(),
+        'created_by': user if user is not None and user.is_authenticated else None,
+    }
+    for attempt in range(1, ENQUEUE_ATTEMPTS + 1):
+        if dedup_key is not None:
+            existing = BackgroundTask.objects.filter(
+                dedup_key=dedup_key, status__in=BackgroundTask.ACTIVE_STATUSES
+            ).first()
+            if existing is not None:
+                return existing
+        try:
+            with transaction.atomic():
+                return BackgroundTask.objects.create(**fields)
+        except IntegrityError:
+            # Another request may have queued the same key between the check and the insert;
+            # anything else (or a key that keeps flipping) is raised
+            conflict = dedup_key is not None and BackgroundTask.objects.filter(
+                dedup_key=dedup_key, status__in=BackgroundTask.ACTIVE_STATUSES
+            ).exists()
+            if not conflict or attempt == ENQUEUE_ATTEMPTS:
+                raise
+
+
+def claim_tasks(worker_id, limit=1):
+    """Claim up to ``limit`` due pending tasks for ``worker_id`` and mark them running"""
+    now = timezone.now()
+    due = BackgroundTask.objects.filter(status=BackgroundTask.PENDING, run_at__lte=now).order_by(*CLAIM_ORDER)
+    claim = {
+        'status': BackgroundTask.RUNNING, 'locked_by': worker_id, 'locked_at': now,
+        'started_at': now, 'attempts': F('attempts') + 1,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            claimed = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            BackgroundTask.objects.filter(id__in=claimed).update(**claim)
+    else:
+        claimed = []
+        # Over-fetch candidates: other workers may win some of them
+        for task_id in due.values_list('id', flat=True)[:limit * 4]:
+            if BackgroundTask.objects.filter(id=task_id, status=BackgroundTask.PENDING).update(**claim):
+                claimed.append(task_id)
+                if len(claimed) == limit:
+                    break
+
+    return list(BackgroundTask.objects.filter(id__in=claimed).order_by(*CLAIM_ORDER))
+
+
+def renew_leases(worker_id, task_ids):
+    """Extend the lease of the tasks ``worker_id`` is still running"""
+    return BackgroundTask.objects.filter(
+        id__in=task_ids, status=BackgroundTask.RUNNING, locked_by=worker_id
+    ).update(locked_at=timezone.now())
+
+
+def release_expired(lease_seconds=None):
+    """Requeue (or fail, if out of attempts) running tasks whose lease has expired"""
+    if lease_seconds is None:
+        lease_seconds = TASK_LEASE_SECONDS
+    expired = BackgroundTask.objects.filter(
+        status=BackgroundTask.RUNNING, locked_at__lt=timezone.now() - timedelta(seconds=lease_seconds)
+    )
+    error = 'Worker did not finish the task before its lease expired'
+    failed = expired.filter(attempts__gte=F('max_attempts')).update(
+        status=BackgroundTask.FAILED, error=error, finished_at=timezone.now(), locked_by=''
+    )
+    requeued = expired.update(status=BackgroundTask.PENDING, error=error, locked_by='')
+    return requeued + failed
+
+
+def execute(name, arguments):
+    """Run a registered task function; the entry point in worker processes"""
+    return get_task(name).func(**arguments)
+
+
+def complete(task, result=None, error=None):
+    """
+    Record the outcome of a claimed task.
+
+    A failure is retried after a backoff while the task has attempts left.
+    Nothing is written if the task's lease expired and it was released meanwhile.
+    """
+    now = timezone.now()
+    if error is None:
+        update = {'status': BackgroundTask.SUCCEEDED, 'result': result, 'error': '', 'finished_at': now}
+    elif task.attempts < task.max_attempts:
+        backoff = RETRY_BACKOFF_SECONDS * 2 ** (task.attempts - 1)
+        update = {'status': BackgroundTask.PENDING, 'error': error, 'run_at': now + timedelta(seconds=backoff)}
+    else:
+        update = {'status': BackgroundTask.FAILED, 'error': error, 'finished_at': now}
+    return BackgroundTask.objects.filter(
+        id=task.id, status=BackgroundTask.RUNNING, locked_by=task.locked_by
+    ).update(locked_by='', **update)
+
+
+def format_error(exception):
+    return ''.join(traceback.format_exception(type(exception), exception, exception.__traceback__)).strip()
@@ -0,0 +1,156 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import IntegrityError
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from courses.models import Department
+from users.models import UserProfile
+from .models import BackgroundTask
+from .registry import TaskNotRegistered, task
+from .services import claim_tasks, complete, enqueue, release_expired
+from .worker import TaskWorker
+
+
+@task('tests.add')
+def add(a, b):
+    return a + b
+
+
+@task('tests.fail', max_attempts=2)
+def fail():
+    raise ValueError('always fails')
+
+
+slow_runs = []
+
+
+@task('tests.slow')
+def slow(seconds):
+    slow_runs.append(seconds)
+    time.sleep(seconds)
+    return len(slow_runs)
+
+
+class ThreadedWorker(TaskWorker):
+    """Runs tasks on threads, so the worker loop keeps polling while one runs"""
+
+    def make_executor(self):
+        return ThreadPoolExecutor(max_workers=self.processes)
+
+
+class TaskQueueTests(TestCase):
+    """Queueing, claiming, retries and leases"""
+
+    def test_dedup_key(self):
+        first = add.enqueue({'a': 1, 'b': 2}, dedup_key='sum')
+        self.assertEqual(add.enqueue({'a': 1, 'b': 2}, dedup_key='sum'), first)
+
+        BackgroundTask.objects.filter(id=first.id).update(status=BackgroundTask.SUCCEEDED)
+        self.assertNotEqual(add.enqueue({'a': 1, 'b': 2}, dedup_key='sum'), first)
+        with self.assertRaises(TaskNotRegistered):
+            enqueue('tests.missing')
+
+    def test_dedup_race(self):
+        competitor = add.enqueue({'a': 1, 'b': 2}, dedup_key='sum')
+        lookups = [BackgroundTask.objects.none()]
+        real_filter = BackgroundTask.objects.filter
+
+        def racing_filter(*args, **kwargs):
+            # The first check runs before the competing request has inserted its task
+            return lookups.pop() if lookups else real_filter(*args, **kwargs)
+
+        with mock.patch.object(BackgroundTask.objects, 'filter', side_effect=racing_filter):
+            self.assertEqual(add.enqueue({'a': 1, 'b': 2}, dedup_key='sum'), competitor)
+        self.assertEqual(BackgroundTask.objects.count(), 1)
+
+        # Integrity errors that are not a dedup_key conflict are not retried
+        with mock.patch.object(BackgroundTask.objects, 'create', side_effect=IntegrityError) as failing:
+            with self.assertRaises(IntegrityError):
+                add.enqueue({'a': 1, 'b': 2}, dedup_key='other')
+        self.assertEqual(failing.call_count, 1)
+
+    def test_claim_by_priority_once(self):
+        low = add.enqueue({'a': 1, 'b': 1})
+        high = add.enqueue({'a': 2, 'b': 2}, priority=5)
+        add.enqueue({'a': 3, 'b': 3}, run_at=timezone.now() + timedelta(hours=1))
+
+        self.assertEqual(claim_tasks('worker-1', limit=1), [high])
+        claimed = claim_tasks('worker-2', limit=5)
+        self.assertEqual(claimed, [low])
+        self.assertEqual((claimed[0].status, claimed[0].attempts, claimed[0].locked_by), ('running', 1, 'worker-2'))
+        self.assertEqual(claim_tasks('worker-3', limit=5), [])
+
+    def test_worker_runs_tasks_inline(self):
+        queued = add.enqueue({'a': 2, 'b': 3})
+        self.assertEqual(TaskWorker(processes=0).run(once=True), 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.result), ('succeeded', 5))
+        self.assertIsNotNone(queued.finished_at)
+
+    def test_retry_then_fail(self):
+        queued = fail.enqueue()
+        with mock.patch('tasks.services.RETRY_BACKOFF_SECONDS', 0):
+            TaskWorker(processes=0).run(once=True)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('failed', 2))
+        self.assertIn('ValueError: always fails', queued.error)
+
+    def test_expired_lease_is_released(self):
+        queued = add.enqueue({'a': 1, 'b': 1})
+        [claimed] = claim_tasks('crashed-worker')
+        BackgroundTask.objects.filter(id=queued.id).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(release_expired(), 1)
+        [reclaimed] = claim_tasks('worker-2')
+        self.assertEqual(reclaimed.attempts, 2)
+        # The crashed worker's late result is ignored
+        self.assertEqual(complete(claimed, result=2), 0)
+
+    def test_running_task_keeps_its_lease(self):
+        slow_runs.clear()
+        queued = slow.enqueue({'seconds': 0.6})
+        with mock.patch('tasks.services.TASK_LEASE_SECONDS', 0.2):
+            self.assertEqual(ThreadedWorker(processes=1, poll_interval=0.02).run(once=True), 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, queued.result), ('succeeded', 1, 1))
+        self.assertEqual(slow_runs, [0.6])
+
+
+class TaskEndpointTests(TestCase):
+    """Queued work is visible through /api/tasks/tasks/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='registrar', password='password')
+        UserProfile.objects.create(user=cls.admin, role='admin')
+        cls.student = User.objects.create_user(username='student', password='password')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_background_catalog_import(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(
+            '/api/courses/admin/import/?background=1',
+            {'departments': [{'code': 'MATH', 'name': 'Mathematics'}]}, format='json'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(Department.objects.filter(code='MATH').exists())
+
+        TaskWorker(processes=0).run(once=True)
+        self.assertTrue(Department.objects.filter(code='MATH').exists())
+        status = self.client.get(f'/api/tasks/tasks/{response.data["task"]}/').data
+        self.assertEqual(status['status'], 'succeeded')
+        self.assertEqual(status['result']['diff']['departments']['created'], 1)
+        self.assertEqual(self.client.get('/api/tasks/tasks/summary/').data, {'catalog.import': {'succeeded': 1}})
+
+    def test_users_see_own_tasks(self):
+        mine = add.enqueue({'a': 1, 'b': 1}, user=self.student)
+        add.enqueue({'a': 1, 'b': 1}, user=self.admin)
+        self.client.force_authenticate(self.student)
+        response = self.client.get('/api/tasks/tasks/')
+        self.assertEqual([row['id'] for row in response.data['results']], [mine.id])
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import BackgroundTaskViewSet
+
+router = DefaultRouter()
+router.register(r'tasks', BackgroundTaskViewSet)
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,37 @@
+from django.db.models import Count
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from courses.admin_views import is_admin
+from .models import BackgroundTask
+from .serializers import BackgroundTaskSerializer
+
+
+class BackgroundTaskViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Status of background tasks: users see the tasks they queued, admins see all.
+    Filter with ?status= and ?name=.
+    """
+    queryset = BackgroundTask.objects.all()
+    serializer_class = BackgroundTaskSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = BackgroundTask.objects.all()
+        if not is_admin(self.request.user):
+            queryset = queryset.filter(created_by=self.request.user)
+        for field in ('status', 'name'):
+            value = self.request.query_params.get(field)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        return queryset
+    
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Task counts by name and status"""
+        counts = self.get_queryset().order_by().values('name', 'status').annotate(count=Count('id'))
+        summary = {}
+        for row in counts:
+            summary.setdefault(row['name'], {})[row['status']] = row['count']
+        return Response(summary)
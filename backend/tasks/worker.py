@@ -0,0 +1,120 @@
+"""
+Task worker: claims due tasks and runs them in a process pool.
+
+Task functions run in separate processes, so a CPU-heavy task (an audit
+recomputation, a large import) neither blocks the worker loop nor other tasks.
+The pool uses the spawn start method: each process sets Django up from scratch
+and opens its own database connections instead of sharing the worker's.
+With ``processes=0`` tasks run in the worker process itself.
+"""
+
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+
+
+def setup_process(settings_module):
+    """Pool process initializer"""
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def run_task(name, arguments):
+    """Pool entry point; imported lazily so the spawned process sets Django up first"""
+    from .services import execute
+
+    return execute(name, arguments)
+
+
+class InlineExecutor(Executor):
+    """Runs each submitted call immediately in the calling process"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exception:
+            future.set_exception(exception)
+        return future
+
+
+class TaskWorker:
+    """
+    Claim and run tasks until stopped.
+
+    Usage:
+        TaskWorker(processes=4).run()
+        TaskWorker(processes=0).run(once=True)  # drain the due tasks inline, then return
+    """
+
+    def __init__(self, processes=2, poll_interval=1.0, worker_id=None, stdout=None):
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.stdout = stdout
+        self.stopped = False
+
+    def make_executor(self):
+        if not self.processes:
+            return InlineExecutor()
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=setup_process,
+            initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'uniplanner.settings'),),
+        )
+
+    def run(self, once=False):
+        """
+        Run the worker loop. With ``once``, return as soon as no claimed task is
+        running and none is due.
+
+        Returns:
+            The number of tasks run
+        """
+        from .services import claim_tasks, complete, format_error, release_expired, renew_leases
+
+        capacity = max(self.processes, 1)
+        running = {}
+        finished = 0
+        with self.make_executor() as executor:
+            while True:
+                if running:
+                    # Tasks outliving TASK_LEASE_SECONDS must not be released while they still run
+                    renew_leases(self.worker_id, [task.id for task in running.values()])
+                release_expired()
+                if not self.stopped and len(running) < capacity:
+                    for task in claim_tasks(self.worker_id, capacity - len(running)):
+                        self.log(f'Running {task}')
+                        running[executor.submit(run_task, task.name, task.arguments)] = task
+
+                if not running:
+                    if once or self.stopped:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+
+                done, _ = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    exception = future.exception()
+                    if exception is None:
+                        complete(task, result=future.result())
+                        self.log(f'Finished {task.name} #{task.pk}')
+                    else:
+                        complete(task, error=format_error(exception))
+                        self.log(f'Failed {task.name} #{task.pk} (attempt {task.attempts}): {exception!r}')
+                    finished += 1
+        return finished
+
+    def stop(self):
+        """Stop claiming tasks; run() returns once the running ones are recorded"""
+        self.stopped = True
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
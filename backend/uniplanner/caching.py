@@ -0,0 +1,176 @@
+"""
+Per-student cache for expensive computed responses.
+
+Entries are keyed by (user, endpoint, URL kwargs, query parameters) plus the
+versions of everything the response depends on: the catalog version (see
+courses.versioning) and the student's StudentProfile.data_version, which
+signals bump on completed course, degree, schedule and course selection
+writes. A write therefore never has to find and delete entries; it changes
+the key, and stale entries age out of the backend.
+
+The backend is configured with RESPONSE_CACHE:
+
+    RESPONSE_CACHE = {
+        'BACKEND': 'uniplanner.caching.LRUBackend',     # in-process, per worker
+        'OPTIONS': {'max_entries': 2048},
+    }
+    RESPONSE_CACHE = {
+        'BACKEND': 'uniplanner.caching.DjangoCacheBackend',
+        'OPTIONS': {'alias': 'responses'},              # any CACHES alias: locmem, file, redis
+    }
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class LRUBackend:
+    """
+    Bounded in-process store; the least recently used entry is evicted first.
+    With ``ttl`` entries also expire that many seconds after they were set.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value, expires = self._entries.get(key, (None, None))
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend:
+    """Store entries in a CACHES alias, so they can be shared between workers"""
+
+    def __init__(self, alias='default', timeout=3600):
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class ResponseCache:
+    """Versioned response cache with per-endpoint hit/miss counters"""
+
+    KEY_PREFIX = 'responses'
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._counters = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'RESPONSE_CACHE', {})
+        backend_class = import_string(config.get('BACKEND', 'uniplanner.caching.LRUBackend'))
+        return cls(backend_class(**config.get('OPTIONS', {})))
+
+    def make_key(self, request, endpoint, view_kwargs):
+        """Return the cache key for this request, or None if it is not cacheable"""
+        from courses.versioning import get_catalog_version
+
+        student = getattr(request.user, 'student_profile', None)
+        if student is None:
+            return None
+        parts = [
+            request.user.pk, endpoint, sorted(view_kwargs.items()),
+            sorted(request.query_params.lists()), get_catalog_version()[0], student.data_version,
+        ]
+        digest = hashlib.md5(repr(parts).encode()).hexdigest()
+        return f'{self.KEY_PREFIX}:{endpoint}:{digest}'
+
+    def get(self, endpoint, key):
+        value = self.backend.get(key)
+        with self._lock:
+            self._counters[endpoint]['hits' if value is not None else 'misses'] += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def stats(self):
+        """Hit and miss counts per endpoint for this process"""
+        with self._lock:
+            return {endpoint: dict(counts) for endpoint, counts in self._counters.items()}
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self._counters.clear()
+
+
+response_cache = ResponseCache.from_settings()
+
+
+def cached_response(endpoint):
+    """
+    Cache a view method's successful responses for the requesting student.
+
+    Place it under @action; responses carry ``X-Cache: HIT`` or ``MISS``.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = response_cache.make_key(request, endpoint, kwargs)
+            if key is None:
+                return view_method(self, request, *args, **kwargs)
+
+            data = response_cache.get(endpoint, key)
+            if data is not None:
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                response_cache.set(key, response.data)
+                response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
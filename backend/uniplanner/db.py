@@ -0,0 +1,118 @@
+"""
+Database profiles, selected with the UNIPLANNER_DATABASE environment variable.
+
+sqlite (default)
+    The project database file, with every new connection switched to WAL
+    journaling, synchronous=NORMAL, a memory-mapped read window and a busy
+    timeout (see SQLITE_PRAGMAS). WAL lets readers run alongside the single
+    writer, and the busy timeout makes concurrent writers wait for the lock
+    instead of failing with "database is locked".
+    UNIPLANNER_SQLITE_PATH overrides the file location.
+
+postgres
+    POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST and
+    POSTGRES_PORT. Connections are persistent (DATABASE_CONN_MAX_AGE seconds,
+    600 by default) and health-checked before reuse. On Django 5.1+ with
+    psycopg_pool installed, DATABASE_POOL=1 uses Django's connection pool
+    instead; behind PgBouncer in transaction mode set DATABASE_CONN_MAX_AGE=0.
+
+Read replicas
+    UNIPLANNER_REPLICAS is a comma-separated list of SQLite files (sqlite) or
+    hosts (postgres), configured as aliases replica_1, replica_2, ... Catalog
+    reads are routed to them by uniplanner.db_router.ReplicaRouter. Postgres
+    replicas are kept current by streaming replication; SQLite replicas by
+    manage.py sync_replica, which copies the primary with the backup API.
+
+Measure with manage.py benchmark_add_course.
+"""
+
+import os
+from importlib.util import find_spec
+import django
+from django.db.backends.signals import connection_created
+
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+
+def _env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def sqlite_database(base_dir):
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('UNIPLANNER_SQLITE_PATH', base_dir / 'db.sqlite3'),
+        'OPTIONS': {
+            # Python's sqlite3 busy handler, in seconds; matches the busy_timeout pragma
+            'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000,
+        },
+    }
+
+
+def postgres_database():
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'uniplanner'),
+        'USER': os.environ.get('POSTGRES_USER', 'uniplanner'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    if _env_flag('DATABASE_POOL') and django.VERSION >= (5, 1) and find_spec('psycopg_pool'):
+        # Pooled connections are returned to the pool instead of being kept per thread
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 20)),
+        }
+    return database
+
+
+def replica_database(primary, location, vendor):
+    replica = {**primary, 'OPTIONS': dict(primary['OPTIONS'])}
+    replica['NAME' if vendor == 'sqlite' else 'HOST'] = location
+    # Replicas are copies of the primary; tests read them through the primary's test database
+    replica['TEST'] = {'MIRROR': 'default'}
+    return replica
+
+
+def database_config(base_dir, profile=None):
+    """Return DATABASES for the given profile, or the one named by UNIPLANNER_DATABASE"""
+    profile = profile or os.environ.get('UNIPLANNER_DATABASE', 'sqlite')
+    if profile == 'sqlite':
+        primary = sqlite_database(base_dir)
+    elif profile == 'postgres':
+        primary = postgres_database()
+    else:
+        raise ValueError(f"Unknown UNIPLANNER_DATABASE {profile!r}; expected 'sqlite' or 'postgres'")
+
+    databases = {'default': primary}
+    replicas = [location.strip() for location in os.environ.get('UNIPLANNER_REPLICAS', '').split(',')]
+    for number, location in enumerate(filter(None, replicas), start=1):
+        databases[f'replica_{number}'] = replica_database(primary, location, profile)
+    return databases
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to each new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+connection_created.connect(configure_sqlite, dispatch_uid='uniplanner.db.configure_sqlite')
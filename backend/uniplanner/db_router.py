@@ -0,0 +1,125 @@
+"""
+Read/write routing between the primary database and catalog read replicas.
+
+Reads of REPLICA_ROUTED_APPS models (the course catalog and programs) go to
+one of DATABASE_REPLICAS; everything else, including PRIMARY_ONLY_MODELS, and
+every write, goes to the primary. Reads stay on the primary when:
+
+- no replicas are configured,
+- the primary has an open transaction, so the transaction's own writes are
+  visible to it,
+- the request is pinned with use_primary(): PrimaryStickinessMiddleware pins
+  every write request, and for REPLICA_STICKY_SECONDS afterwards pins that
+  client's following requests, so users read their own writes even while a
+  replica lags behind.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+_use_primary = ContextVar('use_primary', default=False)
+
+STICKY_COOKIE = 'uniplanner_primary'
+
+UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+@contextmanager
+def use_primary():
+    """Send every read in this block (and its thread's context) to the primary"""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class ReplicaRouter:
+    """Route catalog reads to a random replica and all writes and migrations to the primary"""
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if (
+            not replicas
+            or model._meta.app_label not in settings.REPLICA_ROUTED_APPS
+            or model._meta.label in settings.PRIMARY_ONLY_MODELS
+        ):
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Related objects are read from wherever the instance came from
+            return instance._state.db
+        if _use_primary.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema with the data from the primary
+        return db == DEFAULT_DB_ALIAS
+
+
+class PrimaryStickinessMiddleware:
+    """
+    Pin write requests, and the same client's requests for
+    REPLICA_STICKY_SECONDS after a write, to the primary database.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.is_pinned(request):
+            return self.get_response(request)
+        with use_primary():
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        if not self.is_pinned(request):
+            return await self.get_response(request)
+        with use_primary():
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def is_pinned(self, request):
+        if not get_replicas():
+            return False
+        if request.method in UNSAFE_METHODS:
+            return True
+        try:
+            pinned_until = float(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        return pinned_until > time.time()
+
+    def process_response(self, request, response):
+        if request.method in UNSAFE_METHODS:
+            sticky_seconds = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE, str(time.time() + sticky_seconds), max_age=sticky_seconds,
+                httponly=True, samesite='Lax'
+            )
+        return response
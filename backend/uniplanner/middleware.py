@@ -0,0 +1,114 @@
+"""
+Response compression and content negotiation headers.
+
+Both middlewares are sync and async capable, so under ASGI the async views
+are not adapted to run in a thread for them.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+
+_ACCEPT_ENCODING_RE = _lazy_re_compile(r'\b(br|gzip)\b')
+
+# Fast brotli level for dynamic responses; 11 (the default) is far too slow
+BROTLI_QUALITY = 5
+
+
+def _compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return compress_string(content)
+
+
+class ResponseCompressionMiddleware:
+    """
+    Compress responses of at least RESPONSE_COMPRESSION_MIN_SIZE bytes with
+    brotli (when installed) or gzip, whichever the client prefers in that order.
+
+    Streaming responses (catalog exports), empty responses such as 304 and
+    responses that already carry a Content-Encoding are passed through.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 1024)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.select_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = _compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The compressed body is no longer byte-identical to a strong validator's
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+    @staticmethod
+    def select_encoding(accept_encoding):
+        offered = set(_ACCEPT_ENCODING_RE.findall(accept_encoding))
+        if 'br' in offered and brotli is not None:
+            return 'br'
+        if 'gzip' in offered:
+            return 'gzip'
+        return None
+
+
+class AcceptVaryMiddleware:
+    """Mark API responses as varying on Accept, since the renderer is negotiated from it"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if getattr(response, 'accepted_renderer', None) is not None:
+            patch_vary_headers(response, ('Accept',))
+        return response
@@ -0,0 +1,27 @@
+"""
+Model helpers shared by the project's apps.
+"""
+
+
+class VersionCounterMixin:
+    """
+    Model mixin for version counters (VERSION_FIELDS) that only move through F()
+    increments in queryset updates.
+
+    Saving an existing instance without update_fields writes every other loaded
+    field, so an instance loaded before a bump never writes the old version back.
+    """
+    VERSION_FIELDS = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = self.get_unversioned_fields()
+        super().save(*args, **kwargs)
+
+    def get_unversioned_fields(self):
+        """Names of the loaded, non-primary-key fields other than VERSION_FIELDS"""
+        skipped = self.get_deferred_fields() | set(self.VERSION_FIELDS)
+        return [
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname not in skipped
+        ]
@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
+from .db import database_config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,11 +45,15 @@ INSTALLED_APPS = [
     "courses",
     "users.apps.UsersConfig",
     "schedules",
+    "tasks",
 ]
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "uniplanner.middleware.ResponseCompressionMiddleware",
+    "uniplanner.middleware.AcceptVaryMiddleware",
+    "uniplanner.db_router.PrimaryStickinessMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -80,12 +86,19 @@ WSGI_APPLICATION = "uniplanner.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
-}
+# SQLite (WAL) by default; UNIPLANNER_DATABASE=postgres for the pooled Postgres profile
+# (see uniplanner.db)
+DATABASES = database_config(BASE_DIR)
+
+# Catalog reads go to the replica aliases, when any are configured (see uniplanner.db_router)
+DATABASE_ROUTERS = ['uniplanner.db_router.ReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+REPLICA_ROUTED_APPS = ['courses']
+# Models of those apps read only from the primary: the catalog version decides
+# ETag/304 responses and snapshot freshness, so it must never lag behind
+PRIMARY_ONLY_MODELS = ['courses.CatalogVersion']
+# A client's reads stay on the primary for this long after its last write
+REPLICA_STICKY_SECONDS = 10
 
 
 # Password validation
@@ -132,15 +145,44 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'uniplanner.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ] + (
+        # Selected with "Accept: application/msgpack"
+        ['uniplanner.renderers.MessagePackRenderer'] if find_spec('msgpack') else []
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20
 }
 
+# Per-student cache for expensive computed responses (see uniplanner.caching).
+# Use 'uniplanner.caching.DjangoCacheBackend' with {'alias': ...} to share entries
+# between workers through a CACHES entry (file or Redis).
+RESPONSE_CACHE = {
+    'BACKEND': 'uniplanner.caching.LRUBackend',
+    'OPTIONS': {'max_entries': 2048},
+}
+
+# Cached token credentials (see users.authentication): a per-process LRU backed by a CACHES alias
+AUTH_TOKEN_CACHE = {
+    'MAX_ENTRIES': 4096,
+    'LOCAL_TTL': 30,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+# Memory-mapped catalog snapshot (see courses.snapshot); build with manage.py build_catalog_snapshot
+CATALOG_SNAPSHOT_PATH = BASE_DIR / 'catalog.snapshot'
+
+# Responses at least this large are compressed with brotli or gzip (see uniplanner.middleware)
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -159,12 +201,17 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'if-modified-since',
+    'if-none-match',
     'origin',
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
 ]
 
+# Catalog responses are validated with ETag/Last-Modified (see courses.versioning)
+CORS_EXPOSE_HEADERS = ['etag', 'last-modified']
+
 # CSRF Configuration for development
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:3000",
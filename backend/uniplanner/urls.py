@@ -23,4 +23,5 @@ urlpatterns = [
     path("api/courses/", include("courses.urls")),
     path("api/schedules/", include("schedules.urls")),
     path("api/users/", include("users.urls")),
+    path("api/tasks/", include("tasks.urls")),
 ]
@@ -89,4 +89,7 @@ def logout_view(request):
     """
     Custom logout view - token-based (no session logout needed)
     """
+    if request.auth is not None:
+        # Revoke the token; its cached credentials are dropped when it is deleted
+        request.auth.delete()
     return Response({'success': True, 'message': 'Logout successful'})
@@ -0,0 +1,185 @@
+"""
+Token authentication with cached credentials.
+
+DRF's TokenAuthentication loads the token and its user on every request, and
+the role check (user.profile) and hasattr(user, 'student_profile') in views
+each cost another query. CachedTokenAuthentication caches, per token, the
+rows of the user, UserProfile and StudentProfile (or their absence) and the
+token's user and creation time (never the key itself):
+first in a bounded in-process LRU whose entries expire after LOCAL_TTL
+seconds, then in a CACHES alias shared by all workers. A cached request is
+authenticated without queries; the instances are rebuilt with Model.from_db
+and linked to each other, so user.profile and user.student_profile need no
+query either.
+
+User.password is left deferred and loads on access, so that password hashes
+are never written to the shared cache. StudentProfile.data_version, which
+the response cache keys on, is cached with the profile: every bump (a
+queryset update, without signals) invalidates the student's tokens too.
+
+Logout deletes the token. Entries are dropped when the token is deleted or
+the user, profile (role) or student profile is saved or deleted or its
+data_version bumped, and again when the transaction making the change
+commits. Invalidation reaches this process's LRU and the shared cache; other
+processes' LRU entries expire within LOCAL_TTL, so for that long they may
+still see the old role or key responses on the old data_version. Each
+invalidation also moves the token's generation in the shared cache: a
+request that loaded the credentials before an invalidation but stores them
+after it sees the generation change and drops its stale entry.
+
+    AUTH_TOKEN_CACHE = {
+        'MAX_ENTRIES': 4096,    # tokens kept in each process
+        'LOCAL_TTL': 30,        # seconds
+        'CACHE_ALIAS': 'default',
+        'TIMEOUT': 300,         # seconds in the shared cache
+    }
+"""
+
+import hashlib
+import uuid
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from uniplanner.caching import DjangoCacheBackend, LRUBackend
+from .models import StudentProfile, UserProfile
+
+
+# Read live rather than from the cache (see the module docstring)
+UNCACHED_FIELDS = {User: {'password'}}
+
+
+class TokenCache:
+    """Two-level cache of credential entries keyed by token"""
+
+    KEY_PREFIX = 'auth-token'
+
+    def __init__(self, max_entries=4096, local_ttl=30, cache_alias='default', timeout=300):
+        self.local = LRUBackend(max_entries=max_entries, ttl=local_ttl)
+        self.shared = DjangoCacheBackend(alias=cache_alias, timeout=timeout)
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'AUTH_TOKEN_CACHE', {})
+        return cls(**{name.lower(): value for name, value in config.items()})
+
+    def make_key(self, token_key, kind=''):
+        # Cache keys (which may be visible to cache operators) never contain the token itself
+        return f'{self.KEY_PREFIX}{kind}:{hashlib.sha256(token_key.encode()).hexdigest()}'
+
+    def generation(self, token_key):
+        """Marker that changes whenever the token's entry is invalidated"""
+        return self.shared.get(self.make_key(token_key, '-generation'))
+
+    def get(self, token_key):
+        key = self.make_key(token_key)
+        entry = self.local.get(key)
+        if entry is None:
+            entry = self.shared.get(key)
+            if entry is not None:
+                self.local.set(key, entry)
+        return entry
+
+    def set(self, token_key, entry, generation):
+        """Store an entry loaded after reading ``generation``, unless the token was invalidated since"""
+        key = self.make_key(token_key)
+        self.local.set(key, entry)
+        self.shared.set(key, entry)
+        if self.generation(token_key) != generation:
+            self.local.delete(key)
+            self.shared.delete(key)
+
+    def delete(self, *token_keys):
+        for token_key in token_keys:
+            key = self.make_key(token_key)
+            self.shared.set(self.make_key(token_key, '-generation'), uuid.uuid4().hex)
+            self.local.delete(key)
+            self.shared.delete(key)
+
+    def clear(self):
+        """Empty this process's LRU (the shared cache is left alone)"""
+        self.local.clear()
+
+
+token_cache = TokenCache.from_settings()
+
+
+def invalidate_tokens(token_keys):
+    """Drop the cached credentials of these tokens, now and when the current transaction commits"""
+    token_cache.delete(*token_keys)
+    if connection.in_atomic_block:
+        # Until the change commits other requests still load, and may cache, the old rows
+        transaction.on_commit(lambda: token_cache.delete(*token_keys))
+
+
+def invalidate_user_tokens(user_ids):
+    """Drop the cached credentials of every token of these users"""
+    invalidate_tokens(list(Token.objects.filter(user_id__in=user_ids).values_list('key', flat=True)))
+
+
+def _row(instance):
+    """(field names, values) of a loaded instance, for Model.from_db; None for a missing relation"""
+    if instance is None:
+        return None
+    uncached = UNCACHED_FIELDS.get(type(instance), set())
+    names = [field.attname for field in instance._meta.concrete_fields if field.attname not in uncached]
+    return names, [getattr(instance, name) for name in names]
+
+
+def _related_or_none(user, name):
+    try:
+        return getattr(user, name)
+    except (UserProfile.DoesNotExist, StudentProfile.DoesNotExist):
+        return None
+
+
+def credentials_entry(token):
+    """The cache entry for a token loaded with its user, profile and student profile"""
+    user = token.user
+    return {
+        # The key is supplied by each request, so cached entries never contain it
+        'token': {'user_id': token.user_id, 'created': token.created},
+        'user': _row(user),
+        'profile': _row(_related_or_none(user, 'profile')),
+        'student_profile': _row(_related_or_none(user, 'student_profile')),
+    }
+
+
+def rebuild_credentials(key, entry):
+    """Rebuild (user, token) for a token key from its cache entry, with the user's relations already cached"""
+    user = User.from_db(DEFAULT_DB_ALIAS, *entry['user'])
+    token = Token.from_db(
+        DEFAULT_DB_ALIAS, ['key', 'user_id', 'created'], [key, entry['token']['user_id'], entry['token']['created']]
+    )
+    Token.user.field.set_cached_value(token, user)
+    for name, model in (('profile', UserProfile), ('student_profile', StudentProfile)):
+        related = model.from_db(DEFAULT_DB_ALIAS, *entry[name]) if entry[name] is not None else None
+        if related is not None:
+            model.user.field.set_cached_value(related, user)
+        # A cached None makes the reverse accessor raise DoesNotExist without a query
+        getattr(User, name).related.set_cached_value(user, related)
+    return user, token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that serves repeat requests from TokenCache without queries"""
+
+    def authenticate_credentials(self, key):
+        entry = token_cache.get(key)
+        if entry is None:
+            generation = token_cache.generation(key)
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user__profile', 'user__student_profile').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            entry = credentials_entry(token)
+            token_cache.set(key, entry, generation)
+
+        user, token = rebuild_credentials(key, entry)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return (user, token)
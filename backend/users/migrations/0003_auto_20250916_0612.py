@@ -40,11 +40,7 @@ def create_admin_user(apps, schema_editor):
     
     # Remove any student profile if it exists (admin shouldn't have one)
     StudentProfile = apps.get_model('users', 'StudentProfile')
-    try:
-        student_profile = admin_user.student_profile
-        student_profile.delete()
-    except StudentProfile.DoesNotExist:
-        pass
+    StudentProfile.objects.filter(user_id=admin_user.id).delete()
     
     # Create or get the guest user
     guest_user, guest_created = User.objects.get_or_create(
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.24 on 2026-10-19 00:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_auto_20250916_0612"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studentprofile",
+            name="data_version",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Bumped whenever completed courses, degrees, schedules or course selections change",
+            ),
+        ),
+    ]
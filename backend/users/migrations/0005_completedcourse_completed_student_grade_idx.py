@@ -0,0 +1,21 @@
+# Generated by Django 4.2.24 on 2026-10-19 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0012_course_course_active_dept_number_idx_and_more"),
+        ("users", "0004_studentprofile_data_version"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="completedcourse",
+            index=models.Index(
+                fields=["student", "grade", "course"],
+                name="completed_student_grade_idx",
+            ),
+        ),
+    ]
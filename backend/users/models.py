@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.contrib.auth.models import AbstractUser
+from uniplanner.models import VersionCounterMixin
 
 
 class UserProfile(models.Model):
@@ -31,7 +32,7 @@ class UserProfile(models.Model):
         return self.role == 'student'
 
 
-class StudentProfile(models.Model):
+class StudentProfile(VersionCounterMixin, models.Model):
     """Extended profile for students"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='student_profile')
     student_id = models.CharField(max_length=20, unique=True)
@@ -48,9 +49,22 @@ class StudentProfile(models.Model):
         ],
         default='active'
     )
+    data_version = models.PositiveIntegerField(default=0, help_text="Bumped whenever completed courses, degrees, schedules or course selections change")
+    
+    VERSION_FIELDS = ('data_version',)
     
     def __str__(self):
         return f"{self.user.get_full_name()} ({self.student_id})"
+    
+    @classmethod
+    def bump_data_version(cls, **filters):
+        """Invalidate cached per-student responses for the matching students"""
+        from .authentication import invalidate_user_tokens
+        
+        students = cls.objects.filter(**filters)
+        students.update(data_version=models.F('data_version') + 1)
+        # Cached credentials carry the version the response cache keys on
+        invalidate_user_tokens(students.values('user_id'))
 
 
 class StudentDegree(models.Model):
@@ -90,6 +104,8 @@ class CompletedCourse(models.Model):
         ('I', 'Incomplete'),
     ]
     
+    PASSING_GRADES = ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'P']
+    
     student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='completed_courses')
     course = models.ForeignKey('courses.Course', on_delete=models.CASCADE, related_name='completed_by')
     semester = models.CharField(max_length=10)
@@ -100,6 +116,10 @@ class CompletedCourse(models.Model):
     class Meta:
         unique_together = ['student', 'course', 'semester', 'year']
         ordering = ['-year', 'semester', 'course__department__code', 'course__course_number']
+        indexes = [
+            # Covers the passing-grade lookup of completed course ids
+            models.Index(fields=['student', 'grade', 'course'], name='completed_student_grade_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.course.full_code} ({self.grade})"
@@ -107,5 +127,4 @@ class CompletedCourse(models.Model):
     @property
     def is_passing(self):
         """Check if the grade is passing"""
-        passing_grades = ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'P']
-        return self.grade in passing_grades
\ No newline at end of file
+        return self.grade in self.PASSING_GRADES
\ No newline at end of file
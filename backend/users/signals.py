@@ -1,10 +1,42 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile, StudentProfile
+from rest_framework.authtoken.models import Token
+from .authentication import invalidate_tokens, invalidate_user_tokens
+from .models import UserProfile, StudentProfile, StudentDegree, CompletedCourse
 import users.middleware  # Import to register the login signal
 
 
+@receiver(post_save, sender=CompletedCourse)
+@receiver(post_delete, sender=CompletedCourse)
+@receiver(post_save, sender=StudentDegree)
+@receiver(post_delete, sender=StudentDegree)
+def bump_student_data_version(sender, instance, **kwargs):
+    """Eligibility and recommendations depend on the transcript and degrees"""
+    StudentProfile.bump_data_version(pk=instance.student_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Cached credentials include the user row (is_active, names)"""
+    invalidate_user_tokens([instance.pk])
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    """Role changes and student profile edits take effect on the next request"""
+    invalidate_user_tokens([instance.user_id])
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_tokens([instance.key])
+
+
 @receiver(post_migrate)
 def ensure_admin_user(sender, **kwargs):
     """Ensure the admin and guest users exist and have the correct passwords after migrations"""
@@ -1,3 +1,163 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from courses.admin_views import is_admin
+from uniplanner.caching import LRUBackend
+from . import authentication
+from .authentication import CachedTokenAuthentication, token_cache
+from .models import StudentProfile, UserProfile
 
-# Create your tests here.
+
+class StudentProfileTests(TestCase):
+    """data_version only moves forward, through bump_data_version()"""
+
+    def test_save_keeps_bumped_version(self):
+        user = User.objects.create_user(username='student', password='password')
+        profile = StudentProfile.objects.create(user=user, student_id='S2000')
+        StudentProfile.bump_data_version(pk=profile.pk)
+        profile.gpa = '3.70'
+        profile.save()
+        profile.save()
+        profile.refresh_from_db()
+        self.assertEqual((profile.data_version, str(profile.gpa)), (1, '3.70'))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Repeat requests authenticate from the token cache without queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', password='password')
+        UserProfile.objects.create(user=cls.user, role='student')
+        cls.student = StudentProfile.objects.create(user=cls.user, student_id='S2000')
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+
+    def authenticate(self, key=None):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {key or self.token.key}')
+        return CachedTokenAuthentication().authenticate(request)
+
+    def test_cached_request_needs_no_queries(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            user, token = self.authenticate()
+            self.assertEqual((user.pk, token.key), (self.user.pk, self.token.key))
+            self.assertFalse(is_admin(user))
+            self.assertEqual(user.student_profile.pk, self.student.pk)
+            self.assertEqual(user.student_profile.user, user)
+
+        # The password hash is never cached and is read on access
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password('password'))
+
+    def test_data_version_is_cached_until_bumped(self):
+        self.authenticate()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate()[0].student_profile.data_version, 0)
+        StudentProfile.bump_data_version(pk=self.student.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate()[0].student_profile.data_version, 1)
+
+    def test_missing_relations_are_cached(self):
+        staff = User.objects.create_user(username='staff', password='password')
+        key = Token.objects.create(user=staff).key
+        self.authenticate(key)
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(key)
+            self.assertFalse(hasattr(user, 'student_profile'))
+            self.assertFalse(hasattr(user, 'profile'))
+
+    def test_shared_cache_serves_other_processes(self):
+        self.authenticate()
+        token_cache.clear()
+        with self.assertNumQueries(0):
+            self.authenticate()
+
+    def test_role_change_invalidates(self):
+        user, _ = self.authenticate()
+        self.assertFalse(is_admin(user))
+        profile = UserProfile.objects.get(user=self.user)
+        profile.role = 'admin'
+        profile.save()
+        user, _ = self.authenticate()
+        self.assertTrue(is_admin(user))
+
+    def test_deactivated_user_and_deleted_token_fail(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+        self.user.is_active = True
+        self.user.save()
+        self.authenticate()
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_logout_revokes_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(client.get('/api/users/auth/profile/').status_code, 200)
+        self.assertEqual(client.post('/api/users/auth/logout/').status_code, 200)
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+        self.assertEqual(client.get('/api/users/auth/profile/').status_code, 401)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_entries_do_not_contain_the_key(self):
+        self.authenticate()
+        entry = cache.get(token_cache.make_key(self.token.key))
+        self.assertNotIn(self.token.key, repr(entry))
+        with self.assertNumQueries(0):
+            _, token = self.authenticate()
+        self.assertEqual((token.key, token.user_id, token.created), (self.token.key, self.user.pk, self.token.created))
+
+    def test_invalidation_during_load_drops_entry(self):
+        profile = UserProfile.objects.get(user=self.user)
+        credentials_entry = authentication.credentials_entry
+
+        def load_then_invalidate(token):
+            # The role changes after this request read the old row but before it stores it
+            entry = credentials_entry(token)
+            profile.role = 'admin'
+            profile.save()
+            return entry
+
+        with mock.patch('users.authentication.credentials_entry', side_effect=load_then_invalidate):
+            user, _ = self.authenticate()
+        self.assertFalse(is_admin(user))
+        self.assertIsNone(token_cache.get(self.token.key))
+        user, _ = self.authenticate()
+        self.assertTrue(is_admin(user))
+
+    def test_invalidated_again_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            profile = UserProfile.objects.get(user=self.user)
+            profile.role = 'admin'
+            profile.save()
+        # Another request caches the rows as they were before the commit
+        self.authenticate()
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_local_entries_expire(self):
+        backend = LRUBackend(max_entries=10, ttl=30)
+        with mock.patch('uniplanner.caching.time.monotonic', return_value=100):
+            backend.set('key', 'value')
+        with mock.patch('uniplanner.caching.time.monotonic', return_value=129):
+            self.assertEqual(backend.get('key'), 'value')
+        with mock.patch('uniplanner.caching.time.monotonic', return_value=130):
+            self.assertIsNone(backend.get('key'))
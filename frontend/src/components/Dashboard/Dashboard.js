@@ -22,7 +22,7 @@ import {
   Warning as WarningIcon,
   CheckCircle as CheckCircleIcon,
 } from '@mui/icons-material';
-import { coursesAPI } from '../../services/api';
+import { schedulesAPI } from '../../services/api';
 
 const Dashboard = () => {
   // Get user data from localStorage instead of AuthContext
@@ -41,13 +41,11 @@ const Dashboard = () => {
     try {
       setLoading(true);
       
-      // Load course recommendations
-      const recResponse = await coursesAPI.getRecommendations();
-      setRecommendations(recResponse.data.slice(0, 5)); // Show top 5
-      
-      // For now, set empty data since we don't have schedule context
-      setCurrentSchedule(null);
-      setDegreeAudits([]);
+      // One request loads every dashboard section
+      const { data } = await schedulesAPI.getDashboard();
+      setRecommendations(data.recommendations);
+      setCurrentSchedule(data.schedules.find((schedule) => schedule.is_active) || null);
+      setDegreeAudits(data.degree_audits);
       setConflicts([]);
     } catch (error) {
       console.error('Error loading dashboard data:', error);
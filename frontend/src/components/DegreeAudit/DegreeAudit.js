@@ -61,7 +61,9 @@ const DegreeAudit = () => {
   const loadDegreeAudits = async () => {
     try {
       setLoading(true);
-      const response = await schedulesAPI.getDegreeAudits();
+      const response = await schedulesAPI.getDegreeAudits({
+        expand: 'requirement_status,cross_program_satisfaction',
+      });
       // Handle both direct array response and paginated response
       const audits = response.data.results || response.data;
       setDegreeAudits(Array.isArray(audits) ? audits : []);
@@ -98,7 +98,7 @@ const SemesterGrid = ({ degreeAudits, onUpdate }) => {
   const loadCourses = async (departmentFilter = '') => {
     try {
       setLoading(true);
-      const params = {};
+      const params = { fields: 'id,full_code,title,credits,department' };
       if (departmentFilter) {
         params.department = departmentFilter;
       }
@@ -87,6 +87,9 @@ export const schedulesAPI = {
   // Get user's schedules
   getSchedules: (params = {}) => api.get('/schedules/schedules/', { params }),
   
+  // Get everything the dashboard shows (user, audits, schedules, available courses, recommendations)
+  getDashboard: () => api.get('/schedules/dashboard/'),
+  
   // Create a new schedule
   createSchedule: (data) => api.post('/schedules/schedules/', data),
   
@@ -112,7 +115,10 @@ export const schedulesAPI = {
     api.get(`/schedules/schedules/${scheduleId}/alternatives/?offering_id=${offeringId}`),
   
   // Get degree audits
-  getDegreeAudits: () => api.get('/schedules/degree-audits/'),
+  getDegreeAudits: (params = {}) => api.get('/schedules/degree-audits/', { params }),
+  
+  // Evaluate the student's transcript against every active program
+  getWhatIfAudit: () => api.get('/schedules/degree-audits/what_if/'),
   
   // Refresh degree audit
   refreshDegreeAudit: (auditId) => api.post(`/schedules/degree-audits/${auditId}/refresh/`),
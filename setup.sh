@@ -61,7 +61,7 @@ source venv/bin/activate
 # Install Python dependencies
 echo -e "${YELLOW}Installing Python dependencies...${NC}"
 pip install --upgrade pip
-pip install django djangorestframework django-cors-headers python-decouple
+pip install django djangorestframework django-cors-headers python-decouple orjson msgpack brotli
 
 # Run Django migrations
 echo -e "${YELLOW}Setting up database...${NC}"